@@ -0,0 +1,191 @@
+"""Self-adaptive parameter control for the GA and ACO phases.
+
+This module tunes the genetic operator's crossover and mutation rates and
+tournament size, and the colony's pheromone and heuristic exponents and
+evaporation rate, while a run is in progress. Decisions are driven by the
+improvement each phase buys per fitness evaluation and by how diverse its
+solutions still are, so the same settings suit small and large waves.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from forestfire.utils.config import TOURNAMENT_SIZE, TARGET_DIVERSITY
+
+# Attributes the controller tunes on genetic operators and on colonies
+GENETIC_PARAMETERS = ('pc', 'pm', 'tournament_size')
+COLONY_PARAMETERS = ('alpha', 'beta', 'rho')
+
+
+def population_diversity(genes: np.ndarray, fitness: np.ndarray) -> float:
+    """Mean fraction of genes that differ from the best individual.
+
+    Args:
+        genes: Gene matrix, one row per individual
+        fitness: Fitness of each row
+
+    Returns:
+        0.0 for a fully converged population, up to 1.0
+    """
+    if len(genes) < 2:
+        return 0.0
+    best = genes[int(np.argmin(fitness))]
+    return float(np.mean(genes != best))
+
+
+class _ImprovementTracker:
+    """Relative improvement per evaluation and its moving average"""
+
+    def __init__(self, smoothing: float):
+        self.smoothing = smoothing
+        self.best = float('inf')
+        self.average: Optional[float] = None
+
+    def update(self, best: float, evaluations: int) -> Tuple[float, float]:
+        """Record a new best fitness, returning this and the average rate"""
+        if not np.isfinite(self.best):
+            self.best = best
+            return 0.0, 0.0
+        rate = max(self.best - best, 0.0) / (abs(self.best) or 1.0)
+        rate /= max(evaluations, 1)
+        self.best = min(self.best, best)
+        average = rate if self.average is None else self.average
+        self.average = ((1 - self.smoothing) * average
+                        + self.smoothing * rate)
+        return rate, average
+
+    def state(self) -> np.ndarray:
+        """Best fitness and average rate, NaN while there is no average"""
+        return np.array([self.best, np.nan if self.average is None
+                         else self.average])
+
+    def restore(self, state: np.ndarray) -> None:
+        """Continue from a state returned by state"""
+        self.best = float(state[0])
+        self.average = None if np.isnan(state[1]) else float(state[1])
+
+
+class AdaptiveController:
+    """Adjusts GA and ACO parameters from run-time feedback.
+
+    GA rules, applied after every generation:
+        - Improvement per evaluation at or above its moving average keeps
+          exploiting: crossover rate up, mutation rate down.
+        - Improvement falling behind its average, or diversity below the
+          target, diversifies: mutation rate up, crossover rate down, and
+          smaller tournaments lower the selection pressure.
+        - Diversity above twice the target allows larger tournaments.
+
+    ACO rules, applied after every batch of ants:
+        - Stagnation or converged ants weaken the pheromone (alpha down,
+          evaporation up) and the greedy heuristic (beta down).
+        - Improvement with diverse ants strengthens the pheromone (alpha
+          up, evaporation down).
+
+    Every parameter changes by a factor of 1 +/- step and stays within its
+    bounds.
+
+    Attributes:
+        target_diversity: Share of genes that should differ from the best
+        step: Relative change per adjustment
+    """
+    def __init__(
+        self,
+        target_diversity: float = TARGET_DIVERSITY,
+        step: float = 0.1,
+        smoothing: float = 0.3,
+        pc_bounds: Tuple[float, float] = (0.5, 0.98),
+        pm_bounds: Tuple[float, float] = (0.01, 0.5),
+        tournament_bounds: Tuple[int, int] = (2, 2 * TOURNAMENT_SIZE),
+        alpha_bounds: Tuple[float, float] = (0.3, 3.0),
+        beta_bounds: Tuple[float, float] = (0.5, 5.0),
+        rho_bounds: Tuple[float, float] = (0.05, 0.9)
+    ):
+        self.target_diversity = target_diversity
+        self.step = step
+        self.bounds = {
+            'pc': pc_bounds, 'pm': pm_bounds,
+            'tournament_size': tournament_bounds,
+            'alpha': alpha_bounds, 'beta': beta_bounds, 'rho': rho_bounds
+        }
+        self._genetic = _ImprovementTracker(smoothing)
+        self._colony = _ImprovementTracker(smoothing)
+        self._colony_best: Optional[np.ndarray] = None
+
+    def update_genetic(
+        self, genetic_op: Any, genes: np.ndarray, fitness: np.ndarray,
+        evaluations: int
+    ) -> None:
+        """Retune a genetic operator after one generation.
+
+        Args:
+            genetic_op: Operator with pc, pm and tournament_size attributes
+            genes: Gene matrix of the new population
+            fitness: Fitness of each row
+            evaluations: Fitness evaluations the generation used
+        """
+        rate, average = self._genetic.update(float(np.min(fitness)),
+                                             evaluations)
+        diversity = population_diversity(genes, fitness)
+        if diversity < self.target_diversity or rate < average:
+            self._scale(genetic_op, 'pm', 1 + self.step)
+            self._scale(genetic_op, 'pc', 1 - self.step)
+            self._shift(genetic_op, 'tournament_size', -1)
+        else:
+            self._scale(genetic_op, 'pc', 1 + self.step)
+            self._scale(genetic_op, 'pm', 1 - self.step)
+        if diversity > 2 * self.target_diversity:
+            self._shift(genetic_op, 'tournament_size', 1)
+
+    def update_colony(
+        self, aco: Any, genes: np.ndarray, fitness: np.ndarray
+    ) -> None:
+        """Retune a colony after one batch of ants.
+
+        Args:
+            aco: Colony with alpha, beta and rho attributes
+            genes: Assignments built by the batch, one row per ant
+            fitness: Fitness of each ant
+        """
+        genes, fitness = np.atleast_2d(genes), np.asarray(fitness)
+        best = int(np.argmin(fitness))
+        rate, average = self._colony.update(float(fitness[best]), len(genes))
+        if self._colony_best is None:
+            self._colony_best = genes[best].copy()
+            return
+        diversity = float(np.mean(genes != self._colony_best))
+        if fitness[best] <= self._colony.best:
+            self._colony_best = genes[best].copy()
+        if rate <= 0 or rate < average or diversity < self.target_diversity:
+            self._scale(aco, 'alpha', 1 - self.step)
+            self._scale(aco, 'beta', 1 - self.step)
+            self._scale(aco, 'rho', 1 + self.step)
+        else:
+            self._scale(aco, 'alpha', 1 + self.step)
+            self._scale(aco, 'rho', 1 - self.step)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """Feedback gathered so far, as arrays for a checkpoint"""
+        return {
+            'genetic': self._genetic.state(),
+            'colony': self._colony.state(),
+            'colony_best': (np.empty(0, dtype=np.int64)
+                            if self._colony_best is None
+                            else self._colony_best)
+        }
+
+    def restore(self, state: Dict[str, np.ndarray]) -> None:
+        """Continue from the feedback returned by state"""
+        self._genetic.restore(state['genetic'])
+        self._colony.restore(state['colony'])
+        self._colony_best = (state['colony_best'].copy()
+                             if len(state['colony_best']) else None)
+
+    def _scale(self, target: Any, name: str, factor: float) -> None:
+        low, high = self.bounds[name]
+        setattr(target, name,
+                float(np.clip(getattr(target, name) * factor, low, high)))
+
+    def _shift(self, target: Any, name: str, amount: int) -> None:
+        low, high = self.bounds[name]
+        setattr(target, name,
+                int(np.clip(getattr(target, name) + amount, low, high)))
@@ -0,0 +1,138 @@
+"""Spatial affinity between orders for grouping-aware crossover.
+
+This module scores how well two orders fit on the same picker route: orders
+sharing their aisles and lying close along them cost little extra to pick
+together. Connected groups of strongly related orders form clusters that
+crossover passes on as a whole instead of splitting them gene by gene.
+"""
+
+from typing import List, Tuple
+import numpy as np
+from forestfire.utils.config import (
+    AFFINITY_RADIUS, AFFINITY_THRESHOLD, STEP_BETWEEN_ROWS
+)
+
+# Sparse affinity: first and second order of each related pair (first <
+# second) and the pair's affinity
+AffinityEdges = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def order_affinity(
+    orders_assign: List[List[Tuple[float, float]]],
+    radius: float = AFFINITY_RADIUS,
+    step_between_rows: int = STEP_BETWEEN_ROWS,
+    min_affinity: float = 0.0
+) -> AffinityEdges:
+    """Pairwise affinity of orders, between 0 and 1, as a sparse edge list.
+
+    The affinity of two orders is the Jaccard overlap of their aisle sets
+    times the closeness of their mean x positions, which falls linearly to
+    zero at the given radius. Only pairs sharing an aisle within the radius
+    can be related, so candidates are found per aisle among the orders
+    sorted by x, and memory grows with the related pairs rather than with
+    the square of the orders.
+
+    Args:
+        orders_assign: List of orders to assign
+        radius: Distance along the aisles at which affinity vanishes
+        step_between_rows: Distance between consecutive aisles
+        min_affinity: Pairs below this affinity are left out; as overlap
+            is at most 1, it also narrows the x window searched
+
+    Returns:
+        Related order pairs and their positive affinities
+    """
+    aisles = [{int(y // step_between_rows) for _, y in locations}
+              for locations in orders_assign]
+    x = np.array([np.mean([loc[0] for loc in locations]) if locations
+                  else 0.0 for locations in orders_assign], dtype=np.float64)
+    counts = np.array([len(order_aisles) for order_aisles in aisles],
+                      dtype=np.int64)
+    members = {}
+    for order, order_aisles in enumerate(aisles):
+        for aisle in order_aisles:
+            members.setdefault(aisle, []).append(order)
+
+    window = radius * (1.0 - min_affinity)
+    keys = []
+    for orders in members.values():
+        orders = np.asarray(orders, dtype=np.int64)
+        orders = orders[np.argsort(x[orders], kind='stable')]
+        xs = x[orders]
+        ends = np.searchsorted(xs, xs + window, side='right')
+        partners = ends - np.arange(1, len(orders) + 1)
+        first = np.repeat(np.arange(len(orders)), partners)
+        second = (np.arange(len(first))
+                  - np.repeat(np.cumsum(partners) - partners, partners)
+                  + first + 1)
+        low = np.minimum(orders[first], orders[second])
+        high = np.maximum(orders[first], orders[second])
+        keys.append(low * len(orders_assign) + high)
+
+    # A pair appears once per shared aisle
+    pairs, shared = np.unique(np.concatenate(keys) if keys
+                              else np.zeros(0, dtype=np.int64),
+                              return_counts=True)
+    first, second = np.divmod(pairs, max(len(orders_assign), 1))
+    overlap = shared / (counts[first] + counts[second] - shared)
+    closeness = 1.0 - np.abs(x[first] - x[second]) / radius
+    affinity = (overlap * closeness).astype(np.float32)
+    keep = (affinity > 0) & (affinity >= min_affinity)
+    return first[keep], second[keep], affinity[keep]
+
+
+def affinity_clusters(
+    affinity: AffinityEdges,
+    orders_assign: List[List[Tuple[float, float]]],
+    threshold: float = AFFINITY_THRESHOLD,
+    step_between_rows: int = STEP_BETWEEN_ROWS
+) -> np.ndarray:
+    """Group orders linked by affinity of at least the threshold.
+
+    Clusters are the connected components of the thresholded affinity
+    graph, found by union-find over its edges and numbered in sweep order
+    (by aisle, then along the aisle), so that a cut between cluster
+    numbers is also a cut through the warehouse.
+
+    Returns:
+        Cluster number per order
+    """
+    size = len(orders_assign)
+    if size == 0:
+        return np.zeros(0, dtype=np.int64)
+    first, second, weight = affinity
+    linked = weight >= threshold
+    labels = _components(size, first[linked], second[linked])
+
+    points = np.array([np.mean(locations, axis=0) if len(locations)
+                       else (0.0, 0.0) for locations in orders_assign],
+                      dtype=np.float64).reshape(-1, 2)
+    sweep = np.lexsort((points[:, 0], points[:, 1] // step_between_rows))
+    _, first_seen = np.unique(labels[sweep], return_index=True)
+    number = np.empty(size, dtype=np.int64)
+    number[labels[sweep][np.sort(first_seen)]] = np.arange(len(first_seen))
+    return number[labels]
+
+
+def _components(
+    size: int, first: np.ndarray, second: np.ndarray
+) -> np.ndarray:
+    """Smallest member of each node's connected component.
+
+    Union-find over all edges at once: every edge between two components
+    hooks the larger root under the smaller one, then paths are
+    compressed, until no edge joins two components.
+    """
+    parent = np.arange(size)
+    while True:
+        root1, root2 = parent[first], parent[second]
+        joins = root1 != root2
+        if not joins.any():
+            return parent
+        np.minimum.at(parent, np.maximum(root1[joins], root2[joins]),
+                      np.minimum(root1[joins], root2[joins]))
+        while True:
+            compressed = parent[parent]
+            if np.array_equal(compressed, parent):
+                break
+            parent = compressed
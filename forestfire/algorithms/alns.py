@@ -0,0 +1,253 @@
+"""Adaptive large neighbourhood search for picker assignments.
+
+This module provides an ALNS solver that repeatedly removes part of an
+assignment and re-inserts the removed orders, choosing its destroy and
+repair operators by weights that adapt to how often each one produced an
+improvement. Candidates are scored with the incremental route-cost
+surrogate, so an iteration costs a handful of counter updates instead of a
+full route evaluation.
+"""
+
+import logging
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from forestfire.optimizer.services.incremental import IncrementalRouteCost
+from forestfire.optimizer.services.routing import RouteOptimizer
+from forestfire.utils.config import (
+    PICKER_CAPACITIES, PICKER_LOCATIONS, ALNS_ITERATIONS,
+    ALNS_REMOVAL_FRACTION
+)
+from .anytime import CancellationToken, Deadline, should_stop
+from .capacity import LoadTracker
+
+logger = logging.getLogger(__name__)
+
+DESTROY_OPERATORS = ('random', 'worst', 'aisle', 'picker')
+REPAIR_OPERATORS = ('greedy', 'regret')
+
+# Scores for a new global best, an improvement and an accepted candidate
+_SCORES = (33.0, 9.0, 13.0)
+
+
+class ALNSOptimizer:
+    """Destroy-and-repair search with adaptive operator weights.
+
+    Weights are updated every segment iterations as
+    w = (1 - reaction) * w + reaction * mean score, and candidates are
+    accepted with a simulated-annealing criterion.
+
+    Attributes:
+        iterations: Destroy-and-repair iterations per run
+        removal_fraction: Largest share of orders removed per iteration
+        segment: Iterations between two weight updates
+        reaction: How fast weights follow recent scores
+        weights: Current destroy and repair operator weights
+        iterations_run: Iterations the last run completed before it
+            finished or was stopped
+    """
+    def __init__(
+        self,
+        route_optimizer: RouteOptimizer,
+        rng: np.random.Generator = None,
+        iterations: int = ALNS_ITERATIONS,
+        removal_fraction: float = ALNS_REMOVAL_FRACTION,
+        segment: int = 50,
+        reaction: float = 0.2,
+        picker_capacities: Sequence[int] = PICKER_CAPACITIES,
+        picker_locations: Sequence[Tuple[float, float]] = PICKER_LOCATIONS
+    ):
+        self.route_optimizer = route_optimizer
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.iterations = iterations
+        self.removal_fraction = removal_fraction
+        self.segment = max(1, segment)
+        self.reaction = reaction
+        self.picker_capacities = list(picker_capacities)
+        self.picker_locations = picker_locations
+        self.weights: Dict[str, np.ndarray] = {
+            'destroy': np.ones(len(DESTROY_OPERATORS)),
+            'repair': np.ones(len(REPAIR_OPERATORS))
+        }
+        self.iterations_run = 0
+
+    def run(
+        self,
+        assignment: Sequence[int],
+        orders_assign: List[Any],
+        evaluator: Any = None,
+        deadline: Optional[Deadline] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[List[int], float]:
+        """Improve a capacity-feasible assignment.
+
+        Args:
+            assignment: Starting assignment
+            orders_assign: List of orders to assign
+            evaluator: Optional fitness evaluator; when given, the result is
+                only kept if its real route cost beats the start
+            deadline: Stop by this deadline
+            cancel_token: Stop once cancelled
+
+        Returns:
+            Best assignment found and its fitness, the real route cost if
+            an evaluator was given and the surrogate cost otherwise
+        """
+        cost = IncrementalRouteCost(
+            orders_assign, assignment, self.route_optimizer,
+            self.picker_locations
+        )
+        tracker = LoadTracker(self.picker_capacities, cost.assignment)
+        aisle_orders: Dict[int, List[int]] = {}
+        for order, aisles in enumerate(cost.order_aisles):
+            for aisle in set(aisles):
+                aisle_orders.setdefault(aisle, []).append(order)
+
+        size = len(cost.assignment)
+        max_removed = max(1, int(size * self.removal_fraction))
+        best, best_total = list(cost.assignment), cost.total
+        temperature = max(0.01 * cost.total / max(size, 1), 1e-6)
+        scores = {kind: np.zeros(len(w)) for kind, w in self.weights.items()}
+        uses = {kind: np.zeros(len(w)) for kind, w in self.weights.items()}
+
+        self.iterations_run = 0
+        for iteration in range(1, self.iterations + 1):
+            if size < 2 or should_stop(deadline, cancel_token):
+                break
+            self.iterations_run = iteration
+            destroy = self._pick('destroy')
+            repair = self._pick('repair')
+            current_total = cost.total
+
+            count = int(self.rng.integers(1, max_removed + 1))
+            removed = self._destroy(destroy, cost, count, aisle_orders)
+            previous = [cost.assignment[order] for order in removed]
+            self._unassign(cost, tracker, removed)
+            self._repair(repair, cost, tracker, removed)
+
+            delta = cost.total - current_total
+            if cost.total < best_total - 1e-9:
+                score = _SCORES[0]
+                best, best_total = list(cost.assignment), cost.total
+            elif delta < -1e-9:
+                score = _SCORES[1]
+            elif self.rng.random() < math.exp(-max(delta, 0) / temperature):
+                score = _SCORES[2]
+            else:
+                score = 0.0
+                self._unassign(cost, tracker, removed)
+                for order, picker_id in zip(removed, previous):
+                    tracker.add(picker_id)
+                    cost.insert(order, picker_id)
+            for kind, index in (('destroy', destroy), ('repair', repair)):
+                scores[kind][index] += score
+                uses[kind][index] += 1
+            temperature *= 0.999
+
+            if iteration % self.segment == 0:
+                self._update_weights(scores, uses)
+
+        fitness = best_total
+        if evaluator is not None:
+            original_fitness, fitness = evaluator.evaluate(
+                np.array([list(assignment), best])
+            )
+            logger.info('ALNS: %.2f -> %.2f', original_fitness, fitness)
+            if fitness >= original_fitness:
+                return list(assignment), float(original_fitness)
+        return best, float(fitness)
+
+    def _pick(self, kind: str) -> int:
+        weights = self.weights[kind]
+        return int(self.rng.choice(len(weights), p=weights / weights.sum()))
+
+    def _update_weights(
+        self, scores: Dict[str, np.ndarray], uses: Dict[str, np.ndarray]
+    ) -> None:
+        for kind, weights in self.weights.items():
+            used = uses[kind] > 0
+            weights[used] = ((1 - self.reaction) * weights[used]
+                             + self.reaction * scores[kind][used]
+                             / uses[kind][used])
+            np.maximum(weights, 1e-3, out=weights)
+            scores[kind][:] = 0
+            uses[kind][:] = 0
+
+    def _destroy(
+        self,
+        operator: int,
+        cost: IncrementalRouteCost,
+        count: int,
+        aisle_orders: Dict[int, List[int]]
+    ) -> List[int]:
+        size = len(cost.assignment)
+        name = DESTROY_OPERATORS[operator]
+        if name == 'worst':
+            # Largest savings among a sample of orders
+            sample = self.rng.choice(size, min(size, 4 * count), replace=False)
+            gains = [cost.removal_delta(int(order)) for order in sample]
+            return [int(sample[i]) for i in np.argsort(gains)[:count]]
+        if name == 'aisle':
+            seed = int(self.rng.integers(size))
+            aisles = sorted(set(cost.order_aisles[seed]))
+            related = [order for aisle in aisles
+                       for order in aisle_orders.get(aisle, [])]
+            for offset in range(1, len(aisle_orders) + 1):
+                if len(related) >= count:
+                    break
+                for aisle in (aisles[0] - offset, aisles[-1] + offset):
+                    related.extend(aisle_orders.get(aisle, []))
+            related = list(dict.fromkeys(related))
+            self.rng.shuffle(related)
+            return related[:count]
+        if name == 'picker':
+            picker_id = cost.assignment[int(self.rng.integers(size))]
+            own = [order for order, p in enumerate(cost.assignment)
+                   if p == picker_id]
+            self.rng.shuffle(own)
+            return own[:count]
+        return self.rng.choice(size, count, replace=False).tolist()
+
+    def _repair(
+        self,
+        operator: int,
+        cost: IncrementalRouteCost,
+        tracker: LoadTracker,
+        removed: List[int]
+    ) -> None:
+        pending = list(removed)
+        self.rng.shuffle(pending)
+        if REPAIR_OPERATORS[operator] == 'greedy':
+            for order in pending:
+                picker_id = min(tracker.open_pickers(),
+                                key=lambda p: cost.insertion_delta(order, p))
+                tracker.add(picker_id)
+                cost.insert(order, picker_id)
+            return
+        # Regret-2: insert the order that loses most if not placed now
+        while pending:
+            choice, choice_picker, choice_regret = 0, -1, -math.inf
+            open_pickers = tracker.open_pickers()
+            for index, order in enumerate(pending):
+                deltas = sorted(
+                    (cost.insertion_delta(order, p), p) for p in open_pickers
+                )
+                regret = (deltas[1][0] - deltas[0][0]
+                          if len(deltas) > 1 else math.inf)
+                if regret > choice_regret:
+                    choice, choice_picker, choice_regret = (
+                        index, deltas[0][1], regret
+                    )
+            order = pending.pop(choice)
+            tracker.add(choice_picker)
+            cost.insert(order, choice_picker)
+
+    @staticmethod
+    def _unassign(
+        cost: IncrementalRouteCost,
+        tracker: LoadTracker,
+        orders: List[int]
+    ) -> None:
+        for order in orders:
+            tracker.remove(cost.assignment[order])
+            cost.remove(order)
@@ -13,8 +13,16 @@ from forestfire.utils.config import (
 
 class AntColonyOptimizer:
     """Class for ant colony optimization operations"""
-    def __init__(self, route_optimizer: RouteOptimizer):
+    def __init__(
+        self,
+        route_optimizer: RouteOptimizer,
+        rng: np.random.Generator = None
+    ):
         self.route_optimizer = route_optimizer
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.alpha = ALPHA
+        self.beta = BETA
+        self.rho = RHO
 
     def calculate_heuristic(
         self,
@@ -53,13 +61,13 @@ class AntColonyOptimizer:
                 if picker_loads[picker] < picker_capacities[picker]:
                     valid_pickers.append(picker)
                     prob.append(
-                        (pheromone[item][picker] ** ALPHA) *
-                        (heuristic[item][picker] ** BETA)
+                        (pheromone[item][picker] ** self.alpha) *
+                        (heuristic[item][picker] ** self.beta)
                     )
             if valid_pickers:
                 prob = np.array(prob)
                 prob /= prob.sum()
-                chosen_picker = np.random.choice(valid_pickers, p=prob)
+                chosen_picker = int(self.rng.choice(valid_pickers, p=prob))
                 assignment[item] = chosen_picker
                 picker_loads[chosen_picker] += 1
         return assignment
@@ -74,7 +82,7 @@ class AntColonyOptimizer:
         """Update pheromone trails"""
         for item in range(orders_size):
             if assignment[item] != -1:
-                pheromone[item][assignment[item]] *= (1 - RHO)
+                pheromone[item][assignment[item]] *= (1 - self.rho)
                 pheromone[item][assignment[item]] += 1 / fitness_score
 
 # For backwards compatibility
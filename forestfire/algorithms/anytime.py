@@ -0,0 +1,276 @@
+"""Anytime driver for the genetic algorithm.
+
+This module runs GA generations under a wall-clock deadline and a
+cancellation token, streams the best-so-far solution after every generation
+and stops early once the search stagnates, so a usable answer is always
+available when the time budget runs out.
+"""
+
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import Any, Callable, Iterator, List, Optional
+from forestfire.utils.checkpoint import (
+    load_checkpoint, remove_checkpoint, restore_rng, restore_tuning,
+    save_checkpoint, tuning_state
+)
+from forestfire.utils.config import (
+    N_POP, MAX_IT, STAGNATION_LIMIT, CHECKPOINT_INTERVAL
+)
+from .adaptive import GENETIC_PARAMETERS
+from .genetic import GeneticOperator
+from .population import Population
+
+logger = logging.getLogger(__name__)
+
+
+class CancellationToken:
+    """Thread-safe flag used to ask a running optimization to stop"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        """Request cancellation"""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation was requested"""
+        return self._event.is_set()
+
+
+class Deadline:
+    """A point in wall-clock time, tracked on the monotonic clock"""
+
+    def __init__(self, seconds: float):
+        self._expires = time.monotonic() + seconds
+
+    @classmethod
+    def after(cls, seconds: float) -> 'Deadline':
+        """Deadline a number of seconds from now"""
+        return cls(seconds)
+
+    @classmethod
+    def at(cls, timestamp: float) -> 'Deadline':
+        """Deadline at a wall-clock UNIX timestamp"""
+        return cls(timestamp - time.time())
+
+    def remaining(self) -> float:
+        """Seconds left, negative once expired"""
+        return self._expires - time.monotonic()
+
+    def expired(self) -> bool:
+        """Whether the deadline has passed"""
+        return self.remaining() <= 0
+
+
+def should_stop(
+    deadline: Optional[Deadline] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    reserve: float = 0.0
+) -> Optional[str]:
+    """Return why work must stop now, or None to continue.
+
+    Args:
+        deadline: Optional deadline
+        cancel_token: Optional cancellation token
+        reserve: Seconds the next unit of work is expected to take
+    """
+    if cancel_token is not None and cancel_token.cancelled:
+        return 'cancelled'
+    if deadline is not None and deadline.remaining() <= reserve:
+        return 'deadline'
+    return None
+
+
+@dataclass
+class Progress:
+    """Best-so-far report emitted after each generation.
+
+    Attributes:
+        iteration: Generations completed, 0 for the initial population
+        best_solution: Best assignment found so far
+        best_fitness: Fitness of best_solution
+        elapsed: Seconds since the optimizer started
+        improved: Whether this generation improved the best fitness
+    """
+    iteration: int
+    best_solution: List[int]
+    best_fitness: float
+    elapsed: float
+    improved: bool
+
+
+class AnytimeOptimizer:
+    """Runs GA generations until a deadline, cancellation or stagnation.
+
+    A new generation is only started if the deadline leaves room for one
+    more generation at the duration of the last one, so the best-so-far
+    solution is ready by the deadline.
+
+    With a checkpoint path, the population, RNG state, counters, the
+    operator's rates and the controller's feedback are saved every
+    checkpoint_interval generations and on cancellation; a later run
+    resumes from that file and continues exactly as the interrupted run
+    would have. The file is removed once a run finishes. A checkpoint is
+    only resumed if it carries the same problem fingerprint.
+
+    An optional AdaptiveController retunes the genetic operator after
+    every generation.
+
+    Attributes:
+        best_solution: Best assignment found so far
+        best_fitness: Fitness of best_solution
+        stop_reason: 'max_iterations', 'deadline', 'cancelled' or
+            'stagnation' once iteration has finished
+    """
+    def __init__(
+        self,
+        genetic_op: GeneticOperator,
+        evaluator,
+        deadline: Optional[Deadline] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        max_iterations: int = MAX_IT,
+        stagnation_limit: int = STAGNATION_LIMIT,
+        pop_size: int = N_POP,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_interval: int = CHECKPOINT_INTERVAL,
+        controller: Any = None,
+        fingerprint: Optional[str] = None
+    ):
+        self.genetic_op = genetic_op
+        self.evaluator = evaluator
+        self.deadline = deadline
+        self.cancel_token = cancel_token
+        self.max_iterations = max_iterations
+        self.stagnation_limit = stagnation_limit
+        self.pop_size = pop_size
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = max(1, checkpoint_interval)
+        self.controller = controller
+        self.fingerprint = fingerprint
+        self.best_solution: List[int] = []
+        self.best_fitness = float('inf')
+        self.stop_reason: Optional[str] = None
+        self.population: Optional[Population] = None
+
+    def iterate(self, pop: Optional[Population]) -> Iterator[Progress]:
+        """Evolve the population, yielding progress after each generation.
+
+        Args:
+            pop: Initial, already evaluated population; may be None when
+                resuming from a checkpoint
+
+        Yields:
+            Progress for the starting population and every generation
+        """
+        started = time.monotonic()
+        self.stop_reason = None
+        first, stagnant = self._start(pop)
+        yield self._progress(first - 1, started, first == 1)
+
+        last_duration = 0.0
+        for iteration in range(first, self.max_iterations + 1):
+            self.stop_reason = should_stop(
+                self.deadline, self.cancel_token, last_duration
+            )
+            if self.stop_reason:
+                break
+            generation_start = time.monotonic()
+            evaluations = sum(self.genetic_op.offspring_counts(self.pop_size))
+            self.population = self.genetic_op.evolve(
+                self.population, self.evaluator, self.pop_size
+            )
+            last_duration = time.monotonic() - generation_start
+            if self.controller is not None:
+                self.controller.update_genetic(
+                    self.genetic_op, self.population.genes,
+                    self.population.fitness, evaluations
+                )
+            improved = self._record(self.population)
+            stagnant = 0 if improved else stagnant + 1
+            if iteration % self.checkpoint_interval == 0:
+                self._save(iteration, stagnant)
+            yield self._progress(iteration, started, improved)
+            if self.stagnation_limit and stagnant >= self.stagnation_limit:
+                self.stop_reason = 'stagnation'
+                break
+        else:
+            self.stop_reason = 'max_iterations'
+
+        if self.stop_reason == 'cancelled':
+            self._save(iteration - 1, stagnant)
+        else:
+            remove_checkpoint(self.checkpoint_path)
+
+    def _start(self, pop: Optional[Population]):
+        state = load_checkpoint(self.checkpoint_path, self.fingerprint)
+        if state is not None and (
+                pop is None or state['genes'].shape[1] == pop.genes.shape[1]):
+            logger.info('Resuming GA from checkpoint %s at iteration %d',
+                        self.checkpoint_path, int(state['iteration']))
+            restore_rng(self.genetic_op.rng, state)
+            restore_tuning(self.genetic_op, GENETIC_PARAMETERS, state,
+                           self.controller)
+            self.population = Population(state['genes'], state['fitness'])
+            self.best_solution = state['best_solution'].tolist()
+            self.best_fitness = float(state['best_fitness'])
+            return int(state['iteration']) + 1, int(state['stagnant'])
+        if pop is None:
+            raise ValueError('No initial population and no checkpoint')
+        self.population = pop
+        self._record(pop)
+        return 1, 0
+
+    def _save(self, iteration: int, stagnant: int) -> None:
+        if not self.checkpoint_path:
+            return
+        save_checkpoint(
+            self.checkpoint_path,
+            rng=self.genetic_op.rng,
+            fingerprint=self.fingerprint,
+            genes=self.population.genes,
+            fitness=self.population.fitness,
+            iteration=iteration,
+            stagnant=stagnant,
+            best_solution=self.best_solution,
+            best_fitness=self.best_fitness,
+            **tuning_state(self.genetic_op, GENETIC_PARAMETERS,
+                           self.controller)
+        )
+
+    def run(
+        self,
+        pop: Population,
+        callback: Callable[[Progress], None] = None
+    ) -> List[int]:
+        """Run to completion, passing each progress report to callback.
+
+        Returns:
+            Best assignment found
+        """
+        for progress in self.iterate(pop):
+            if callback is not None:
+                callback(progress)
+        return self.best_solution
+
+    def _record(self, pop: Population) -> bool:
+        genes, fitness = pop.best()
+        if fitness < self.best_fitness:
+            self.best_solution = genes.tolist()
+            self.best_fitness = fitness
+            return True
+        return False
+
+    def _progress(
+        self, iteration: int, started: float, improved: bool
+    ) -> Progress:
+        return Progress(
+            iteration=iteration,
+            best_solution=list(self.best_solution),
+            best_fitness=self.best_fitness,
+            elapsed=time.monotonic() - started,
+            improved=improved
+        )
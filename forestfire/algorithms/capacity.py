@@ -0,0 +1,178 @@
+"""Capacity-preserving genetic operators for picker assignments.
+
+This module provides operators that never produce an over-capacity picker,
+so offspring need no post-hoc repair. Each operator keeps per-picker load
+counters up to date incrementally instead of recounting the assignment.
+"""
+
+from typing import List, Sequence, Tuple
+import numpy as np
+
+
+class LoadTracker:
+    """Incrementally maintained picker loads for a single assignment.
+
+    Besides the load counters, the tracker keeps the set of pickers that
+    still have spare capacity in an array with O(1) insert, removal and
+    random draw.
+    """
+    def __init__(
+        self,
+        picker_capacities: Sequence[int],
+        assignment: Sequence[int] = ()
+    ):
+        self.capacities = list(picker_capacities)
+        self.loads = [0] * len(self.capacities)
+        self._open = list(range(len(self.capacities)))
+        self._position = list(range(len(self.capacities)))
+        for picker_id in self._open[:]:
+            if self.capacities[picker_id] <= 0:
+                self._close(picker_id)
+        for picker_id in assignment:
+            self.add(picker_id)
+
+    def has_room(self, picker_id: int) -> bool:
+        """Check whether a picker can take one more order"""
+        return self.loads[picker_id] < self.capacities[picker_id]
+
+    def open_pickers(self) -> List[int]:
+        """Return the pickers that still have spare capacity"""
+        return list(self._open)
+
+    def add(self, picker_id: int) -> None:
+        """Record one more order for a picker"""
+        self.loads[picker_id] += 1
+        if self.loads[picker_id] == self.capacities[picker_id]:
+            self._close(picker_id)
+
+    def remove(self, picker_id: int) -> None:
+        """Record one order less for a picker"""
+        if self.loads[picker_id] == self.capacities[picker_id]:
+            self._reopen(picker_id)
+        self.loads[picker_id] -= 1
+
+    def move(self, old_picker: int, new_picker: int) -> None:
+        """Record an order moving from one picker to another"""
+        if old_picker != new_picker:
+            self.remove(old_picker)
+            self.add(new_picker)
+
+    def random_open(self, rng: np.random.Generator) -> int:
+        """Draw a random picker with spare capacity, -1 if none"""
+        if not self._open:
+            return -1
+        return self._open[int(rng.integers(len(self._open)))]
+
+    def _close(self, picker_id: int) -> None:
+        idx = self._position[picker_id]
+        last = self._open.pop()
+        if last != picker_id:
+            self._open[idx] = last
+            self._position[last] = idx
+        self._position[picker_id] = -1
+
+    def _reopen(self, picker_id: int) -> None:
+        self._position[picker_id] = len(self._open)
+        self._open.append(picker_id)
+
+
+class CapacityPreservingOperator:
+    """Mutation and crossover operators that respect picker capacities.
+
+    All operators assume their inputs are capacity-feasible and return
+    capacity-feasible offspring by construction.
+    """
+    def __init__(
+        self,
+        picker_capacities: Sequence[int],
+        rng: np.random.Generator = None
+    ):
+        self.picker_capacities = list(picker_capacities)
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def tracker(self, assignment: Sequence[int] = ()) -> LoadTracker:
+        """Create a load tracker for an assignment"""
+        return LoadTracker(self.picker_capacities, assignment)
+
+    def swap_mutation(self, x: List[int]) -> List[int]:
+        """Exchange the pickers of two orders; loads are unchanged"""
+        y = x[:]
+        if len(y) < 2:
+            return y
+        i, j = self.rng.choice(len(y), 2, replace=False)
+        y[i], y[j] = y[j], y[i]
+        return y
+
+    def relocate_mutation(
+        self, x: List[int], loads: LoadTracker = None
+    ) -> List[int]:
+        """Move one random order to a picker with spare capacity.
+
+        Args:
+            x: Capacity-feasible assignment
+            loads: Tracker for x, updated in place when supplied
+
+        Returns:
+            Mutated assignment, or a copy of x if no picker has room
+        """
+        loads = loads if loads is not None else self.tracker(x)
+        y = x[:]
+        if not y:
+            return y
+        j = int(self.rng.integers(len(y)))
+        new_picker = loads.random_open(self.rng)
+        if new_picker >= 0:
+            loads.move(y[j], new_picker)
+            y[j] = new_picker
+        return y
+
+    def crossover(
+        self, x1: List[int], x2: List[int], mask: Sequence[bool] = None
+    ) -> Tuple[List[int], List[int]]:
+        """Capacity-aware crossover of two parents.
+
+        The first child takes x1's gene where mask is set and x2's gene
+        elsewhere, the second child the opposite. A gene that would overload
+        its picker falls back to the other parent's gene, then to a random
+        picker with spare capacity.
+
+        Args:
+            x1: First capacity-feasible parent
+            x2: Second capacity-feasible parent
+            mask: Gene origin for the first child, uniform when omitted
+
+        Returns:
+            Two capacity-feasible offspring
+        """
+        if mask is None:
+            mask = self.rng.random(len(x1)) < 0.5
+        mask = np.asarray(mask, dtype=bool)
+        return (self._inherit(x1, x2, mask),
+                self._inherit(x2, x1, mask))
+
+    def _inherit(
+        self, primary: List[int], secondary: List[int], mask: np.ndarray
+    ) -> List[int]:
+        loads = self.tracker()
+        child = [-1] * len(primary)
+        pending = []
+        for i in self.rng.permutation(len(primary)).tolist():
+            picker_id = primary[i] if mask[i] else secondary[i]
+            if loads.has_room(picker_id):
+                child[i] = picker_id
+                loads.add(picker_id)
+            else:
+                pending.append(i)
+
+        for i in pending:
+            picker_id = secondary[i] if mask[i] else primary[i]
+            if not loads.has_room(picker_id):
+                picker_id = loads.random_open(self.rng)
+                if picker_id < 0:
+                    raise ValueError(
+                        "Total picker capacity cannot cover "
+                        f"{len(primary)} orders"
+                    )
+            child[i] = picker_id
+            loads.add(picker_id)
+        return child
@@ -0,0 +1,95 @@
+"""Greedy constructive solver for picker assignments.
+
+This module builds a good capacity-feasible assignment deterministically in
+milliseconds, by regret insertion of groups of orders that share their
+aisles. It serves as the answer of last resort when no time is left for
+the metaheuristics and as a seed for their populations.
+"""
+
+import math
+from typing import Dict, List, Sequence, Tuple
+from forestfire.optimizer.services.incremental import IncrementalRouteCost
+from forestfire.optimizer.services.routing import RouteOptimizer
+from forestfire.utils.config import PICKER_CAPACITIES, PICKER_LOCATIONS
+
+
+class ConstructiveSolver:
+    """Regret insertion of aisle groups by marginal route cost.
+
+    Orders visiting the same set of aisles cost the same to add to a
+    picker, so they are inserted together. At every step the group whose
+    best and second-best picker differ most in marginal cost is given to
+    its best picker, as far as that picker's capacity allows; the rest of
+    the group stays pending.
+    """
+    def __init__(
+        self,
+        route_optimizer: RouteOptimizer = None,
+        picker_capacities: Sequence[int] = PICKER_CAPACITIES,
+        picker_locations: Sequence[Tuple[float, float]] = PICKER_LOCATIONS
+    ):
+        self.route_optimizer = route_optimizer or RouteOptimizer()
+        self.picker_capacities = list(picker_capacities)
+        self.picker_locations = picker_locations
+
+    def solve(
+        self,
+        orders_assign: List[List[Tuple[float, float]]]
+    ) -> List[int]:
+        """Assign every order to a picker.
+
+        Args:
+            orders_assign: List of orders to assign
+
+        Returns:
+            Picker index per order
+
+        Raises:
+            ValueError: If the pickers cannot take all orders
+        """
+        size = len(orders_assign)
+        if sum(self.picker_capacities) < size:
+            raise ValueError(
+                f"Total picker capacity {sum(self.picker_capacities)} "
+                f"cannot cover {size} orders"
+            )
+        cost = IncrementalRouteCost(
+            orders_assign, [-1] * size, self.route_optimizer,
+            self.picker_locations
+        )
+        remaining = list(self.picker_capacities)
+
+        groups: Dict[Tuple[int, ...], List[int]] = {}
+        for order, aisles in enumerate(cost.order_aisles):
+            groups.setdefault(tuple(sorted(set(aisles))), []).append(order)
+        pending = [
+            sorted(orders, key=lambda o: (
+                sum(x for x, _ in orders_assign[o]), o))
+            for _, orders in sorted(groups.items())
+        ]
+
+        while pending:
+            choice, choice_picker = 0, -1
+            choice_key = (-math.inf, -math.inf)
+            for index, orders in enumerate(pending):
+                deltas = sorted(
+                    (cost.insertion_delta(orders[0], p), p)
+                    for p, room in enumerate(remaining) if room > 0
+                )
+                regret = (deltas[1][0] - deltas[0][0]
+                          if len(deltas) > 1 else math.inf)
+                key = (regret, len(orders))
+                if key > choice_key:
+                    choice, choice_picker, choice_key = (
+                        index, deltas[0][1], key
+                    )
+            orders = pending[choice]
+            taken = orders[:remaining[choice_picker]]
+            for order in taken:
+                cost.insert(order, choice_picker)
+            remaining[choice_picker] -= len(taken)
+            if len(taken) < len(orders):
+                pending[choice] = orders[len(taken):]
+            else:
+                pending.pop(choice)
+        return list(cost.assignment)
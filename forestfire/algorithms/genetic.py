@@ -6,16 +6,37 @@ to optimize picker routes in a warehouse environment.
 
 import random
 import numpy as np
-from typing import List, Tuple
+from typing import List, Optional, Sequence, Tuple
 from forestfire.utils.config import (
-    NUM_PICKERS, PICKER_CAPACITIES, PC
+    PICKER_CAPACITIES, PC, PM, N_POP, TOURNAMENT_SIZE, DEDUPLICATE_POPULATION,
+    AFFINITY_THRESHOLD
 )
 from forestfire.optimizer.services.routing import RouteOptimizer
+from .affinity import AffinityEdges, affinity_clusters, order_affinity
+from .capacity import CapacityPreservingOperator, LoadTracker
+from .population import Population, picker_loads
+from .selection import SelectionEngine
 
 class GeneticOperator:
     """Class for genetic algorithm operations"""
-    def __init__(self, route_optimizer: RouteOptimizer):
+    def __init__(
+        self,
+        route_optimizer: RouteOptimizer,
+        rng: np.random.Generator = None
+    ):
         self.route_optimizer = route_optimizer
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.capacity_op = CapacityPreservingOperator(
+            PICKER_CAPACITIES, self.rng
+        )
+        self.selection = SelectionEngine(
+            self.rng, deduplicate=DEDUPLICATE_POPULATION
+        )
+        self.pc = PC
+        self.pm = PM
+        self.tournament_size = TOURNAMENT_SIZE
+        # Cluster number per order once affinity crossover is enabled
+        self.clusters = None
 
     def crossover(
         self, x1: List[int], x2: List[int]
@@ -23,16 +44,18 @@ class GeneticOperator:
         """Perform crossover between two parent solutions"""
         q = random.uniform(0, 1)
 
-        if q <= PC:
+        if q <= self.pc:
             g = random.randint(1, 2)
             if g == 1:
                 y1, y2 = self._single_point_crossover(x1, x2)
             else:
                 y1, y2 = self._uniform_crossover(x1, x2)
 
-            # Ensure offspring satisfy picker capacity constraints
-            y1 = self._enforce_capacity_constraints(y1, PICKER_CAPACITIES)
-            y2 = self._enforce_capacity_constraints(y2, PICKER_CAPACITIES)
+            # Keep each gene where its picker has room, otherwise fall back
+            # to the other child's gene or a picker with spare capacity
+            y1, y2 = self.capacity_op.crossover(
+                y1, y2, mask=np.ones(len(y1), dtype=bool)
+            )
         else:
             y1 = x1[:]
             y2 = x2[:]
@@ -72,29 +95,15 @@ class GeneticOperator:
         self, offspring: List[int], picker_capacities: List[int]
     ) -> List[int]:
         """Ensure solution satisfies picker capacity constraints"""
-        assigned_counts = [0] * NUM_PICKERS
-        for picker_id in offspring:
-            assigned_counts[picker_id] += 1
-
-        over_capacity = {
-            picker_id: count - picker_capacities[picker_id]
-            for picker_id, count in enumerate(assigned_counts)
-            if count > picker_capacities[picker_id]
-        }
-
+        loads = LoadTracker(picker_capacities, offspring)
         for i, picker_id in enumerate(offspring):
-            if picker_id in over_capacity and over_capacity[picker_id] > 0:
-                valid_pickers = [
-                    p for p in range(NUM_PICKERS)
-                    if assigned_counts[p] < picker_capacities[p]
-                ]
-
-                if valid_pickers:
-                    new_picker = random.choice(valid_pickers)
-                    offspring[i] = new_picker
-                    assigned_counts[picker_id] -= 1
-                    assigned_counts[new_picker] += 1
-                    over_capacity[picker_id] -= 1
+            if loads.loads[picker_id] <= picker_capacities[picker_id]:
+                continue
+            new_picker = loads.random_open(self.rng)
+            if new_picker < 0:
+                break
+            offspring[i] = new_picker
+            loads.move(picker_id, new_picker)
 
         return offspring
 
@@ -102,29 +111,11 @@ class GeneticOperator:
         self, x: List[int], picker_capacities: List[int]
     ) -> List[int]:
         """Mutate solution while respecting capacity constraints"""
-        y = x[:]
-        attempts = 10
-
-        while attempts > 0:
-            j = np.random.randint(len(x))
-            assigned_picker = y[j]
-            new_picker = np.random.randint(NUM_PICKERS)
-
-            y[j] = new_picker
-
-            assigned_counts = [
-                y.count(picker_id) for picker_id in range(NUM_PICKERS)
-            ]
-            if all(
-                assigned_counts[picker_id] <= picker_capacities[picker_id]
-                for picker_id in range(NUM_PICKERS)
-            ):
-                return y
-
-            y[j] = assigned_picker
-            attempts -= 1
-
-        return x
+        loads = LoadTracker(picker_capacities, x)
+        if any(load > capacity
+               for load, capacity in zip(loads.loads, picker_capacities)):
+            return x
+        return self.capacity_op.relocate_mutation(x, loads)
 
     def tournament_selection(
         self,
@@ -136,6 +127,272 @@ class GeneticOperator:
         winner = sorted(tournament_contestants, key=lambda x: x[1])[0]
         return winner[0]
 
+    def tournament_selection_indices(
+        self, fitness: np.ndarray, count: int, tournament_size: int
+    ) -> np.ndarray:
+        """Select parent row indices by vectorized tournaments on fitness"""
+        return self.selection.tournament(fitness, count, tournament_size)
+
+    def evolve(
+        self,
+        pop: Population,
+        evaluator,
+        pop_size: int = N_POP,
+        picker_capacities: Sequence[int] = PICKER_CAPACITIES
+    ) -> Population:
+        """Run one generation: selection, crossover, mutation and survival.
+
+        Offspring counts follow the current rates pc and pm for the given
+        population size, matching NC and NM for N_POP at the default rates.
+
+        Args:
+            pop: Current population
+            evaluator: Object whose evaluate(genes) returns fitness values
+            pop_size: Number of survivors to keep
+            picker_capacities: Capacity of each picker
+
+        Returns:
+            Next population, ordered by ascending fitness
+        """
+        num_crossover, num_mutation = self.offspring_counts(pop_size)
+        parents = self.tournament_selection_indices(
+            pop.fitness, num_crossover, self.tournament_size
+        )
+        offspring1, offspring2 = self.crossover_batch(
+            pop.genes[parents[0::2]],
+            pop.genes[parents[1::2]],
+            picker_capacities
+        )
+        mutants = self.mutate_batch(
+            pop.genes[self.rng.integers(0, len(pop), num_mutation)],
+            picker_capacities
+        )
+        offspring = np.concatenate([offspring1, offspring2, mutants])
+        return self.selection.survive(
+            pop, offspring, evaluator.evaluate(offspring), pop_size
+        )
+
+    def offspring_counts(self, pop_size: int) -> Tuple[int, int]:
+        """Number of crossover children and mutants made per generation"""
+        return 2 * round((pop_size * self.pc) / 2), round(pop_size * self.pm)
+
+    def use_affinity(
+        self,
+        orders_assign: List[List[Tuple[float, float]]],
+        affinity: Optional[AffinityEdges] = None
+    ) -> None:
+        """Cross over whole spatial clusters of the given orders.
+
+        Args:
+            orders_assign: Orders of the wave being optimized
+            affinity: Precomputed affinity edges, computed when omitted
+        """
+        if affinity is None:
+            affinity = order_affinity(orders_assign,
+                                      min_affinity=AFFINITY_THRESHOLD)
+        self.clusters = affinity_clusters(affinity, orders_assign)
+
+    def crossover_batch(
+        self,
+        parents1: np.ndarray,
+        parents2: np.ndarray,
+        picker_capacities: Sequence[int]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Cross over a batch of parent pairs in one pass.
+
+        Each pair is crossed with probability pc, using single-point or
+        uniform crossover with equal chance. Once use_affinity has been
+        called, both operate on spatial clusters instead of single orders,
+        so each cluster comes whole from one parent and the cut point falls
+        between aisles.
+
+        Offspring are capacity-feasible by construction, as in
+        CapacityPreservingOperator.crossover: visiting each row's orders
+        in random order, a child keeps the chosen parent's gene while that
+        picker has room, falls back to the other parent's gene, and only
+        then to a random picker with spare capacity.
+
+        Args:
+            parents1: Matrix of first parents, one row per pair
+            parents2: Matrix of second parents, one row per pair
+            picker_capacities: Capacity of each picker
+
+        Returns:
+            Two offspring matrices with the same shape as the parents
+        """
+        pairs, orders_size = parents1.shape
+        units = np.arange(orders_size)
+        if self.clusters is not None and len(self.clusters) == orders_size:
+            units = self.clusters
+        size = int(units.max()) + 1 if orders_size else 0
+        if size > 1:
+            points = self.rng.integers(1, size, pairs)
+        else:
+            points = np.full(pairs, size)
+        single_point = np.arange(size) < points[:, None]
+        uniform = self.rng.random((pairs, size)) < 0.5
+        use_uniform = self.rng.random(pairs) < 0.5
+        keep = np.where(use_uniform[:, None], uniform, single_point)[:, units]
+        keep[self.rng.random(pairs) > self.pc] = True
+
+        chosen = np.concatenate([np.where(keep, parents1, parents2),
+                                 np.where(keep, parents2, parents1)])
+        other = np.concatenate([np.where(keep, parents2, parents1),
+                                np.where(keep, parents1, parents2)])
+        offspring = self._inherit_batch(chosen, other, picker_capacities)
+        return offspring[:pairs], offspring[pairs:]
+
+    def _inherit_batch(
+        self,
+        chosen: np.ndarray,
+        other: np.ndarray,
+        picker_capacities: Sequence[int]
+    ) -> np.ndarray:
+        """Capacity-aware inheritance for a whole matrix of children"""
+        capacities = np.asarray(picker_capacities)
+        num_pickers = len(capacities)
+        rows, orders_size = chosen.shape
+        if capacities.sum() < orders_size:
+            raise ValueError(
+                f"Total picker capacity {capacities.sum()} cannot cover "
+                f"{orders_size} orders"
+            )
+        row_keys = np.repeat(np.arange(rows) * num_pickers, orders_size)
+        priority = self.rng.random(rows * orders_size)
+        room = np.broadcast_to(capacities, (rows, num_pickers)).ravel()
+
+        # Chosen genes, then the other parent's, while the picker has room
+        child = chosen.ravel().copy()
+        pending = np.arange(child.size)
+        for source in (chosen.ravel(), other.ravel()):
+            keys = row_keys[pending] + source[pending]
+            fits = _within_room(keys, room, priority[pending])
+            child[pending[fits]] = source[pending[fits]]
+            room = room - np.bincount(keys[fits], minlength=room.size)
+            pending = pending[~fits]
+
+        if pending.size:
+            child[pending] = self._free_slots(
+                pending, room.reshape(rows, num_pickers), orders_size
+            )
+        return child.reshape(rows, orders_size)
+
+    def _free_slots(
+        self, moved: np.ndarray, spare: np.ndarray, orders_size: int
+    ) -> np.ndarray:
+        """Draw a random free picker slot of its row for each moved gene.
+
+        Args:
+            moved: Ascending flat gene positions to reassign
+            spare: Free slots per row and picker, enough for the moved genes
+            orders_size: Genes per row
+
+        Returns:
+            New picker for every moved gene
+        """
+        rows, num_pickers = spare.shape
+        moved_rows = moved // orders_size
+        spare = spare.ravel()
+        spare_rows = np.repeat(np.repeat(np.arange(rows), num_pickers), spare)
+        spare_pickers = np.repeat(np.tile(np.arange(num_pickers), rows), spare)
+        shuffle = np.argsort(spare_rows + self.rng.random(spare_rows.size))
+        spare_rows = spare_rows[shuffle]
+        spare_pickers = spare_pickers[shuffle]
+
+        moved_rank = (np.arange(moved.size)
+                      - np.searchsorted(moved_rows, moved_rows, side='left'))
+        slot = np.searchsorted(spare_rows, moved_rows, side='left') + moved_rank
+        return spare_pickers[slot]
+
+    def mutate_batch(
+        self, genes: np.ndarray, picker_capacities: Sequence[int]
+    ) -> np.ndarray:
+        """Reassign one random order per row to a picker with spare room"""
+        capacities = np.asarray(picker_capacities)
+        mutated = genes.copy()
+        rows = np.arange(len(mutated))
+        positions = self.rng.integers(0, mutated.shape[1], len(mutated))
+        current = mutated[rows, positions]
+
+        open_pickers = picker_loads(mutated, len(capacities)) < capacities
+        open_pickers[rows, current] = True
+        scores = np.where(
+            open_pickers, self.rng.random(open_pickers.shape), -1.0
+        )
+        mutated[rows, positions] = scores.argmax(axis=1)
+        return mutated
+
+    def repair_capacity_batch(
+        self, genes: np.ndarray, picker_capacities: Sequence[int]
+    ) -> np.ndarray:
+        """Move orders off over-capacity pickers for a whole gene matrix.
+
+        Within each (row, picker) group, orders beyond the picker's capacity
+        are chosen at random and reassigned to a random free slot of the same
+        row, so every row ends up capacity-feasible.
+
+        Args:
+            genes: Matrix of shape (rows, orders) with picker indices
+            picker_capacities: Capacity of each picker
+
+        Returns:
+            Repaired gene matrix
+        """
+        capacities = np.asarray(picker_capacities)
+        num_pickers = len(capacities)
+        rows, orders_size = genes.shape
+        if capacities.sum() < orders_size:
+            raise ValueError(
+                f"Total picker capacity {capacities.sum()} cannot cover "
+                f"{orders_size} orders"
+            )
+
+        loads = picker_loads(genes, num_pickers)
+        overflow = np.clip(loads - capacities, 0, None)
+        if not overflow.any():
+            return genes
+
+        # Genes on over-capacity pickers, ranked in random order inside
+        # their (row, picker) group; the first `overflow` of each move
+        candidates = np.flatnonzero(
+            overflow[np.arange(rows)[:, None], genes] > 0
+        )
+        keys = (candidates // orders_size) * num_pickers \
+            + genes.ravel()[candidates]
+        order = np.argsort(keys + self.rng.random(keys.size))
+        sorted_keys = keys[order]
+        rank = (np.arange(keys.size)
+                - np.searchsorted(sorted_keys, sorted_keys, side='left'))
+        moved = candidates[order[rank < overflow.ravel()[sorted_keys]]]
+        moved.sort()
+        repaired = genes.copy().ravel()
+        repaired[moved] = self._free_slots(
+            moved, np.clip(capacities - loads, 0, None), orders_size
+        )
+        return repaired.reshape(rows, orders_size)
+
+
+def _within_room(
+    keys: np.ndarray, room: np.ndarray, priority: np.ndarray
+) -> np.ndarray:
+    """Which genes fit when each (row, picker) key takes genes by priority.
+
+    Args:
+        keys: Flat (row, picker) index of every gene
+        room: Free slots per flat (row, picker) index
+        priority: Value in [0, 1) ordering genes within a key
+
+    Returns:
+        Mask of the genes among the first room[key] of their key
+    """
+    order = np.argsort(keys + priority, kind='stable')
+    sorted_keys = keys[order]
+    rank = (np.arange(keys.size)
+            - np.searchsorted(sorted_keys, sorted_keys, side='left'))
+    fits = np.empty(keys.size, dtype=bool)
+    fits[order] = rank < room[sorted_keys]
+    return fits
+
 # For backwards compatibility
 def crossover(x1: List[int], x2: List[int]) -> Tuple[List[int], List[int]]:
     """Legacy crossover function"""
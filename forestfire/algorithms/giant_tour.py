@@ -0,0 +1,283 @@
+"""Giant-tour permutation encoding for the genetic algorithm.
+
+This module provides an alternative chromosome in which an individual is a
+permutation of all orders. A dynamic-programming split decoder cuts the
+permutation into consecutive, capacity-feasible segments, one per picker, so
+every decoded assignment is feasible and no capacity repair is needed.
+Order crossover and inversion mutation operate on the permutations.
+"""
+
+from typing import Any, List, Sequence, Tuple
+import numpy as np
+from forestfire.optimizer.services.routing import RouteOptimizer
+from forestfire.utils.config import (
+    N_POP, PC, PM, TOURNAMENT_SIZE, PICKER_CAPACITIES, PICKER_LOCATIONS,
+    DEDUPLICATE_POPULATION
+)
+from .population import GENE_DTYPE, Population
+from .selection import SelectionEngine
+
+
+class SplitDecoder:
+    """Optimal split of an order permutation into picker segments.
+
+    Picker k takes the k-th consecutive segment of the permutation, of at
+    most its capacity (possibly empty). A segment's cost is the walk from
+    the picker's start to its first order plus the walk between consecutive
+    orders, measured along the RouteOptimizer's aisles and walkways. The
+    segment boundaries minimizing the total cost are found by dynamic
+    programming with sliding-window minima, in O(pickers * orders) time.
+    """
+    def __init__(
+        self,
+        orders_assign: List[List[Tuple[float, float]]],
+        route_optimizer: RouteOptimizer = None,
+        picker_locations: Sequence[Tuple[float, float]] = PICKER_LOCATIONS,
+        picker_capacities: Sequence[int] = PICKER_CAPACITIES
+    ):
+        route_optimizer = route_optimizer or RouteOptimizer()
+        self.left_walkway = route_optimizer.left_walkway
+        self.right_walkway = route_optimizer.right_walkway
+        self.step_between_rows = route_optimizer.step_between_rows
+        self.points = np.array(
+            [np.mean(locations, axis=0) if len(locations) else (0.0, 0.0)
+             for locations in orders_assign],
+            dtype=np.float64
+        ).reshape(-1, 2)
+        self.pickers = np.asarray(picker_locations, dtype=np.float64)
+        self.capacities = np.asarray(picker_capacities, dtype=np.int64)
+        if self.capacities.sum() < len(self.points):
+            raise ValueError(
+                f"Total picker capacity {self.capacities.sum()} cannot "
+                f"cover {len(self.points)} orders"
+            )
+
+    def walk_distance(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Aisle-aware walking distance between rows of two point arrays.
+
+        Points in the same aisle are joined directly along it; otherwise
+        the walk leaves through the cheaper walkway.
+        """
+        dy = np.abs(a[..., 1] - b[..., 1])
+        same_aisle = (a[..., 1] // self.step_between_rows
+                      == b[..., 1] // self.step_between_rows)
+        via_walkway = np.minimum(
+            np.abs(a[..., 0] - self.left_walkway)
+            + np.abs(b[..., 0] - self.left_walkway),
+            np.abs(a[..., 0] - self.right_walkway)
+            + np.abs(b[..., 0] - self.right_walkway)
+        )
+        return np.where(
+            same_aisle, np.abs(a[..., 0] - b[..., 0]), via_walkway
+        ) + dy
+
+    def encode(self, assignment: Sequence[int]) -> np.ndarray:
+        """Turn an assignment into a tour grouped by picker and aisle"""
+        assignment = np.asarray(assignment)
+        aisle = self.points[:, 1] // self.step_between_rows
+        return np.lexsort(
+            (self.points[:, 0], aisle, assignment)
+        ).astype(GENE_DTYPE)
+
+    def decode(self, tour: Sequence[int]) -> np.ndarray:
+        """Split a permutation of orders into a picker assignment.
+
+        Args:
+            tour: Permutation of order indices
+
+        Returns:
+            Picker index per order
+        """
+        tour = np.asarray(tour, dtype=np.int64)
+        size = len(tour)
+        assignment = np.zeros(size, dtype=GENE_DTYPE)
+        if size == 0:
+            return assignment
+        points = self.points[tour]
+        # prefix[t]: walk from the first to the t-th order of the tour
+        prefix = np.zeros(size)
+        prefix[1:] = np.cumsum(self.walk_distance(points[:-1], points[1:]))
+
+        num_pickers = len(self.capacities)
+        cost = np.full(size + 1, np.inf)
+        cost[0] = 0.0
+        entry_costs, empty = [], []
+        for k in range(num_pickers):
+            # Cost of a segment [i, j) is entry[i] + prefix[j-1]
+            entry = (cost[:-1]
+                     + self.walk_distance(self.pickers[k], points)
+                     - prefix)
+            window = _sliding_min(entry, int(self.capacities[k]))
+            candidate = np.full(size + 1, np.inf)
+            candidate[1:] = prefix + window
+            skip = cost <= candidate
+            cost = np.where(skip, cost, candidate)
+            entry_costs.append(entry)
+            empty.append(skip)
+
+        end = size
+        for k in range(num_pickers - 1, -1, -1):
+            if end == 0 or empty[k][end]:
+                continue
+            start = max(0, end - int(self.capacities[k]))
+            begin = start + int(np.argmin(entry_costs[k][start:end]))
+            assignment[tour[begin:end]] = k
+            end = begin
+        return assignment
+
+    def decode_batch(self, tours: np.ndarray) -> np.ndarray:
+        """Decode every row of a tour matrix"""
+        return np.array([self.decode(tour) for tour in tours],
+                        dtype=GENE_DTYPE).reshape(tours.shape)
+
+
+class DecodingEvaluator:
+    """Evaluator adapter that scores tours by their decoded assignments"""
+
+    def __init__(self, decoder: SplitDecoder, evaluator: Any):
+        self.decoder = decoder
+        self.evaluator = evaluator
+
+    def evaluate(self, tours: np.ndarray) -> np.ndarray:
+        """Return the fitness of every row of a tour matrix"""
+        return self.evaluator.evaluate(self.decoder.decode_batch(tours))
+
+
+class GiantTourOperator:
+    """Genetic operators on order permutations.
+
+    Offers the same evolve() interface as GeneticOperator, with populations
+    holding tours instead of assignments; evaluate them through a
+    DecodingEvaluator.
+    """
+    def __init__(
+        self,
+        decoder: SplitDecoder,
+        rng: np.random.Generator = None
+    ):
+        if len(decoder.points) > np.iinfo(GENE_DTYPE).max:
+            raise ValueError(
+                f"Giant-tour encoding supports at most "
+                f"{np.iinfo(GENE_DTYPE).max} orders"
+            )
+        self.decoder = decoder
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.selection = SelectionEngine(
+            self.rng, deduplicate=DEDUPLICATE_POPULATION
+        )
+        self.pc = PC
+        self.pm = PM
+        self.tournament_size = TOURNAMENT_SIZE
+
+    def random_tours(self, count: int, orders_size: int) -> np.ndarray:
+        """Sample uniformly random permutations"""
+        return self.rng.permuted(
+            np.tile(np.arange(orders_size, dtype=GENE_DTYPE), (count, 1)),
+            axis=1
+        )
+
+    def order_crossover_batch(
+        self, parents1: np.ndarray, parents2: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Order crossover (OX) of each pair of parent tours.
+
+        Each child keeps a random slice of one parent in place and fills the
+        remaining positions with the other parent's orders in their cyclic
+        order after the slice. Pairs are crossed with probability pc.
+        """
+        children1, children2 = parents1.copy(), parents2.copy()
+        size = parents1.shape[1]
+        if size < 2:
+            return children1, children2
+        for row in np.flatnonzero(self.rng.random(len(parents1)) <= self.pc):
+            start, end = np.sort(self.rng.choice(size + 1, 2, replace=False))
+            children1[row] = _order_crossover(
+                parents1[row], parents2[row], start, end
+            )
+            children2[row] = _order_crossover(
+                parents2[row], parents1[row], start, end
+            )
+        return children1, children2
+
+    def inversion_batch(self, tours: np.ndarray) -> np.ndarray:
+        """Reverse a random slice of every tour"""
+        mutated = tours.copy()
+        size = tours.shape[1]
+        if size < 2:
+            return mutated
+        for row in range(len(mutated)):
+            start, end = np.sort(self.rng.choice(size + 1, 2, replace=False))
+            mutated[row, start:end] = mutated[row, start:end][::-1]
+        return mutated
+
+    def offspring_counts(self, pop_size: int) -> Tuple[int, int]:
+        """Number of crossover children and mutants made per generation"""
+        return 2 * round((pop_size * self.pc) / 2), round(pop_size * self.pm)
+
+    def evolve(
+        self,
+        pop: Population,
+        evaluator: Any,
+        pop_size: int = N_POP,
+        picker_capacities: Sequence[int] = None
+    ) -> Population:
+        """Run one generation on a population of tours.
+
+        Args:
+            pop: Current population of tours
+            evaluator: DecodingEvaluator for the tours
+            pop_size: Number of survivors to keep
+            picker_capacities: Unused, capacities are enforced by decoding
+
+        Returns:
+            Next population, ordered by ascending fitness
+        """
+        del picker_capacities
+        num_crossover, num_mutation = self.offspring_counts(pop_size)
+        parents = self.selection.tournament(
+            pop.fitness, num_crossover, self.tournament_size
+        )
+        children1, children2 = self.order_crossover_batch(
+            pop.genes[parents[0::2]], pop.genes[parents[1::2]]
+        )
+        mutants = self.inversion_batch(
+            pop.genes[self.rng.integers(0, len(pop), num_mutation)]
+        )
+        offspring = np.concatenate([children1, children2, mutants])
+        return self.selection.survive(
+            pop, offspring, evaluator.evaluate(offspring), pop_size
+        )
+
+
+def _order_crossover(
+    keep: np.ndarray, fill: np.ndarray, start: int, end: int
+) -> np.ndarray:
+    size = len(keep)
+    child = np.empty_like(keep)
+    child[start:end] = keep[start:end]
+    taken = np.zeros(size, dtype=bool)
+    taken[keep[start:end]] = True
+    donor = np.roll(fill, -end)
+    positions = np.roll(np.arange(size), -end)[:size - (end - start)]
+    child[positions] = donor[~taken[donor]]
+    return child
+
+
+def _sliding_min(values: np.ndarray, width: int) -> np.ndarray:
+    """Minimum of values[max(0, e - width + 1) : e + 1] for every e.
+
+    Uses the van Herk/Gil-Werman block scheme, linear in len(values).
+    """
+    size = len(values)
+    if width <= 0:
+        return np.full(size, np.inf)
+    width = min(width, size)
+    padded = np.concatenate([np.full(width - 1, np.inf), values])
+    blocks = -(-len(padded) // width)
+    padded = np.concatenate(
+        [padded, np.full(blocks * width - len(padded), np.inf)]
+    ).reshape(blocks, width)
+    prefix = np.minimum.accumulate(padded, axis=1).ravel()
+    suffix = np.minimum.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    starts = np.arange(size)
+    return np.minimum(suffix[starts], prefix[starts + width - 1])
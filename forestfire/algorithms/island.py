@@ -0,0 +1,248 @@
+"""Island-model genetic algorithm across CPU cores.
+
+This module evolves several sub-populations in separate processes with the
+regular GeneticOperator. Islands only interact by sending copies of their
+best individuals to neighbouring islands every few generations, so the
+search scales across cores with very little synchronization.
+"""
+
+import logging
+import multiprocessing
+import queue
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from forestfire.optimizer.models.problem import ProblemInstance
+from forestfire.optimizer.services.evaluation import (
+    SerialEvaluator, SharedProblem
+)
+from forestfire.optimizer.services.routing import RouteOptimizer
+from forestfire.utils.config import (
+    N_POP, MAX_IT, PICKER_CAPACITIES, PICKER_LOCATIONS, NUM_ISLANDS,
+    MIGRATION_INTERVAL, NUM_MIGRANTS, MIGRATION_TOPOLOGY, CROSSOVER
+)
+from .anytime import CancellationToken, Deadline, should_stop
+from .genetic import GeneticOperator
+from .population import Population, random_feasible_genes
+
+logger = logging.getLogger(__name__)
+
+TOPOLOGIES = ('ring', 'fully_connected', 'random')
+
+
+class IslandModel:
+    """Runs independent GA islands that periodically exchange elites.
+
+    Attributes:
+        num_islands: Number of sub-populations, one process each
+        island_size: Survivors kept per island
+        migration_interval: Generations between migrations, 0 disables them
+        migrants: Best individuals sent per migration
+        topology: 'ring', 'fully_connected' or 'random'
+        crossover: 'positional', or 'affinity' to keep order clusters
+            together on every island
+        seed: Seed for the per-island random streams
+    """
+    def __init__(
+        self,
+        num_islands: int = NUM_ISLANDS,
+        island_size: int = None,
+        migration_interval: int = MIGRATION_INTERVAL,
+        migrants: int = NUM_MIGRANTS,
+        topology: str = MIGRATION_TOPOLOGY,
+        crossover: str = CROSSOVER,
+        seed: Optional[int] = None
+    ):
+        if topology not in TOPOLOGIES:
+            raise ValueError(
+                f"Unknown migration topology {topology!r}, "
+                f"expected one of {TOPOLOGIES}"
+            )
+        self.num_islands = max(1, num_islands)
+        self.island_size = island_size or max(2, N_POP // self.num_islands)
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.topology = topology
+        self.crossover = crossover
+        self.seed = seed
+
+    def run(
+        self,
+        orders_assign: List[Any],
+        picktasks: List[Any],
+        stage_result: Any,
+        generations: int = MAX_IT,
+        initial: Population = None,
+        deadline: Optional[Deadline] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[List[int], float]:
+        """Evolve all islands and return the global best.
+
+        Islands check the deadline and a shared stop signal, set once the
+        token is cancelled, before every generation, and report their
+        best-so-far individual when they stop early.
+
+        Args:
+            orders_assign: List of orders to assign
+            picktasks: List of picking tasks
+            stage_result: Staging area result data
+            generations: Generations evolved by every island
+            initial: Optional seed population, dealt round-robin to islands
+            deadline: Stop evolving by this deadline
+            cancel_token: Stop evolving once cancelled
+
+        Returns:
+            Best assignment found on any island and its fitness
+        """
+        shared = SharedProblem(ProblemInstance.from_lists(
+            orders_assign, picktasks, stage_result
+        ))
+        context = multiprocessing.get_context()
+        inboxes = [context.Queue() for _ in range(self.num_islands)]
+        results = context.Queue()
+        stop = context.Event()
+        seeds = np.random.SeedSequence(self.seed).spawn(self.num_islands)
+        settings = {
+            'generations': generations,
+            'migration_interval': self.migration_interval,
+            'migrants': self.migrants,
+            'topology': self.topology,
+            'affinity': self.crossover == 'affinity',
+            'island_size': self.island_size,
+            'picker_capacities': list(PICKER_CAPACITIES),
+            'picker_locations': list(PICKER_LOCATIONS),
+            # Wall-clock timestamp, as monotonic clocks are per process
+            'deadline': (time.time() + deadline.remaining()
+                         if deadline is not None else None)
+        }
+        processes = []
+        try:
+            for island_id in range(self.num_islands):
+                start = (initial[island_id::self.num_islands]
+                         if initial is not None else None)
+                process = context.Process(
+                    target=_run_island,
+                    args=(island_id, shared.name, shared.layout, settings,
+                          seeds[island_id], start, inboxes, results, stop),
+                    daemon=True
+                )
+                process.start()
+                processes.append(process)
+
+            best: Tuple[List[int], float] = ([], float('inf'))
+            for _ in processes:
+                island_id, genes, fitness = _next_result(
+                    results, processes, stop, cancel_token
+                )
+                logger.info('Island %d finished: Best Solution = %f',
+                            island_id, fitness)
+                if fitness < best[1]:
+                    best = (genes, fitness)
+            for process in processes:
+                process.join()
+            return best
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            shared.close()
+
+
+def migration_targets(
+    island_id: int,
+    num_islands: int,
+    topology: str,
+    rng: np.random.Generator
+) -> List[int]:
+    """Return the islands that receive this island's migrants"""
+    if num_islands < 2:
+        return []
+    if topology == 'ring':
+        return [(island_id + 1) % num_islands]
+    others = [i for i in range(num_islands) if i != island_id]
+    if topology == 'fully_connected':
+        return others
+    return [others[int(rng.integers(len(others)))]]
+
+
+def _next_result(
+    results: Any,
+    processes: List[Any],
+    stop: Any,
+    cancel_token: Optional[CancellationToken]
+) -> Tuple:
+    while True:
+        if cancel_token is not None and cancel_token.cancelled:
+            stop.set()
+        try:
+            return results.get(timeout=0.1)
+        except queue.Empty:
+            failed = [p for p in processes if p.exitcode not in (None, 0)]
+            if failed:
+                raise RuntimeError(
+                    f"Island process exited with code {failed[0].exitcode}"
+                ) from None
+
+
+def _run_island(
+    island_id: int,
+    shm_name: str,
+    layout: Dict[str, Tuple[int, str, Tuple[int, ...]]],
+    settings: Dict[str, Any],
+    seed: np.random.SeedSequence,
+    initial: Optional[Population],
+    inboxes: List[Any],
+    results: Any,
+    stop: Any
+) -> None:
+    # Migrants left unread when a neighbour finishes must not block exit
+    for inbox in inboxes:
+        inbox.cancel_join_thread()
+
+    shm, problem = SharedProblem.attach(shm_name, layout)
+    orders_assign, picktasks, stage_result = problem.to_lists()
+    rng = np.random.default_rng(seed)
+    genetic_op = GeneticOperator(RouteOptimizer(), rng)
+    if settings['affinity']:
+        genetic_op.use_affinity(orders_assign)
+    evaluator = SerialEvaluator(
+        genetic_op.route_optimizer, orders_assign, picktasks, stage_result,
+        settings['picker_locations']
+    )
+    size = settings['island_size']
+    capacities = settings['picker_capacities']
+
+    if initial is None or len(initial) == 0:
+        genes = random_feasible_genes(
+            rng, size, len(orders_assign), capacities
+        )
+        pop = Population(genes, evaluator.evaluate(genes))
+    else:
+        pop = initial.truncate(size)
+
+    deadline = (Deadline.at(settings['deadline'])
+                if settings['deadline'] is not None else None)
+    interval = settings['migration_interval']
+    last_duration = 0.0
+    for generation in range(1, settings['generations'] + 1):
+        if stop.is_set() or should_stop(deadline, reserve=last_duration):
+            break
+        generation_start = time.monotonic()
+        pop = genetic_op.evolve(pop, evaluator, size, capacities)
+        last_duration = time.monotonic() - generation_start
+        if interval <= 0 or generation % interval:
+            continue
+        elite = pop[:settings['migrants']]
+        for target in migration_targets(island_id, len(inboxes),
+                                        settings['topology'], rng):
+            inboxes[target].put((elite.genes, elite.fitness))
+        while True:
+            try:
+                genes, fitness = inboxes[island_id].get_nowait()
+            except queue.Empty:
+                break
+            pop = genetic_op.selection.survive(pop, genes, fitness, size)
+
+    genes, fitness = pop.best()
+    results.put((island_id, genes.tolist(), fitness))
+    shm.close()
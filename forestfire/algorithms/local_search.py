@@ -0,0 +1,215 @@
+"""Local-search refinement of a final picker assignment.
+
+This module intensifies the search around the GA's best solution with
+simulated annealing or tabu search over relocate and swap moves. Moves are
+scored with the incremental aisle-count surrogate, and the refined solution
+is only kept if the real route cost confirms the improvement.
+"""
+
+import logging
+import math
+import time
+from typing import Any, List, Optional, Sequence, Tuple
+import numpy as np
+from forestfire.optimizer.services.incremental import IncrementalRouteCost
+from forestfire.optimizer.services.routing import RouteOptimizer
+from forestfire.utils.config import (
+    PICKER_CAPACITIES, PICKER_LOCATIONS, REFINE_METHOD, TABU_TENURE
+)
+from .anytime import CancellationToken, Deadline, should_stop
+from .capacity import LoadTracker
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('annealing', 'tabu')
+
+# Moves between two clock and cancellation checks
+_CHECK_EVERY = 256
+
+
+class LocalSearch:
+    """Simulated annealing or tabu search over relocate and swap moves.
+
+    Attributes:
+        method: 'annealing' or 'tabu'
+        time_limit: Seconds spent searching
+        max_moves: Optional cap on the number of moves tried
+        tabu_tenure: Iterations a moved order stays tabu
+        candidates: Moves sampled per tabu iteration
+    """
+    def __init__(
+        self,
+        route_optimizer: RouteOptimizer,
+        rng: np.random.Generator = None,
+        method: str = REFINE_METHOD,
+        time_limit: float = 5.0,
+        max_moves: Optional[int] = None,
+        tabu_tenure: int = TABU_TENURE,
+        candidates: int = 32,
+        picker_capacities: Sequence[int] = PICKER_CAPACITIES,
+        picker_locations: Sequence[Tuple[float, float]] = PICKER_LOCATIONS
+    ):
+        if method not in METHODS:
+            raise ValueError(
+                f"Unknown local search method {method!r}, "
+                f"expected one of {METHODS}"
+            )
+        self.route_optimizer = route_optimizer
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.method = method
+        self.time_limit = time_limit
+        self.max_moves = max_moves
+        self.tabu_tenure = tabu_tenure
+        self.candidates = max(1, candidates)
+        self.picker_capacities = list(picker_capacities)
+        self.picker_locations = picker_locations
+
+    def refine(
+        self,
+        assignment: Sequence[int],
+        orders_assign: List[Any],
+        evaluator: Any,
+        deadline: Optional[Deadline] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[List[int], float]:
+        """Search around an assignment and keep the better of the two.
+
+        Args:
+            assignment: Capacity-feasible starting assignment
+            orders_assign: List of orders to assign
+            evaluator: Fitness evaluator used to confirm the result
+            deadline: Optional outer deadline, tighter than time_limit
+            cancel_token: Optional token to stop early
+
+        Returns:
+            The refined assignment, or the original one if refinement did
+            not lower its real cost, and its fitness
+        """
+        cost = IncrementalRouteCost(
+            orders_assign, assignment, self.route_optimizer,
+            self.picker_locations
+        )
+        limit = Deadline.after(self.time_limit)
+        if deadline is not None and deadline.remaining() < limit.remaining():
+            limit = deadline
+        search = self._anneal if self.method == 'annealing' else self._tabu
+        candidate = search(cost, limit, cancel_token)
+
+        genes = np.array([list(assignment), candidate])
+        original_fitness, fitness = evaluator.evaluate(genes)
+        logger.info('Local search: %.2f -> %.2f', original_fitness, fitness)
+        if fitness < original_fitness:
+            return candidate, float(fitness)
+        return list(assignment), float(original_fitness)
+
+    def _random_move(
+        self, cost: IncrementalRouteCost, tracker: LoadTracker
+    ) -> Optional[Tuple[str, int, int]]:
+        size = len(cost.assignment)
+        order = int(self.rng.integers(size))
+        if self.rng.random() < 0.5:
+            picker_id = tracker.random_open(self.rng)
+            if picker_id >= 0 and picker_id != cost.assignment[order]:
+                return ('relocate', order, picker_id)
+        other = int(self.rng.integers(size))
+        if cost.assignment[order] != cost.assignment[other]:
+            return ('swap', order, other)
+        return None
+
+    @staticmethod
+    def _delta(cost: IncrementalRouteCost, move: Tuple[str, int, int]) -> float:
+        kind, first, second = move
+        if kind == 'relocate':
+            return cost.relocate_delta(first, second)
+        return cost.swap_delta(first, second)
+
+    @staticmethod
+    def _apply(
+        cost: IncrementalRouteCost,
+        tracker: LoadTracker,
+        move: Tuple[str, int, int]
+    ) -> None:
+        kind, first, second = move
+        if kind == 'relocate':
+            tracker.move(cost.assignment[first], second)
+            cost.relocate(first, second)
+        else:
+            cost.swap(first, second)
+
+    def _should_stop(self, moves, limit, cancel_token) -> bool:
+        if self.max_moves is not None and moves >= self.max_moves:
+            return True
+        return (moves % _CHECK_EVERY == 0
+                and should_stop(limit, cancel_token) is not None)
+
+    def _anneal(
+        self,
+        cost: IncrementalRouteCost,
+        limit: Deadline,
+        cancel_token: Optional[CancellationToken]
+    ) -> List[int]:
+        tracker = LoadTracker(self.picker_capacities, cost.assignment)
+        samples = [self._random_move(cost, tracker) for _ in range(64)]
+        deltas = [abs(self._delta(cost, m)) for m in samples if m]
+        start_temperature = max(np.mean(deltas) if deltas else 1.0, 1e-6)
+
+        started = time.monotonic()
+        best, best_total = list(cost.assignment), cost.total
+        moves = 0
+        while not self._should_stop(moves, limit, cancel_token):
+            moves += 1
+            move = self._random_move(cost, tracker)
+            if move is None:
+                continue
+            # Cool geometrically from start_temperature to 1/1000 of it
+            progress = (time.monotonic() - started) / max(
+                self.time_limit, 1e-9)
+            if self.max_moves:
+                progress = max(progress, moves / self.max_moves)
+            temperature = start_temperature * 1e-3 ** min(progress, 1.0)
+            delta = self._delta(cost, move)
+            if delta > 0 and (self.rng.random()
+                              >= math.exp(-delta / temperature)):
+                continue
+            if delta > 0 and cost.total <= best_total:
+                # Leaving the best state seen so far
+                best, best_total = list(cost.assignment), cost.total
+            self._apply(cost, tracker, move)
+        if cost.total <= best_total:
+            return list(cost.assignment)
+        return best
+
+    def _tabu(
+        self,
+        cost: IncrementalRouteCost,
+        limit: Deadline,
+        cancel_token: Optional[CancellationToken]
+    ) -> List[int]:
+        tracker = LoadTracker(self.picker_capacities, cost.assignment)
+        tabu_until = [0] * len(cost.assignment)
+        best, best_total = list(cost.assignment), cost.total
+        iteration = moves = 0
+        while not self._should_stop(moves, limit, cancel_token):
+            iteration += 1
+            chosen, chosen_delta = None, math.inf
+            for _ in range(self.candidates):
+                moves += 1
+                move = self._random_move(cost, tracker)
+                if move is None:
+                    continue
+                delta = self._delta(cost, move)
+                orders = move[1:] if move[0] == 'swap' else move[1:2]
+                aspiration = cost.total + delta < best_total
+                if (all(tabu_until[o] < iteration for o in orders)
+                        or aspiration) and delta < chosen_delta:
+                    chosen, chosen_delta = move, delta
+            if chosen is None:
+                continue
+            if chosen_delta > 0 and cost.total <= best_total:
+                best, best_total = list(cost.assignment), cost.total
+            self._apply(cost, tracker, chosen)
+            for order in (chosen[1:] if chosen[0] == 'swap' else chosen[1:2]):
+                tabu_until[order] = iteration + self.tabu_tenure
+        if cost.total <= best_total:
+            return list(cost.assignment)
+        return best
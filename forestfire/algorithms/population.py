@@ -0,0 +1,145 @@
+"""Array-backed population container for the genetic algorithm.
+
+This module stores a GA population as a 2-D int16 gene matrix (one row per
+individual, one column per order) with a parallel fitness vector, together
+with vectorized helpers shared by the batch genetic operators.
+"""
+
+from dataclasses import dataclass
+from typing import Any, List, Sequence, Tuple
+import numpy as np
+
+GENE_DTYPE = np.int16
+
+# Rows generated per block when sampling random assignments, keeps the
+# temporary slot matrix bounded for very large waves.
+_SAMPLE_BLOCK_ROWS = 256
+
+
+@dataclass
+class Population:
+    """Population of picker assignments with their fitness scores.
+
+    Attributes:
+        genes: Matrix of shape (size, orders) holding picker indices
+        fitness: Vector of shape (size,) holding total route distances
+    """
+    genes: np.ndarray
+    fitness: np.ndarray
+
+    def __post_init__(self):
+        self.genes = np.asarray(self.genes, dtype=GENE_DTYPE)
+        self.fitness = np.asarray(self.fitness, dtype=np.float64)
+        if self.genes.ndim != 2:
+            raise ValueError(
+                f"Genes must be a 2-D matrix, got shape {self.genes.shape}"
+            )
+        if len(self.genes) != len(self.fitness):
+            raise ValueError(
+                f"Got {len(self.genes)} genomes but "
+                f"{len(self.fitness)} fitness values"
+            )
+
+    def __len__(self) -> int:
+        return len(self.fitness)
+
+    @classmethod
+    def from_pairs(cls, pairs: Sequence[Sequence[Any]]) -> 'Population':
+        """Build a population from legacy [assignment, fitness] pairs"""
+        genes = np.array([pair[0] for pair in pairs], dtype=GENE_DTYPE)
+        fitness = np.array([pair[1] for pair in pairs], dtype=np.float64)
+        return cls(genes, fitness)
+
+    def to_pairs(self) -> List[List[Any]]:
+        """Convert back to legacy [assignment, fitness] pairs"""
+        return [
+            [genes.tolist(), float(fitness)]
+            for genes, fitness in zip(self.genes, self.fitness)
+        ]
+
+    def merge(self, genes: np.ndarray, fitness: np.ndarray) -> 'Population':
+        """Return a new population with extra individuals appended"""
+        return Population(
+            np.concatenate([self.genes, np.asarray(genes, dtype=GENE_DTYPE)]),
+            np.concatenate([self.fitness, np.asarray(fitness)])
+        )
+
+    def sorted(self) -> 'Population':
+        """Return the population ordered by ascending fitness"""
+        order = np.argsort(self.fitness, kind='stable')
+        return Population(self.genes[order], self.fitness[order])
+
+    def truncate(self, size: int) -> 'Population':
+        """Keep the best individuals, ordered by ascending fitness.
+
+        Uses a linear-time partition so only the survivors get sorted.
+        """
+        if size >= len(self):
+            return self.sorted()
+        if size <= 0:
+            return self[:0]
+        keep = np.argpartition(self.fitness, size - 1)[:size]
+        keep = keep[np.argsort(self.fitness[keep], kind='stable')]
+        return Population(self.genes[keep], self.fitness[keep])
+
+    def __getitem__(self, index) -> 'Population':
+        return Population(self.genes[index], self.fitness[index])
+
+    def best(self) -> Tuple[np.ndarray, float]:
+        """Return the best genome and its fitness"""
+        idx = int(np.argmin(self.fitness))
+        return self.genes[idx], float(self.fitness[idx])
+
+
+def picker_loads(genes: np.ndarray, num_pickers: int) -> np.ndarray:
+    """Count orders per picker for every row of a gene matrix.
+
+    Args:
+        genes: Matrix of shape (rows, orders) with picker indices
+        num_pickers: Number of available pickers
+
+    Returns:
+        Matrix of shape (rows, num_pickers) with assigned order counts
+    """
+    rows = genes.shape[0]
+    keys = genes.astype(np.int64) + np.arange(rows)[:, None] * num_pickers
+    return np.bincount(
+        keys.ravel(), minlength=rows * num_pickers
+    ).reshape(rows, num_pickers)
+
+
+def random_feasible_genes(
+    rng: np.random.Generator,
+    count: int,
+    orders_size: int,
+    picker_capacities: Sequence[int]
+) -> np.ndarray:
+    """Sample capacity-feasible random assignments.
+
+    Every picker contributes one slot per unit of capacity; each row is a
+    random subset of those slots, so no picker is ever over capacity.
+
+    Args:
+        rng: Random generator to draw from
+        count: Number of assignments to sample
+        orders_size: Number of orders per assignment
+        picker_capacities: Capacity of each picker
+
+    Returns:
+        Matrix of shape (count, orders_size) with picker indices
+    """
+    slots = np.repeat(
+        np.arange(len(picker_capacities), dtype=GENE_DTYPE),
+        picker_capacities
+    )
+    if len(slots) < orders_size:
+        raise ValueError(
+            f"Total picker capacity {len(slots)} cannot cover "
+            f"{orders_size} orders"
+        )
+    genes = np.empty((count, orders_size), dtype=GENE_DTYPE)
+    for start in range(0, count, _SAMPLE_BLOCK_ROWS):
+        rows = min(_SAMPLE_BLOCK_ROWS, count - start)
+        block = rng.permuted(np.tile(slots, (rows, 1)), axis=1)
+        genes[start:start + rows] = block[:, :orders_size]
+    return genes
@@ -0,0 +1,263 @@
+"""Budget-aware portfolio of optimization engines.
+
+This module runs the ACO, GA and local-search engines in small steps under
+one shared budget. A scheduler keeps a running score of the improvement
+each engine delivers per unit of cost, gives the next step to the most
+productive one, and passes every new best solution to the other engines
+as an elite.
+"""
+
+import logging
+import time
+from typing import Any, List, Optional, Sequence, Tuple
+import numpy as np
+from forestfire.utils.config import (
+    N_POP, NUM_PICKERS, PICKER_CAPACITIES, PICKER_LOCATIONS, ACO_BATCH_SIZE,
+    PORTFOLIO_BUDGET, PORTFOLIO_UNIT, PORTFOLIO_SURROGATE_COST
+)
+from .alns import ALNSOptimizer
+from .ant_colony import AntColonyOptimizer
+from .anytime import CancellationToken, Deadline, should_stop
+from .genetic import GeneticOperator
+from .population import GENE_DTYPE, Population
+
+logger = logging.getLogger(__name__)
+
+UNITS = ('time', 'evaluations')
+
+# A step's outcome: best genes, their fitness and evaluations used, with
+# surrogate work counted in equivalent evaluations
+StepResult = Tuple[np.ndarray, float, float]
+
+
+class ColonyEngine:
+    """Runs ant batches on a persistent pheromone matrix"""
+    name = 'aco'
+
+    def __init__(
+        self,
+        aco: AntColonyOptimizer,
+        evaluator: Any,
+        orders_assign: List[Any],
+        ants_per_step: int = ACO_BATCH_SIZE,
+        picker_capacities: Sequence[int] = PICKER_CAPACITIES,
+        controller: Any = None
+    ):
+        self.aco = aco
+        self.evaluator = evaluator
+        self.orders_size = len(orders_assign)
+        self.ants_per_step = max(1, ants_per_step)
+        self.picker_capacities = list(picker_capacities)
+        self.controller = controller
+        self.pheromone = np.ones((self.orders_size, NUM_PICKERS))
+        self.heuristic = aco.calculate_heuristic(
+            orders_assign, PICKER_LOCATIONS
+        )
+
+    def step(self) -> StepResult:
+        """Build, evaluate and deposit one batch of ants"""
+        genes = np.array([
+            self.aco.build_solution(self.pheromone, self.heuristic,
+                                    self.orders_size, self.picker_capacities)
+            for _ in range(self.ants_per_step)
+        ], dtype=GENE_DTYPE)
+        fitness = self.evaluator.evaluate(genes)
+        for assignment, fitness_score in zip(genes, fitness):
+            self.aco.update_pheromone(self.pheromone, assignment,
+                                      fitness_score, self.orders_size)
+        if self.controller is not None:
+            self.controller.update_colony(self.aco, genes, fitness)
+        best = int(np.argmin(fitness))
+        return genes[best], float(fitness[best]), len(genes)
+
+    def inject(self, genes: np.ndarray, fitness: float) -> None:
+        """Reinforce the pheromone trail of an elite solution"""
+        self.aco.update_pheromone(self.pheromone, genes, fitness,
+                                  self.orders_size)
+
+
+class GeneticEngine:
+    """Evolves a persistent population one generation per step"""
+    name = 'ga'
+
+    def __init__(
+        self,
+        genetic_op: GeneticOperator,
+        evaluator: Any,
+        pop: Population,
+        pop_size: int = N_POP,
+        controller: Any = None
+    ):
+        self.genetic_op = genetic_op
+        self.evaluator = evaluator
+        self.pop = pop.sorted()
+        self.pop_size = pop_size
+        self.controller = controller
+
+    def step(self) -> StepResult:
+        """Run one generation"""
+        evaluations = sum(self.genetic_op.offspring_counts(self.pop_size))
+        self.pop = self.genetic_op.evolve(
+            self.pop, self.evaluator, self.pop_size
+        )
+        if self.controller is not None:
+            self.controller.update_genetic(
+                self.genetic_op, self.pop.genes, self.pop.fitness, evaluations
+            )
+        genes, fitness = self.pop.best()
+        return genes, fitness, evaluations
+
+    def inject(self, genes: np.ndarray, fitness: float) -> None:
+        """Add an elite to the population"""
+        self.pop = self.genetic_op.selection.survive(
+            self.pop, np.asarray(genes)[None, :], np.array([fitness]),
+            self.pop_size
+        )
+
+
+class LocalSearchEngine:
+    """Runs short ALNS bursts from the best solution it has been given.
+
+    A burst costs the two fitness evaluations that check its result plus
+    surrogate_cost evaluations per ALNS iteration it completed.
+    """
+    name = 'alns'
+
+    def __init__(
+        self,
+        alns: ALNSOptimizer,
+        evaluator: Any,
+        orders_assign: List[Any],
+        genes: np.ndarray,
+        fitness: float,
+        surrogate_cost: float = PORTFOLIO_SURROGATE_COST,
+        deadline: Optional[Deadline] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ):
+        self.alns = alns
+        self.evaluator = evaluator
+        self.orders_assign = orders_assign
+        self.genes = np.asarray(genes, dtype=GENE_DTYPE)
+        self.fitness = fitness
+        self.surrogate_cost = surrogate_cost
+        self.deadline = deadline
+        self.cancel_token = cancel_token
+
+    def step(self) -> StepResult:
+        """Run one burst of ALNS iterations from the current solution"""
+        solution, fitness = self.alns.run(
+            self.genes.tolist(), self.orders_assign, self.evaluator,
+            deadline=self.deadline, cancel_token=self.cancel_token
+        )
+        if fitness < self.fitness:
+            self.genes = np.array(solution, dtype=GENE_DTYPE)
+            self.fitness = fitness
+        return (self.genes, self.fitness,
+                2 + self.alns.iterations_run * self.surrogate_cost)
+
+    def inject(self, genes: np.ndarray, fitness: float) -> None:
+        """Restart from an elite if it beats the current solution"""
+        if fitness < self.fitness:
+            self.genes = np.asarray(genes, dtype=GENE_DTYPE)
+            self.fitness = fitness
+
+
+class PortfolioScheduler:
+    """Shares one budget between engines by their recent productivity.
+
+    Each engine's score is an exponential moving average of the relative
+    improvement of the global best per unit of cost, cost being seconds or
+    fitness evaluations. Every engine runs once first; afterwards the best
+    scoring engine gets the next step, except for a share of random steps
+    so that engines whose outlook has changed are not starved.
+
+    Attributes:
+        budget: Total seconds or evaluations to spend
+        unit: 'time' or 'evaluations'
+        exploration: Probability of giving a step to a random engine
+        smoothing: Weight of the latest step in an engine's score
+        spent: Cost spent per engine name
+    """
+    def __init__(
+        self,
+        engines: Sequence[Any],
+        budget: float = PORTFOLIO_BUDGET,
+        unit: str = PORTFOLIO_UNIT,
+        exploration: float = 0.1,
+        smoothing: float = 0.3,
+        rng: np.random.Generator = None
+    ):
+        if unit not in UNITS:
+            raise ValueError(
+                f"Unknown budget unit {unit!r}, expected one of {UNITS}"
+            )
+        if not engines:
+            raise ValueError('The portfolio needs at least one engine')
+        self.engines = list(engines)
+        self.budget = budget
+        self.unit = unit
+        self.exploration = exploration
+        self.smoothing = smoothing
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.scores = [None] * len(self.engines)
+        self.spent = {engine.name: 0.0 for engine in self.engines}
+
+    def run(
+        self,
+        genes: np.ndarray,
+        fitness: float,
+        deadline: Optional[Deadline] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[List[int], float]:
+        """Step engines until the budget, deadline or cancellation ends.
+
+        Args:
+            genes: Best known starting solution
+            fitness: Its fitness
+            deadline: Stop by this deadline even with budget left
+            cancel_token: Stop once cancelled
+
+        Returns:
+            Best assignment found by any engine and its fitness
+        """
+        best_genes, best_fitness = np.asarray(genes), float(fitness)
+        total = 0.0
+        while total < self.budget and not should_stop(deadline, cancel_token):
+            index = self._choose()
+            engine = self.engines[index]
+            started = time.monotonic()
+            step_genes, step_fitness, evaluations = engine.step()
+            cost = (time.monotonic() - started if self.unit == 'time'
+                    else evaluations)
+            cost = max(cost, 1e-9)
+            total += cost
+            self.spent[engine.name] += cost
+
+            gain = max(best_fitness - step_fitness, 0.0) / (
+                abs(best_fitness) or 1.0)
+            previous = self.scores[index]
+            self.scores[index] = (gain / cost if previous is None else
+                                  (1 - self.smoothing) * previous
+                                  + self.smoothing * gain / cost)
+            if step_fitness < best_fitness:
+                best_genes, best_fitness = step_genes, step_fitness
+                logger.info('Portfolio: %s improved best to %f',
+                            engine.name, best_fitness)
+                for other in self.engines:
+                    if other is not engine:
+                        other.inject(best_genes, best_fitness)
+        logger.info('Portfolio budget spent: %s', self.spent)
+        return np.asarray(best_genes).tolist(), best_fitness
+
+    def _choose(self) -> int:
+        for index, score in enumerate(self.scores):
+            if score is None:
+                return index
+        if self.rng.random() < self.exploration:
+            return int(self.rng.integers(len(self.engines)))
+        # Among equally productive engines, favour the least funded one
+        top = max(self.scores)
+        return min(
+            (index for index, score in enumerate(self.scores) if score == top),
+            key=lambda index: self.spent[self.engines[index].name]
+        )
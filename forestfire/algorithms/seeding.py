@@ -0,0 +1,243 @@
+"""Cluster-first seeding of the initial population.
+
+This module builds spatially coherent starting assignments, in which each
+picker takes orders from a compact group of aisles, instead of starting the
+GA from uniformly random assignments only. Capacitated k-means and aisle
+sweeps provide the base clusterings, and capacity-preserving swaps turn
+them into diverse variants.
+"""
+
+from typing import List, Sequence, Tuple
+import numpy as np
+from forestfire.utils.config import (
+    PICKER_CAPACITIES, PICKER_LOCATIONS, SEED_RANDOM_SHARE,
+    SEED_PERTURBATION
+)
+from .population import GENE_DTYPE, random_feasible_genes
+
+# Scale of the y axis in clustering distances: changing aisles costs a
+# walkway detour, moving along an aisle does not
+AISLE_WEIGHT = 3.0
+
+
+def order_points(orders_assign: List[List[Tuple[float, float]]]) -> np.ndarray:
+    """Mean location of every order, one row per order"""
+    return np.array(
+        [np.mean(locations, axis=0) if len(locations) else (0.0, 0.0)
+         for locations in orders_assign],
+        dtype=np.float64
+    ).reshape(-1, 2)
+
+
+def capacitated_kmeans(
+    points: np.ndarray,
+    picker_capacities: Sequence[int],
+    rng: np.random.Generator,
+    iterations: int = 10
+) -> np.ndarray:
+    """Cluster orders into one capacity-bounded group per picker.
+
+    Centers start from k-means++ draws. Each assignment step hands out
+    order-center pairs by increasing distance, skipping full clusters, so
+    cluster k never exceeds the capacity of picker k.
+
+    Args:
+        points: Order locations, one row per order
+        picker_capacities: Capacity of each picker
+        rng: Random generator for the initial centers
+        iterations: Assignment and update rounds
+
+    Returns:
+        Picker index per order
+    """
+    capacities = np.asarray(picker_capacities)
+    scaled = points * (1.0, AISLE_WEIGHT)
+    size, clusters = len(points), len(capacities)
+    if capacities.sum() < size:
+        raise ValueError(
+            f"Total picker capacity {capacities.sum()} cannot cover "
+            f"{size} orders"
+        )
+    if size == 0:
+        return np.zeros(0, dtype=GENE_DTYPE)
+    centers = np.empty((clusters, 2))
+    centers[0] = scaled[rng.integers(size)]
+    for k in range(1, clusters):
+        nearest = np.min(
+            ((scaled[:, None] - centers[None, :k]) ** 2).sum(-1), axis=1
+        )
+        total = nearest.sum()
+        choice = (rng.choice(size, p=nearest / total) if total > 0
+                  else rng.integers(size))
+        centers[k] = scaled[choice]
+
+    assignment = np.zeros(size, dtype=GENE_DTYPE)
+    for _ in range(iterations):
+        distances = np.sqrt(
+            ((scaled[:, None] - centers[None]) ** 2).sum(-1)
+        )
+        nearest = distances.argmin(axis=1)
+        if np.all(np.bincount(nearest, minlength=clusters) <= capacities):
+            assignment[:] = nearest
+        else:
+            loads = np.zeros(clusters, dtype=np.int64)
+            placed = np.zeros(size, dtype=bool)
+            remaining = size
+            for flat in np.argsort(distances, axis=None, kind='stable'):
+                order, k = divmod(int(flat), clusters)
+                if placed[order] or loads[k] >= capacities[k]:
+                    continue
+                assignment[order] = k
+                placed[order] = True
+                loads[k] += 1
+                remaining -= 1
+                if not remaining:
+                    break
+        for k in range(clusters):
+            members = scaled[assignment == k]
+            if len(members):
+                centers[k] = members.mean(axis=0)
+    return assignment
+
+
+def sweep_assignment(
+    points: np.ndarray,
+    picker_capacities: Sequence[int],
+    rng: np.random.Generator,
+    step_between_rows: int = 10
+) -> np.ndarray:
+    """Cut a serpentine sweep through the aisles into picker segments.
+
+    Orders are visited aisle by aisle, alternating direction, starting at a
+    random point of the sweep; pickers, in random order, take consecutive
+    segments sized in proportion to their capacity.
+
+    Returns:
+        Picker index per order
+    """
+    capacities = np.asarray(picker_capacities)
+    aisle = points[:, 1] // step_between_rows
+    along = np.where(aisle % 2 == 0, points[:, 0], -points[:, 0])
+    sweep = np.lexsort((along, aisle))
+    if len(sweep):
+        sweep = np.roll(sweep, -int(rng.integers(len(sweep))))
+    pickers = rng.permutation(len(capacities))
+    sizes = _segment_sizes(len(sweep), capacities[pickers])
+    assignment = np.zeros(len(points), dtype=GENE_DTYPE)
+    assignment[sweep] = np.repeat(pickers, sizes)
+    return assignment
+
+
+def perturb(
+    genes: np.ndarray, rng: np.random.Generator, rate: float
+) -> np.ndarray:
+    """Swap the pickers of random order pairs in every row.
+
+    Swaps keep every picker's load, so feasible rows stay feasible.
+    """
+    perturbed = genes.copy()
+    rows, orders_size = perturbed.shape
+    swaps = int(round(orders_size * rate / 2))
+    if swaps == 0 or orders_size < 2:
+        return perturbed
+    first = rng.integers(0, orders_size, (rows, swaps))
+    second = rng.integers(0, orders_size, (rows, swaps))
+    index = np.arange(rows)[:, None]
+    for column in range(swaps):
+        a, b = first[:, column:column + 1], second[:, column:column + 1]
+        perturbed[index, a], perturbed[index, b] = (
+            perturbed[index, b], perturbed[index, a]
+        )
+    return perturbed
+
+
+def seed_population(
+    orders_assign: List[List[Tuple[float, float]]],
+    count: int,
+    rng: np.random.Generator,
+    picker_capacities: Sequence[int] = PICKER_CAPACITIES,
+    random_share: float = SEED_RANDOM_SHARE,
+    perturbation: float = SEED_PERTURBATION,
+    picker_locations: Sequence[Tuple[float, float]] = PICKER_LOCATIONS
+) -> np.ndarray:
+    """Build an initial population from clusterings plus random rows.
+
+    Args:
+        orders_assign: List of orders to assign
+        count: Number of assignments
+        rng: Random generator
+        picker_capacities: Capacity of each picker
+        random_share: Share of uniformly random rows kept for diversity
+        perturbation: Share of orders swapped in each clustered variant
+        picker_locations: Start location of each picker
+
+    Returns:
+        Matrix of shape (count, len(orders_assign)) with picker indices
+    """
+    capacities = list(picker_capacities)
+    points = order_points(orders_assign)
+    random_rows = random_feasible_genes(
+        rng, int(round(count * random_share)), len(points), capacities
+    )
+    clustered = count - len(random_rows)
+    if clustered <= 0:
+        return random_rows
+
+    bases = []
+    for index in range(min(clustered, 4)):
+        if index % 2 == 0:
+            base = capacitated_kmeans(points, capacities, rng)
+            bases.append(_match_pickers(base, points, picker_locations,
+                                        capacities))
+        else:
+            bases.append(sweep_assignment(points, capacities, rng))
+    variants = np.array([bases[i % len(bases)] for i in range(clustered)],
+                        dtype=GENE_DTYPE).reshape(clustered, len(points))
+    # Keep each base once as is, perturb the copies
+    variants[len(bases):] = perturb(variants[len(bases):], rng, perturbation)
+    return np.concatenate([variants, random_rows])
+
+
+def _segment_sizes(total: int, capacities: np.ndarray) -> np.ndarray:
+    """Split total into per-picker sizes proportional to capacity"""
+    capacity = capacities.sum()
+    if capacity < total:
+        raise ValueError(
+            f"Total picker capacity {capacity} cannot cover {total} orders"
+        )
+    sizes = np.floor(total * capacities / max(capacity, 1)).astype(np.int64)
+    for k in np.argsort(-(capacities - sizes), kind='stable'):
+        if sizes.sum() == total:
+            break
+        sizes[k] += min(capacities[k] - sizes[k], total - sizes.sum())
+    return sizes
+
+
+def _match_pickers(
+    assignment: np.ndarray,
+    points: np.ndarray,
+    picker_locations: Sequence[Tuple[float, float]],
+    picker_capacities: Sequence[int]
+) -> np.ndarray:
+    """Relabel clusters so nearby pickers get them where capacity allows"""
+    clusters = len(picker_capacities)
+    loads = np.bincount(assignment, minlength=clusters)
+    centers = np.array([
+        points[assignment == k].mean(axis=0) if loads[k] else (0.0, 0.0)
+        for k in range(clusters)
+    ])
+    locations = np.asarray(picker_locations, dtype=np.float64)[:clusters]
+    distances = np.sqrt(((centers[:, None] - locations[None]) ** 2).sum(-1))
+    label = np.full(clusters, -1)
+    taken = np.zeros(clusters, dtype=bool)
+    for k in np.argsort(-loads, kind='stable'):
+        for picker_id in np.argsort(distances[k], kind='stable'):
+            if not taken[picker_id] and \
+                    loads[k] <= picker_capacities[picker_id]:
+                label[k] = picker_id
+                taken[picker_id] = True
+                break
+        else:
+            # Greedy matching failed; cluster k always fits picker k
+            return assignment
+    return label[assignment].astype(GENE_DTYPE)
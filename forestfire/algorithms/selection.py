@@ -0,0 +1,91 @@
+"""Selection engine for the array-backed genetic algorithm.
+
+This module provides vectorized tournament selection on fitness indices,
+partition-based truncation survival and optional removal of duplicate
+genomes, so the per-generation overhead stays flat as the population grows.
+"""
+
+import numpy as np
+from .population import Population
+
+
+class SelectionEngine:
+    """Parent and survivor selection over a Population.
+
+    Attributes:
+        rng: Random generator used for tournaments and genome hashing
+        deduplicate: Whether survivors are made unique by genome hash
+    """
+    def __init__(
+        self,
+        rng: np.random.Generator = None,
+        deduplicate: bool = False
+    ):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.deduplicate = deduplicate
+        self._hash_weights = None
+
+    def tournament(
+        self, fitness: np.ndarray, count: int, tournament_size: int
+    ) -> np.ndarray:
+        """Run `count` tournaments at once and return the winner indices.
+
+        Contestants are drawn with replacement, which keeps the draw a single
+        array operation regardless of population size.
+        """
+        contestants = self.rng.integers(
+            0, len(fitness), (count, max(1, tournament_size))
+        )
+        best = np.argmin(fitness[contestants], axis=1)
+        return contestants[np.arange(count), best]
+
+    def genome_hashes(self, genes: np.ndarray) -> np.ndarray:
+        """Return a 64-bit fingerprint for every row of a gene matrix"""
+        orders_size = genes.shape[1]
+        if (self._hash_weights is None
+                or len(self._hash_weights) != orders_size):
+            # Fixed seed so fingerprints are stable across generations and
+            # do not consume draws from the optimizer's generator
+            self._hash_weights = np.random.default_rng(0).integers(
+                1, np.iinfo(np.int64).max, orders_size, dtype=np.int64
+            ).astype(np.uint64) | np.uint64(1)
+        with np.errstate(over='ignore'):
+            # Offset by one so picker 0 still contributes to the hash
+            return ((genes.astype(np.uint64) + np.uint64(1))
+                    * self._hash_weights).sum(axis=1, dtype=np.uint64)
+
+    def unique_mask(self, genes: np.ndarray) -> np.ndarray:
+        """Mark the first occurrence of every distinct genome"""
+        _, first = np.unique(self.genome_hashes(genes), return_index=True)
+        mask = np.zeros(len(genes), dtype=bool)
+        mask[first] = True
+        return mask
+
+    def survive(
+        self,
+        population: Population,
+        offspring: np.ndarray,
+        fitness: np.ndarray,
+        size: int
+    ) -> Population:
+        """Merge offspring into the population and keep the best `size`.
+
+        With deduplication enabled, clones are dropped before truncation;
+        they are only used to pad the result when fewer than `size`
+        distinct genomes exist.
+
+        Returns:
+            Survivors ordered by ascending fitness
+        """
+        merged = population.merge(offspring, fitness)
+        if not self.deduplicate:
+            return merged.truncate(size)
+
+        unique = self.unique_mask(merged.genes)
+        survivors = merged[unique].truncate(size)
+        if len(survivors) < size:
+            clones = merged[~unique].truncate(size - len(survivors))
+            survivors = survivors.merge(
+                clones.genes, clones.fitness
+            ).sorted()
+        return survivors
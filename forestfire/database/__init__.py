@@ -4,12 +4,16 @@ This module provides database connectivity and repository functionality
 for interacting with the warehouse database.
 """
 
-from .connection import DatabaseConnectionManager
+from .connection import (
+    ConnectionPool, DatabaseConnectionManager, PooledConnection
+)
 from .repository import BaseRepository
 from .exceptions import DatabaseError, DBConnectionError, QueryError
 
 __all__ = [
+    'ConnectionPool',
     'DatabaseConnectionManager',
+    'PooledConnection',
     'BaseRepository',
     'DatabaseError',
     'DBConnectionError',
@@ -0,0 +1,170 @@
+"""Asynchronous database access.
+
+This module offers awaitable counterparts of the repository and services.
+The blocking psycopg2 calls run on worker threads, so the event loop stays
+free to overlap database I/O with optimization, plotting or the next fetch.
+Each connection is still used by one thread at a time through the pool.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Sequence, Tuple
+from .repository import BaseRepository
+from .services.batch_pick_seq_service import (
+    BatchPickSequenceService, SequenceUpdateResult
+)
+from .services.instance import ProblemInstance
+from .services.picklist import PicklistRepository
+
+
+class AsyncBaseRepository:
+    """Awaitable queries and transactions over a BaseRepository"""
+
+    def __init__(self, repository: BaseRepository = None):
+        self.repository = repository or BaseRepository()
+
+    async def execute_query(
+        self, query: str, params: tuple = None
+    ) -> List[Any]:
+        """Run a query on a worker thread.
+
+        Args:
+            query: Query with %s placeholders
+            params: Query parameters
+
+        Returns:
+            Fetched rows, or an empty list for statements without results
+        """
+        return await asyncio.to_thread(
+            self.repository.execute_query, query, params
+        )
+
+    async def execute_prepared(
+        self, name: str, query: str, params: tuple = None
+    ) -> List[Any]:
+        """Run a query as a prepared statement on a worker thread.
+
+        Args:
+            name: Statement name, unique per query text
+            query: Query with %s placeholders
+            params: Query parameters
+
+        Returns:
+            Fetched rows, or an empty list for statements without results
+        """
+        return await asyncio.to_thread(
+            self.repository.execute_prepared, name, query, params
+        )
+
+    async def execute_transaction(self, queries: List[tuple]) -> None:
+        """Run queries in one transaction on a worker thread.
+
+        Args:
+            queries: (query, params) pairs, committed together
+        """
+        await asyncio.to_thread(self.repository.execute_transaction, queries)
+
+    async def execute_bulk_update(
+        self,
+        table: str,
+        key: str,
+        columns: Sequence[str],
+        rows: Sequence[tuple]
+    ) -> int:
+        """Update many rows by key in one bulk statement on a worker thread.
+
+        Args:
+            table: Table to update
+            key: Column identifying the rows
+            columns: Columns to set
+            rows: Key value followed by the column values, per row
+
+        Returns:
+            Number of rows updated
+        """
+        return await asyncio.to_thread(
+            self.repository.execute_bulk_update, table, key, columns, rows
+        )
+
+
+class AsyncPicklistRepository:
+    """Awaitable picklist reads and batch updates"""
+
+    def __init__(self, repository: PicklistRepository = None):
+        self.repository = repository or PicklistRepository()
+
+    async def load_problem_instance(self) -> ProblemInstance:
+        """Build the columnar problem instance on a worker thread.
+
+        Returns:
+            Picklist columns grouped by picktask
+        """
+        return await asyncio.to_thread(self.repository.load_problem_instance)
+
+    async def get_optimized_data(
+        self
+    ) -> Tuple[List[str], List[List[Tuple]], Dict[str, List[Tuple]], List[Any]]:
+        """Fetch the optimizer input on a worker thread.
+
+        Returns:
+            Task IDs, locations, staging locations and database IDs, as
+            PicklistRepository.get_optimized_data
+        """
+        return await asyncio.to_thread(self.repository.get_optimized_data)
+
+    async def update_batchids(self, batch_ids: Dict[str, str]) -> int:
+        """Update the batch IDs of many picktasks on a worker thread.
+
+        Args:
+            batch_ids: New batch ID per picktask ID
+
+        Returns:
+            Number of picklist rows updated
+        """
+        return await asyncio.to_thread(
+            self.repository.update_batchids, batch_ids
+        )
+
+    def prefetch(self) -> asyncio.Task:
+        """Start fetching the next wave's data in the background.
+
+        Must not run alongside refresh_problem_instance or another
+        prefetch on the same repository: with PICKLIST_SNAPSHOT set, both
+        replace PicklistRepository.snapshot and watermark from worker
+        threads without a lock. Await the task before the next fetch.
+
+        Returns:
+            Task resolving to the result of get_optimized_data
+        """
+        return asyncio.ensure_future(self.get_optimized_data())
+
+
+class AsyncBatchPickSequenceService:
+    """Awaitable pick-sequence write-back"""
+
+    def __init__(self, service: BatchPickSequenceService = None):
+        self.service = service or BatchPickSequenceService()
+
+    async def update_pick_sequences(
+        self,
+        final_solution: List[int],
+        picklistids: List[Any],
+        orders_assign: List[List[Tuple[float, float]]],
+        picktasks: List[str],
+        stage_result: Dict[str, List[Tuple[float, float]]]
+    ) -> SequenceUpdateResult:
+        """Write back pick sequences and batch IDs on a worker thread.
+
+        Args:
+            final_solution: Picker assigned to each order
+            picklistids: Database ID of each picktask
+            orders_assign: List of orders to assign
+            picktasks: List of picking tasks
+            stage_result: Staging area result data
+
+        Returns:
+            Counts of changed and unchanged rows and of committed chunks
+        """
+        return await asyncio.to_thread(
+            self.service.update_pick_sequences, final_solution, picklistids,
+            orders_assign, picktasks, stage_result
+        )
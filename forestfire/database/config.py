@@ -23,6 +23,9 @@ class DatabaseConfig:
         password: Database password
         pool_size: Connection pool size
         pool_timeout: Connection pool timeout in seconds
+        pool_check_interval: Idle seconds before a pooled connection is
+            probed again
+        search_path: Schema search path set once per session
     """
     host: str = os.getenv('DB_HOST')
     port: int = int(os.getenv('DB_PORT'))
@@ -31,3 +34,5 @@ class DatabaseConfig:
     password: str = os.getenv('DB_PASSWORD')
     pool_size: int = int(os.getenv('DB_POOL_SIZE', '5'))
     pool_timeout: int = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+    pool_check_interval: int = int(os.getenv('DB_POOL_CHECK_INTERVAL', '30'))
+    search_path: str = os.getenv('DB_SEARCH_PATH', 'nifiapp')
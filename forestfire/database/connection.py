@@ -5,39 +5,206 @@ and ensuring proper connection handling with context managers.
 """
 
 from contextlib import contextmanager
-from typing import Generator
+import logging
+import threading
+import time
+from typing import Callable, Generator, List, Tuple
 import psycopg2
+from psycopg2 import extensions
 from .config import DatabaseConfig
 from .exceptions import DBConnectionError
 
+logger = logging.getLogger(__name__)
+
+
+class PooledConnection(extensions.connection):
+    """Connection that remembers the statements prepared in its session.
+
+    Attributes:
+        prepared: Query text of each prepared statement, by name
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = {}
+
+
+class ConnectionPool:
+    """Thread-safe pool of reusable database connections.
+
+    At most `size` connections are open at once. A checkout waits up to
+    `timeout` seconds for one to be returned before giving up. Connections
+    idle for longer than `check_interval` seconds are probed with a trivial
+    query before reuse, and closed or broken connections are replaced.
+    Returned connections are rolled back, so no transaction outlives its
+    checkout.
+
+    Attributes:
+        size: Maximum number of open connections
+        timeout: Seconds a checkout waits for a free connection
+        check_interval: Idle seconds after which a connection is probed
+    """
+    def __init__(
+        self,
+        connect: Callable[[], extensions.connection],
+        size: int,
+        timeout: float,
+        check_interval: float = 30.0
+    ):
+        if size < 1:
+            raise ValueError(f"Pool size must be positive, got {size}")
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self._idle: List[Tuple[extensions.connection, float]] = []
+        self._open = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> extensions.connection:
+        """Check out a healthy connection.
+
+        Raises:
+            DBConnectionError: If none is free within the timeout or a new
+                connection cannot be opened
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._condition:
+                while not self._idle and self._open >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise DBConnectionError(
+                            f"No database connection free after "
+                            f"{self.timeout}s ({self.size} in use)"
+                        )
+                    self._condition.wait(remaining)
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                else:
+                    conn, idle_since = None, None
+                    self._open += 1
+
+            if conn is None:
+                try:
+                    return self.connect()
+                except Exception as e:
+                    self._discard(None)
+                    raise DBConnectionError(
+                        f"Failed to connect to database: {e}"
+                    ) from e
+            if self._healthy(conn, idle_since):
+                return conn
+            logger.warning('Replacing broken database connection')
+            self._discard(conn)
+
+    def release(self, conn: extensions.connection) -> None:
+        """Return a connection, ending any transaction left open"""
+        if not conn.closed and conn.get_transaction_status() != \
+                extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                conn.close()
+        if conn.closed:
+            self._discard(conn)
+            return
+        with self._condition:
+            self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+
+    def close_all(self) -> None:
+        """Close every idle connection"""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._condition.notify_all()
+        for conn, _ in idle:
+            conn.close()
+
+    def _healthy(self, conn: extensions.connection, idle_since: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self.check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute('SELECT 1')
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn) -> None:
+        if conn is not None and not conn.closed:
+            conn.close()
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+
 class DatabaseConnectionManager:
     """Manages database connections using a singleton pattern.
 
     This class provides methods to get database connections and ensures
-    proper connection handling and resource cleanup.
+    proper connection handling and resource cleanup. Connections come from
+    one process-wide pool sized by DatabaseConfig, and each session starts
+    with the configured search_path, so queries need not set it.
     """
     _config = DatabaseConfig()
-    _connection = None
+    _pool = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_pool(cls) -> ConnectionPool:
+        """Shared connection pool, created on first use"""
+        with cls._lock:
+            if cls._pool is None:
+                cls._pool = ConnectionPool(
+                    cls._connect,
+                    size=cls._config.pool_size,
+                    timeout=cls._config.pool_timeout,
+                    check_interval=cls._config.pool_check_interval
+                )
+            return cls._pool
 
     @classmethod
     @contextmanager
     def get_connection(
         cls
     ) -> Generator[psycopg2.extensions.connection, None, None]:
+        pool = cls.get_pool()
+        conn = pool.acquire()
         try:
-            if not cls._connection or cls._connection.closed:
-                cls._connection = psycopg2.connect(
-                    host=cls._config.host,
-                    port=cls._config.port,
-                    database=cls._config.database,
-                    user=cls._config.user,
-                    password=cls._config.password
-                )
-            yield cls._connection
-        except Exception as e:
-            raise DBConnectionError(
-                f"Failed to connect to database: {e}"
-            ) from e
+            yield conn
         finally:
-            if cls._connection and not cls._connection.closed:
-                cls._connection.close()
+            pool.release(conn)
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Close the pooled connections"""
+        with cls._lock:
+            pool, cls._pool = cls._pool, None
+        if pool is not None:
+            pool.close_all()
+
+    @classmethod
+    def _connect(cls) -> extensions.connection:
+        return psycopg2.connect(
+            host=cls._config.host,
+            port=cls._config.port,
+            database=cls._config.database,
+            user=cls._config.user,
+            password=cls._config.password,
+            options=_search_path_option(cls._config.search_path),
+            connection_factory=PooledConnection
+        )
+
+
+def _search_path_option(search_path: str) -> str:
+    """libpq startup option setting search_path.
+
+    The options string is split on whitespace, so backslashes and spaces
+    in the value are escaped, as in "nifiapp,\\ public".
+    """
+    escaped = search_path.replace('\\', '\\\\').replace(' ', '\\ ')
+    return f'-c search_path={escaped}'
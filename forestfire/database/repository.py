@@ -5,11 +5,16 @@ like executing queries and transactions with proper error handling.
 """
 
 from abc import ABC
-from typing import Any, List
+import itertools
+import re
+from typing import Any, Iterator, List, Sequence, Union
 import psycopg2
+from psycopg2 import extras, sql
 from .connection import DatabaseConnectionManager
 from .exceptions import QueryError
 
+_cursor_names = itertools.count()
+
 class BaseRepository(ABC):
     """Base repository class for database operations.
 
@@ -25,6 +30,54 @@ class BaseRepository(ABC):
                 except psycopg2.Error as e:
                     raise QueryError(f"Query execution failed: {e}") from e
 
+    def execute_prepared(
+        self, name: str, query: str, params: tuple = None
+    ) -> List[Any]:
+        """Run a query as a server-side prepared statement.
+
+        The statement is prepared once per pooled connection under the
+        given name and executed with the parameters afterwards, so
+        repeated calls skip parsing and planning.
+
+        Args:
+            name: Statement name, unique per query text
+            query: Query with %s placeholders
+            params: Query parameters
+
+        Returns:
+            Fetched rows, or an empty list for statements without results
+        """
+        with DatabaseConnectionManager.get_connection() as conn:
+            with conn.cursor() as cur:
+                try:
+                    _prepare(conn, cur, name, query)
+                    cur.execute(_execute_statement(name, params), params)
+                    return cur.fetchall() if cur.description else []
+                except psycopg2.Error as e:
+                    raise QueryError(f"Query execution failed: {e}") from e
+
+    def stream_query(
+        self, query: str, params: tuple = None, batch_size: int = 1000
+    ) -> Iterator[List[Any]]:
+        """Yield the rows of a query in batches from a server-side cursor.
+
+        Only one batch is held in memory at a time; the connection stays
+        checked out until the iteration ends.
+        """
+        with DatabaseConnectionManager.get_connection() as conn:
+            name = f'forestfire_stream_{next(_cursor_names)}'
+            with conn.cursor(name=name) as cur:
+                cur.itersize = batch_size
+                try:
+                    cur.execute(query, params)
+                    while True:
+                        rows = cur.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        yield rows
+                except psycopg2.Error as e:
+                    raise QueryError(f"Query execution failed: {e}") from e
+
     def execute_transaction(self, queries: List[tuple]) -> None:
         with DatabaseConnectionManager.get_connection() as conn:
             with conn.cursor() as cur:
@@ -35,3 +88,100 @@ class BaseRepository(ABC):
                 except Exception as e:
                     conn.rollback()
                     raise QueryError(f"Transaction failed: {e}") from e
+
+    def execute_bulk_update(
+        self,
+        table: str,
+        key: str,
+        columns: Sequence[str],
+        rows: Sequence[tuple],
+        page_size: int = 1000
+    ) -> int:
+        """Update many rows with one set-based statement.
+
+        The new values are loaded into a temporary table with multi-row
+        inserts and applied with a single UPDATE ... FROM join on the key
+        column, all in one transaction. The temporary table lives for the
+        session and is emptied on commit, and the UPDATE is prepared once
+        per connection.
+
+        Args:
+            table: Schema-qualified table to update
+            key: Column matching rows to their new values
+            columns: Columns to update
+            rows: Tuples of key value followed by the new column values
+            page_size: Rows per multi-row insert
+
+        Returns:
+            Number of rows updated
+        """
+        if not rows:
+            return 0
+        target = sql.Identifier(*table.split('.'))
+        suffix = '_'.join((*table.split('.'), key, *columns))
+        staged = sql.Identifier(f'forestfire_bulk_{suffix}')
+        names = sql.SQL(', ').join(map(sql.Identifier, (key, *columns)))
+        create = sql.SQL(
+            'CREATE TEMP TABLE IF NOT EXISTS {staged} ON COMMIT DELETE ROWS '
+            'AS SELECT {names} FROM {target} WITH NO DATA'
+        ).format(staged=staged, target=target, names=names)
+        insert = sql.SQL('INSERT INTO {staged} ({names}) VALUES %s').format(
+            staged=staged, names=names
+        )
+        update = sql.SQL(
+            'UPDATE {target} AS t SET {assignments} '
+            'FROM {staged} AS u WHERE t.{key} = u.{key}'
+        ).format(
+            target=target, staged=staged, key=sql.Identifier(key),
+            assignments=sql.SQL(', ').join(
+                sql.SQL('{column} = u.{column}').format(
+                    column=sql.Identifier(column))
+                for column in columns
+            )
+        )
+        with DatabaseConnectionManager.get_connection() as conn:
+            with conn.cursor() as cur:
+                try:
+                    cur.execute(create)
+                    extras.execute_values(cur, insert, rows,
+                                          page_size=page_size)
+                    _prepare(conn, cur, f'bulk_update_{suffix}', update)
+                    cur.execute(f'EXECUTE bulk_update_{suffix}')
+                    updated = cur.rowcount
+                    conn.commit()
+                    return updated
+                except Exception as e:
+                    conn.rollback()
+                    raise QueryError(f"Bulk update failed: {e}") from e
+
+
+def _prepare(conn, cur, name: str, query: Union[str, sql.Composable]) -> None:
+    """Prepare a statement unless the connection already holds it"""
+    prepared = getattr(conn, 'prepared', None)
+    if prepared is not None and prepared.get(name) == query:
+        return
+    if prepared is not None and name in prepared:
+        cur.execute(f'DEALLOCATE {name}')
+        del prepared[name]
+    if isinstance(query, sql.Composable):
+        cur.execute(sql.SQL(f'PREPARE {name} AS ') + query)
+    else:
+        cur.execute(f'PREPARE {name} AS {_numbered(query)}')
+    if prepared is not None:
+        prepared[name] = query
+
+
+def _numbered(query: str) -> str:
+    """Turn %s placeholders into the $n parameters PREPARE expects"""
+    counter = itertools.count(1)
+    return re.sub(
+        r'%%|%s',
+        lambda match: '%' if match.group() == '%%' else f'${next(counter)}',
+        query
+    )
+
+
+def _execute_statement(name: str, params: tuple) -> str:
+    if not params:
+        return f'EXECUTE {name}'
+    return f"EXECUTE {name} ({', '.join(['%s'] * len(params))})"
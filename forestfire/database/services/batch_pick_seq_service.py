@@ -4,22 +4,74 @@ This module provides functionality for updating pick sequences in the database
 based on optimized routes for warehouse order picking.
 """
 
-from typing import List, Dict, Tuple
+from dataclasses import dataclass
+from typing import List, Dict, Sequence, Tuple
 import logging
+import time
 from .picklist import PicklistRepository
+from ..exceptions import DatabaseError
 from forestfire.optimizer.services.routing import RouteOptimizer
 from forestfire.utils.config import (
-    PICKER_LOCATIONS
+    PICKER_LOCATIONS, WRITEBACK_CHUNK_SIZE, WRITEBACK_RETRIES,
+    WRITEBACK_RETRY_DELAY
 )
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class SequenceUpdateResult:
+    """Outcome of a pick-sequence write-back.
+
+    Attributes:
+        changed: Picklists whose batch or sequence was written
+        unchanged: Picklists that already had their new values
+        chunks: Transactions the changes were committed in
+    """
+    changed: int = 0
+    unchanged: int = 0
+    chunks: int = 0
+
+
+def chunk_by_batch(
+    rows: Sequence[Tuple[str, int, str]], chunk_size: int
+) -> List[List[Tuple[str, int, str]]]:
+    """Pack (id, sequence, batch) rows into write chunks.
+
+    Rows of one batch always share a chunk, so each picker batch is written
+    atomically; batches are added to a chunk while it stays within
+    chunk_size rows, and a batch larger than that gets a chunk of its own.
+    A chunk size of 0 or less keeps all rows in one chunk.
+    """
+    if not rows:
+        return []
+    if chunk_size <= 0:
+        return [list(rows)]
+    batches: Dict[str, List[Tuple[str, int, str]]] = {}
+    for row in rows:
+        batches.setdefault(row[2], []).append(row)
+    chunks = [[]]
+    for batch_rows in batches.values():
+        if chunks[-1] and len(chunks[-1]) + len(batch_rows) > chunk_size:
+            chunks.append([])
+        chunks[-1].extend(batch_rows)
+    return chunks
+
+
 class BatchPickSequenceService:
     """Service for handling pick sequence updates"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        chunk_size: int = WRITEBACK_CHUNK_SIZE,
+        retries: int = WRITEBACK_RETRIES,
+        retry_delay: float = WRITEBACK_RETRY_DELAY
+    ):
         self.picklist_repo = PicklistRepository()
         self.route_optimizer = RouteOptimizer()
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.retry_delay = retry_delay
 
     def update_pick_sequences(
         self,
@@ -28,7 +80,18 @@ class BatchPickSequenceService:
         orders_assign: List[List[Tuple[float, float]]],
         picktasks: List[str],
         stage_result: Dict[str, List[Tuple[float, float]]]
-    ) -> None:
+    ) -> SequenceUpdateResult:
+        """Write the batch and pick sequence of every routed picklist.
+
+        Only picklists whose batch ID or sequence actually changes are
+        updated; the current values come with the picklist query. With a
+        positive chunk size the changes are committed per chunk of whole
+        picker batches, and a failed chunk is retried before giving up;
+        chunks committed before a final failure stay written.
+
+        Returns:
+            Number of changed and unchanged picklists
+        """
         try:
             # Get optimized routes
             # pylint: disable=unused-variable
@@ -44,25 +107,27 @@ class BatchPickSequenceService:
 
             # Get all picklist-picktask relationships in one query
             query = """
-            SET search_path TO nifiapp;
-            SELECT p.id, p.picktaskid, p.xcoordinate, p.ycoordinate
+            SELECT p.id, p.picktaskid, p.xcoordinate, p.ycoordinate,
+                   p.batchid, p.picksequence
             FROM picklist p
             WHERE p.picktaskid = ANY(%s);
             """
 
-            picklist_data = self.picklist_repo.baserepository.execute_query(
-                query, (picktasks,)
-            )
+            picklist_data = self.picklist_repo.baserepository.\
+                execute_prepared('picklist_by_picktask', query, (picktasks,))
 
             # Create mappings
             location_to_picklists = {}
+            current_values = {}
             picktask_assignments = {
                 picktasks[idx]: picker_id
                 for idx, picker_id in enumerate(final_solution)
             }
 
             # Process all picklists and their locations
-            for picklist_id, picktask_id, x, y in picklist_data:
+            for (picklist_id, picktask_id, x, y,
+                 current_batch, current_sequence) in picklist_data:
+                current_values[picklist_id] = (current_sequence, current_batch)
                 if picktask_id in picktask_assignments:
                     picker_id = picktask_assignments[picktask_id]
                     batch_id = f'BATCH_{picker_id}'
@@ -98,28 +163,58 @@ class BatchPickSequenceService:
                                 if item_key not in processed_items:
                                     processed_items.add(item_key)
                                     updates.append((
-                                        """
-                                        SET search_path TO nifiapp;
-                                        UPDATE picklist
-                                        SET picksequence = %s, batchid = %s
-                                        WHERE id = %s;
-                                        """,
-                                        (sequence_tracking[batch_id],
-                                         batch_id,
-                                         entry['picklist_id'])
+                                        entry['picklist_id'],
+                                        sequence_tracking[batch_id],
+                                        batch_id
                                     ))
                                     sequence_tracking[batch_id] += 1
 
-            # Execute all updates in single transaction
-            if updates:
-                self.picklist_repo.baserepository.execute_transaction(updates)
+            # Skip picklists that already hold their new values
+            changes = [
+                (picklist_id, sequence, batch_id)
+                for picklist_id, sequence, batch_id in updates
+                if current_values.get(picklist_id) != (sequence, batch_id)
+            ]
+            result = SequenceUpdateResult(
+                changed=len(changes), unchanged=len(updates) - len(changes)
+            )
+
+            # Apply the changes with one set-based statement per chunk
+            if changes:
+                for chunk in chunk_by_batch(changes, self.chunk_size):
+                    self._write_chunk(chunk)
+                    result.chunks += 1
                 logger.info(
-                    'Updated %d picklists across %d batches',
-                    len(processed_items), len(sequence_tracking)
+                    'Updated %d picklists across %d batches, '
+                    '%d already up to date',
+                    result.changed, len(sequence_tracking), result.unchanged
                 )
+            elif updates:
+                logger.info('All %d pick sequences already up to date',
+                            result.unchanged)
             else:
                 logger.warning('No updates required for pick sequences')
+            return result
 
         except Exception as e:
             logger.error('Error updating pick sequences: %s', e, exc_info=True)
             raise
+
+    def _write_chunk(self, chunk: List[Tuple[str, int, str]]) -> None:
+        """Commit one chunk, retrying with exponential backoff"""
+        for attempt in range(self.retries + 1):
+            try:
+                self.picklist_repo.baserepository.execute_bulk_update(
+                    'nifiapp.picklist', 'id',
+                    ('picksequence', 'batchid'), chunk
+                )
+                return
+            except DatabaseError as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(
+                    'Write-back chunk of %d picklists failed (%s), '
+                    'retry %d of %d', len(chunk), e, attempt + 1,
+                    self.retries
+                )
+                time.sleep(self.retry_delay * 2 ** attempt)
@@ -0,0 +1,160 @@
+"""Columnar problem instance built from picklist rows.
+
+This module turns streamed picklist rows into per-column arrays grouped by
+picktask in a single pass, so the optimizer input can be derived without
+rescanning the rows for every task.
+"""
+
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+import numpy as np
+
+# Positions of the projected picklist columns in a fetched row
+ID, PICKTASK, X, Y, STAGE_X, STAGE_Y = range(6)
+
+
+@dataclass
+class ProblemInstance:
+    """Picklist rows as columns, grouped by picktask.
+
+    Rows of task k occupy positions offsets[k] to offsets[k + 1] of every
+    column, in the order the rows were read.
+
+    Attributes:
+        task_ids: Picktask IDs in order of first appearance
+        offsets: Start of each task's rows, plus the total row count
+        db_ids: Picklist database ID per row
+        x: Pick x coordinate per row
+        y: Pick y coordinate per row
+        stage_x: Staging x coordinate per row
+        stage_y: Staging y coordinate per row
+    """
+    task_ids: List[str]
+    offsets: np.ndarray
+    db_ids: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    stage_x: np.ndarray
+    stage_y: np.ndarray
+
+    @classmethod
+    def from_rows(
+        cls, batches: Iterable[Sequence[Tuple]]
+    ) -> 'ProblemInstance':
+        """Build an instance in one pass over batches of projected rows"""
+        index: Dict[Any, int] = {}
+        task = []
+        columns = ([], [], [], [], [])
+        for batch in batches:
+            _read_batch(batch, index, task, columns)
+        return cls._grouped(list(index), task, *columns)
+
+    def updated(
+        self, rows: Sequence[Tuple], removed: Iterable[Any] = ()
+    ) -> 'ProblemInstance':
+        """Apply changed rows and deletions to a copy of the instance.
+
+        Rows whose database ID appears among the changed rows or in
+        removed are dropped, the changed rows are appended to their tasks
+        and tasks left without rows disappear.
+
+        Args:
+            rows: New or changed projected rows
+            removed: Database IDs of deleted rows
+
+        Returns:
+            Updated instance
+        """
+        index = {task_id: k for k, task_id in enumerate(self.task_ids)}
+        task, columns = [], ([], [], [], [], [])
+        _read_batch(rows, index, task, columns)
+        dropped = set(removed).union(columns[0])
+        keep = np.fromiter((db_id not in dropped
+                            for db_id in self.db_ids.tolist()),
+                           dtype=bool, count=len(self.db_ids))
+        old_task = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+        db_ids, x, y, stage_x, stage_y = columns
+        return self._grouped(
+            list(index),
+            np.concatenate([old_task[keep], np.asarray(task, np.int64)]),
+            self.db_ids[keep].tolist() + list(db_ids),
+            *(np.concatenate([old[keep], np.asarray(new, dtype=np.float64)])
+              for old, new in zip((self.x, self.y, self.stage_x, self.stage_y),
+                                  (x, y, stage_x, stage_y)))
+        )
+
+    @classmethod
+    def _grouped(cls, task_ids, task, db_ids, x, y, stage_x, stage_y):
+        task = np.asarray(task, dtype=np.int64)
+        counts = np.bincount(task, minlength=len(task_ids))
+        present = counts > 0
+        if not present.all():
+            task = (np.cumsum(present) - 1)[task]
+            task_ids = [t for t, p in zip(task_ids, present) if p]
+            counts = counts[present]
+        order = np.argsort(task, kind='stable')
+        offsets = np.zeros(len(task_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(
+            task_ids=task_ids,
+            offsets=offsets,
+            db_ids=np.asarray(db_ids)[order],
+            x=np.asarray(x, dtype=np.float64)[order],
+            y=np.asarray(y, dtype=np.float64)[order],
+            stage_x=np.asarray(stage_x, dtype=np.float64)[order],
+            stage_y=np.asarray(stage_y, dtype=np.float64)[order]
+        )
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Every column as an array, by field name"""
+        return {field.name: np.asarray(getattr(self, field.name))
+                for field in fields(self)}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'ProblemInstance':
+        """Rebuild an instance from the arrays returned by arrays"""
+        columns = {field.name: arrays[field.name] for field in fields(cls)}
+        columns['task_ids'] = columns['task_ids'].tolist()
+        return cls(**columns)
+
+    def __len__(self) -> int:
+        return len(self.task_ids)
+
+    @property
+    def num_rows(self) -> int:
+        """Number of picklist rows"""
+        return int(self.offsets[-1])
+
+    def task_db_ids(self) -> List[Any]:
+        """Database ID of the first row of every task"""
+        return self.db_ids[self.offsets[:-1]].tolist()
+
+    def orders_assign(self) -> List[List[Tuple[float, float]]]:
+        """Pick location of every row as a single-location order"""
+        return [[location] for location in zip(self.x.tolist(),
+                                                self.y.tolist())]
+
+    def mappings(
+        self
+    ) -> Tuple[Dict[str, List[Tuple]], Dict[str, List[Tuple]], Dict[str, Any]]:
+        """Staging locations, pick locations and database ID per task"""
+        locations = list(zip(self.x.tolist(), self.y.tolist()))
+        staging = list(zip(self.stage_x.tolist(), self.stage_y.tolist()))
+        bounds = self.offsets.tolist()
+        task_result, stage_result = {}, {}
+        for k, task_id in enumerate(self.task_ids):
+            task_result[task_id] = locations[bounds[k]:bounds[k + 1]]
+            stage_result[task_id] = staging[bounds[k]:bounds[k + 1]]
+        return (stage_result, task_result,
+                dict(zip(self.task_ids, self.task_db_ids())))
+
+
+def _read_batch(batch, index, task, columns) -> None:
+    """Append a batch of rows to per-column lists, numbering new tasks"""
+    if not batch:
+        return
+    values = list(zip(*batch))
+    task.extend(index.setdefault(task_id, len(index))
+                for task_id in values[PICKTASK])
+    for column, position in zip(columns, (ID, X, Y, STAGE_X, STAGE_Y)):
+        column.extend(values[position])
@@ -4,42 +4,114 @@ This module provides functionality for fetching and manipulating picklist data
 from the database for warehouse order picking optimization.
 """
 
-from typing import Dict, List, Tuple
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import logging
+import numpy as np
 from ..connection import DatabaseConnectionManager
 from ..repository import BaseRepository
 from ..exceptions import QueryError
-from forestfire.utils.config import WAREHOUSE_NAME
+from .instance import ProblemInstance
+from forestfire.utils.checkpoint import load_checkpoint, save_checkpoint
+from forestfire.utils.config import (
+    WAREHOUSE_NAME, PICKLIST_COLUMNS, PICKLIST_FETCH_SIZE, PICKLIST_SNAPSHOT,
+    PICKLIST_WATERMARK_COLUMN, PICKLIST_WATERMARK_MARGIN
+)
 
 logger = logging.getLogger(__name__)
 
+PICKLIST_QUERY = """
+SELECT {columns}
+FROM nifiapp.picklist p
+JOIN synob_tabr.warehouses w ON p.warehouseid = w.id
+WHERE w.name = %s;
+""".format(columns=', '.join(f'p.{column}' for column in PICKLIST_COLUMNS))
+
+# xmin is the 32-bit ID of the transaction that last wrote a row
+WATERMARK = ('p.xmin::text::bigint' if PICKLIST_WATERMARK_COLUMN == 'xmin'
+             else f'p.{PICKLIST_WATERMARK_COLUMN}')
+
+_SNAPSHOT_QUERY = """
+SELECT {columns}, {watermark}
+FROM nifiapp.picklist p
+JOIN synob_tabr.warehouses w ON p.warehouseid = w.id
+WHERE w.name = %s{condition};
+"""
+SNAPSHOT_QUERY = _SNAPSHOT_QUERY.format(
+    columns=', '.join(f'p.{column}' for column in PICKLIST_COLUMNS),
+    watermark=WATERMARK, condition=''
+)
+CHANGED_ROWS_QUERY = _SNAPSHOT_QUERY.format(
+    columns=', '.join(f'p.{column}' for column in PICKLIST_COLUMNS),
+    watermark=WATERMARK, condition=f' AND {WATERMARK} >= %s'
+)
+
+PICKLIST_IDS_QUERY = """
+SELECT p.id
+FROM nifiapp.picklist p
+JOIN synob_tabr.warehouses w ON p.warehouseid = w.id
+WHERE w.name = %s;
+"""
+
+# Oldest transaction still running, as a 32-bit ID comparable with xmin
+SNAPSHOT_XMIN_QUERY = """
+SELECT txid_snapshot_xmin(txid_current_snapshot()) % 4294967296;
+"""
+
 class PicklistRepository:
-    """Repository for handling picklist-related database operations"""
+    """Repository for handling picklist-related database operations
 
-    def __init__(self):
+    Args:
+        snapshot_path (Optional[str]): File keeping the refreshed snapshot
+            between runs; None keeps it in memory only
+    """
+
+    def __init__(self, snapshot_path: Optional[str] = None):
         self.connection_manager = DatabaseConnectionManager()
         self.baserepository = BaseRepository()
+        self.snapshot_path = snapshot_path
+        # Cached problem instance and the watermark it is current up to
+        self.snapshot: ProblemInstance = None
+        self.watermark: Any = None
 
     def fetch_picklist_data(self) -> List[Tuple]:
         """
         Fetch all picklist data from the database
 
         Returns:
-            List[Tuple]: All picklist records
-        """
-        query = """
-        SELECT p.*
-        FROM nifiapp.picklist p
-        JOIN synob_tabr.warehouses w ON p.warehouseid = w.id
-        WHERE w.name = %s;
+            List[Tuple]: All picklist records, projected to PICKLIST_COLUMNS
         """
         try:
-            return self.baserepository.execute_query(query, (WAREHOUSE_NAME,))
+            return self.baserepository.execute_prepared(
+                'picklist_fetch', PICKLIST_QUERY, (WAREHOUSE_NAME,)
+            )
 
         except Exception as e:
             logger.error("Error fetching picklist data: %s", e)
             raise QueryError("Failed to fetch picklist data: %s" % e) from e
 
+    def stream_picklist_data(
+        self, batch_size: int = PICKLIST_FETCH_SIZE
+    ) -> Iterator[List[Tuple]]:
+        """
+        Stream picklist data through a server-side cursor
+
+        Args:
+            batch_size (int): Rows fetched per round trip
+
+        Yields:
+            List[Tuple]: Batches of picklist records, projected to
+                PICKLIST_COLUMNS
+        """
+        try:
+            yield from self.baserepository.stream_query(
+                PICKLIST_QUERY, (WAREHOUSE_NAME,), batch_size
+            )
+
+        except Exception as e:
+            logger.error("Error streaming picklist data: %s", e)
+            raise QueryError("Failed to stream picklist data: %s" % e) from e
+
     def fetch_distinct_picktasks(self) -> List[str]:
         """
         Fetch distinct picktask IDs
@@ -48,11 +120,15 @@ class PicklistRepository:
             List[str]: List of unique picktask IDs
         """
         query = """
-        SET search_path TO nifiapp;
-        SELECT DISTINCT picktaskid FROM picklist;
+        SELECT DISTINCT p.picktaskid
+        FROM nifiapp.picklist p
+        JOIN synob_tabr.warehouses w ON p.warehouseid = w.id
+        WHERE w.name = %s;
         """
         try:
-            distinct_pictask = self.baserepository.execute_query(query)
+            distinct_pictask = self.baserepository.execute_query(
+                query, (WAREHOUSE_NAME,)
+            )
             return [row[0] for row in distinct_pictask]
         except Exception as e:
             logger.error("Error fetching distinct picktasks: %s", e)
@@ -60,6 +136,139 @@ class PicklistRepository:
                 "Failed to fetch distinct picktasks: %s" % e
             ) from e
 
+    def load_problem_instance(
+        self, batch_size: int = PICKLIST_FETCH_SIZE
+    ) -> ProblemInstance:
+        """
+        Build the columnar problem instance from streamed picklist rows
+
+        Args:
+            batch_size (int): Rows fetched per round trip
+
+        Returns:
+            ProblemInstance: Picklist columns grouped by picktask
+        """
+        instance = ProblemInstance.from_rows(
+            self.stream_picklist_data(batch_size)
+        )
+        if not instance.num_rows:
+            logger.error("No rows returned from stream_picklist_data")
+            raise QueryError("No data found in picklist table")
+        return instance
+
+    def refresh_problem_instance(
+        self, batch_size: int = PICKLIST_FETCH_SIZE
+    ) -> ProblemInstance:
+        """
+        Bring the cached problem instance up to date with the database
+
+        The first call loads every row. Later calls stream only rows whose
+        watermark reached the stored one, read the current IDs to find
+        deleted rows and apply both to the cached columns. With xmin the
+        watermark is the oldest transaction running before the read, so
+        rows committed by transactions in flight during a read are picked
+        up by the next refresh; a watermark that moves backwards signals
+        transaction ID wraparound and forces a full reload. With a
+        timestamp column it is the latest value seen, less
+        PICKLIST_WATERMARK_MARGIN seconds: only xmin is exact, a timestamp
+        misses rows committed later than the margin after their timestamp.
+
+        With a snapshot path the snapshot and watermark are stored after
+        every refresh, and the first refresh of a new repository continues
+        from the stored ones.
+
+        Args:
+            batch_size (int): Rows fetched per round trip
+
+        Returns:
+            ProblemInstance: Picklist columns grouped by picktask
+        """
+        if self.snapshot is None:
+            self._load_snapshot()
+        try:
+            watermark = None
+            if PICKLIST_WATERMARK_COLUMN == 'xmin':
+                watermark = self.baserepository.execute_query(
+                    SNAPSHOT_XMIN_QUERY
+                )[0][0]
+            if self.snapshot is None or (
+                    watermark is not None and self.watermark is not None
+                    and watermark < self.watermark):
+                since = None
+            else:
+                since = self.watermark
+
+            rows = [
+                row
+                for batch in self.baserepository.stream_query(
+                    SNAPSHOT_QUERY if since is None else CHANGED_ROWS_QUERY,
+                    (WAREHOUSE_NAME,) if since is None
+                    else (WAREHOUSE_NAME, since),
+                    batch_size
+                )
+                for row in batch
+            ]
+            if watermark is None:
+                watermark = max((row[-1] for row in rows),
+                                default=self.watermark)
+                if rows and isinstance(watermark, datetime):
+                    watermark -= timedelta(seconds=PICKLIST_WATERMARK_MARGIN)
+
+            if since is None:
+                snapshot = ProblemInstance.from_rows([rows])
+            else:
+                current = {
+                    row[0] for row in self.baserepository.execute_prepared(
+                        'picklist_ids', PICKLIST_IDS_QUERY, (WAREHOUSE_NAME,)
+                    )
+                }
+                removed = [db_id for db_id in self.snapshot.db_ids.tolist()
+                           if db_id not in current]
+                snapshot = self.snapshot.updated(rows, removed)
+                logger.info('Picklist snapshot: %d changed, %d deleted rows',
+                            len(rows), len(removed))
+        except Exception as e:
+            logger.error("Error refreshing picklist snapshot: %s", e)
+            raise QueryError(
+                "Failed to refresh picklist snapshot: %s" % e
+            ) from e
+
+        if not snapshot.num_rows:
+            logger.error("No rows in the picklist snapshot")
+            raise QueryError("No data found in picklist table")
+        self.snapshot, self.watermark = snapshot, watermark
+        self._save_snapshot()
+        return snapshot
+
+    def _load_snapshot(self) -> None:
+        """Continue from the snapshot stored by an earlier run, if any"""
+        state = load_checkpoint(self.snapshot_path, _snapshot_fingerprint())
+        if state is None:
+            return
+        watermark = state['watermark'][()]
+        self.snapshot = ProblemInstance.from_arrays(state)
+        self.watermark = (datetime.fromisoformat(str(watermark))
+                          if state['watermark'].dtype.kind == 'U'
+                          else watermark.item())
+        logger.info('Loaded picklist snapshot of %d rows from %s',
+                    self.snapshot.num_rows, self.snapshot_path)
+
+    def _save_snapshot(self) -> None:
+        if not self.snapshot_path:
+            return
+        watermark = (self.watermark.isoformat()
+                     if isinstance(self.watermark, datetime)
+                     else self.watermark)
+        try:
+            save_checkpoint(
+                self.snapshot_path,
+                fingerprint=_snapshot_fingerprint(),
+                watermark=np.asarray(watermark),
+                **self.snapshot.arrays()
+            )
+        except OSError as e:
+            logger.warning("Could not store picklist snapshot: %s", e)
+
     def map_picklist_data(
         self
     ) -> Tuple[Dict[str, List[Tuple]], Dict[str, List[Tuple]], Dict[str, int]]:
@@ -73,54 +282,12 @@ class PicklistRepository:
                 - Dict[str, int]: Picktask ID to database ID mapping
         """
         try:
-            rows = self.fetch_picklist_data()
-            if not rows:
-                logger.error("No rows returned from fetch_picklist_data")
-                raise QueryError("No data found in picklist table")
-            picktasks = self.fetch_distinct_picktasks()
-            if not picktasks:
-                logger.error(
-                    "No picktasks returned from fetch_distinct_picktasks"
-                )
-                raise QueryError("No distinct picktasks found")
-
-            task_result: Dict[str, List[Tuple]] = {}
-            stage_result: Dict[str, List[Tuple]] = {}
-            id_mapping: Dict[str, int] = {}  # New mapping for database IDs
-
-            for picktaskid in picktasks:
-                # Filter pick locations and get IDs
-                filtered_values = [
-                    (row[21], row[22])
-                    for row in rows
-                    if row[3] == picktaskid
-                ]
-
-                # Get database ID for picktask
-                db_id = next(
-                    (row[0] for row in rows if row[3] == picktaskid), None
-                )
-
-                # Filter staging locations
-                staging_loc = [
-                    (row[67], row[68])
-                    for row in rows
-                    if row[3] == picktaskid
-                ]
-
-                task_result[picktaskid] = filtered_values
-                stage_result[picktaskid] = staging_loc
-                if db_id:
-                    id_mapping[picktaskid] = db_id
-
-            return stage_result, task_result, id_mapping
+            return self.load_problem_instance().mappings()
 
         except Exception as e:
             logger.error("Error mapping picklist data: %s", e)
             raise QueryError("Failed to map picklist data: %s" % e) from e
 
-
-
     def update_batchid(self, batch_id: str, picklist_id: str) -> None:
         """
         Update batch ID for a picktask
@@ -129,19 +296,27 @@ class PicklistRepository:
             batch_id (str): New batch ID
             picktask_id (str): Picktask ID to update
         """
-        query = """
-        SET search_path TO nifiapp;
-        UPDATE picklist
-        SET batchid = %s
-        WHERE picktaskid = %s;
+        self.update_batchids({picklist_id: batch_id})
+
+    def update_batchids(self, batch_ids: Dict[str, str]) -> int:
+        """
+        Update the batch IDs of many picktasks in one bulk statement
+
+        Args:
+            batch_ids (Dict[str, str]): New batch ID per picktask ID
+
+        Returns:
+            int: Number of picklist rows updated
         """
         try:
-            self.baserepository.execute_query(query, (batch_id, picklist_id))
+            return self.baserepository.execute_bulk_update(
+                'nifiapp.picklist', 'picktaskid', ('batchid',),
+                list(batch_ids.items())
+            )
         except Exception as e:
             logger.error("Error updating batch ID: %s", e)
             raise QueryError("Failed to update batch ID: %s" % e) from e
 
-
     def get_optimized_data(
         self
     ) -> Tuple[List[str], List[List[Tuple]], Dict[str, List[Tuple]], List[int]]:
@@ -156,17 +331,18 @@ class PicklistRepository:
                 - List[int]: Database IDs in order of task_keys
         """
         try:
-            staging, taskid, id_mapping = self.map_picklist_data()
+            instance = (self.refresh_problem_instance() if PICKLIST_SNAPSHOT
+                        else self.load_problem_instance())
+            staging, _, _ = instance.mappings()
 
-            # Convert to required format for optimization
-            task_keys = list(taskid.keys())
-            locations = [
-                [item] for sublist in taskid.values() for item in sublist
-            ]
-            picklistids = [id_mapping.get(task_id) for task_id in task_keys]
-
-            return task_keys, locations, staging, picklistids
+            return (instance.task_ids, instance.orders_assign(), staging,
+                    instance.task_db_ids())
 
         except Exception as e:
             logger.error("Error getting optimized data: %s", e)
             raise QueryError("Failed to get optimized data: %s" % e) from e
+
+
+def _snapshot_fingerprint() -> str:
+    """Identify the warehouse and watermark a stored snapshot belongs to"""
+    return f'{WAREHOUSE_NAME}:{PICKLIST_WATERMARK_COLUMN}'
@@ -0,0 +1,102 @@
+"""
+Columnar problem instance
+"""
+from dataclasses import dataclass, fields
+from typing import Dict, List, Tuple
+import numpy as np
+
+
+@dataclass
+class ProblemInstance:
+    """Model holding one optimization wave as flat arrays.
+
+    Ragged per-order and per-task location lists are stored as coordinate
+    arrays plus offsets, so the whole instance can be copied into a single
+    buffer (e.g. shared memory) and rebuilt without pickling.
+
+    Attributes:
+        task_ids: Picktask ID per task, in optimization order
+        order_offsets: Start of each order's locations, length orders + 1
+        order_x: X coordinate of every order location
+        order_y: Y coordinate of every order location
+        stage_keys: Picktask IDs that have staging locations
+        stage_offsets: Start of each key's staging locations, length keys + 1
+        stage_x: X coordinate of every staging location
+        stage_y: Y coordinate of every staging location
+    """
+    task_ids: np.ndarray
+    order_offsets: np.ndarray
+    order_x: np.ndarray
+    order_y: np.ndarray
+    stage_keys: np.ndarray
+    stage_offsets: np.ndarray
+    stage_x: np.ndarray
+    stage_y: np.ndarray
+
+    @property
+    def orders_size(self) -> int:
+        """Number of orders in the instance"""
+        return len(self.order_offsets) - 1
+
+    @classmethod
+    def from_lists(
+        cls,
+        orders_assign: List[List[Tuple[float, float]]],
+        picktasks: List[str],
+        stage_result: Dict[str, List[Tuple[float, float]]]
+    ) -> 'ProblemInstance':
+        """Build an instance from the list-based optimizer inputs"""
+        order_x, order_y, order_offsets = _flatten(orders_assign)
+        stage_keys = list(stage_result.keys())
+        stage_x, stage_y, stage_offsets = _flatten(
+            [stage_result[key] for key in stage_keys]
+        )
+        return cls(
+            task_ids=np.array([str(task) for task in picktasks], dtype=str),
+            order_offsets=order_offsets,
+            order_x=order_x,
+            order_y=order_y,
+            stage_keys=np.array([str(key) for key in stage_keys], dtype=str),
+            stage_offsets=stage_offsets,
+            stage_x=stage_x,
+            stage_y=stage_y
+        )
+
+    def to_lists(self) -> Tuple[
+        List[List[Tuple[float, float]]],
+        List[str],
+        Dict[str, List[Tuple[float, float]]]
+    ]:
+        """Rebuild the list-based optimizer inputs"""
+        orders_assign = _unflatten(
+            self.order_x, self.order_y, self.order_offsets
+        )
+        stage_locations = _unflatten(
+            self.stage_x, self.stage_y, self.stage_offsets
+        )
+        stage_result = dict(zip(self.stage_keys.tolist(), stage_locations))
+        return orders_assign, self.task_ids.tolist(), stage_result
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Return every field as a name to array mapping"""
+        return {field.name: getattr(self, field.name)
+                for field in fields(self)}
+
+
+def _flatten(
+    groups: List[List[Tuple[float, float]]]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    offsets = np.zeros(len(groups) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(group) for group in groups])
+    coords = np.array(
+        [point for group in groups for point in group], dtype=np.float64
+    ).reshape(-1, 2)
+    return coords[:, 0].copy(), coords[:, 1].copy(), offsets
+
+
+def _unflatten(
+    x: np.ndarray, y: np.ndarray, offsets: np.ndarray
+) -> List[List[Tuple[float, float]]]:
+    points = list(zip(x.tolist(), y.tolist()))
+    return [points[start:end]
+            for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
@@ -0,0 +1,432 @@
+"""Distributed fitness evaluation over a TCP work-queue protocol.
+
+This module lets a coordinator spread fitness evaluation over evaluation
+servers running on other hosts. Each server receives the problem instance
+once per wave and then answers batches of assignments with fitness vectors.
+Batches whose worker drops out are re-queued for the remaining workers.
+
+Messages are framed as a 4-byte big-endian header length, a JSON header and
+the raw bytes of the numpy arrays it describes, so no pickled objects ever
+cross the network. Headers and payloads above EVAL_MAX_HEADER_SIZE and
+EVAL_MAX_PAYLOAD_SIZE are rejected before anything is allocated for them.
+
+Every connection starts with a challenge-response on a secret shared by
+coordinator and servers, read from the EVAL_WORKER_SECRET environment
+variable. Servers listen on localhost by default and refuse other hosts
+unless a secret is set.
+
+Run a server reachable from other hosts with:
+    export EVAL_WORKER_SECRET=...
+    python -m forestfire.optimizer.services.distributed --host 0.0.0.0
+"""
+
+import argparse
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import math
+import os
+import queue
+import secrets
+import socket
+import socketserver
+import struct
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from forestfire.utils.config import (
+    PICKER_LOCATIONS, EVAL_CHUNK_SIZE, EVAL_WORKER_TIMEOUT,
+    EVAL_MAX_HEADER_SIZE, EVAL_MAX_PAYLOAD_SIZE
+)
+from ..models.problem import ProblemInstance
+from .evaluation import _evaluate_rows
+from .routing import RouteOptimizer
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct('!I')
+
+
+class ProtocolError(Exception):
+    """Raised when a peer sends an unexpected or malformed message."""
+
+
+def send_message(
+    sock: socket.socket,
+    kind: str,
+    arrays: Dict[str, np.ndarray] = None,
+    **fields: Any
+) -> None:
+    """Send one framed message with optional numpy array payloads"""
+    arrays = {name: np.ascontiguousarray(array)
+              for name, array in (arrays or {}).items()}
+    header = dict(fields, type=kind, arrays=[
+        [name, array.dtype.str, list(array.shape)]
+        for name, array in arrays.items()
+    ])
+    encoded = json.dumps(header).encode('utf-8')
+    sock.sendall(b''.join(
+        [_HEADER.pack(len(encoded)), encoded]
+        + [array.tobytes() for array in arrays.values()]
+    ))
+
+
+def recv_message(
+    sock: socket.socket,
+    max_header: int = EVAL_MAX_HEADER_SIZE,
+    max_payload: int = EVAL_MAX_PAYLOAD_SIZE
+) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Receive one framed message.
+
+    Args:
+        sock: Connected socket
+        max_header: Largest accepted JSON header in bytes
+        max_payload: Largest accepted total of array bytes
+
+    Returns:
+        The JSON header and the decoded arrays by name
+
+    Raises:
+        ProtocolError: If the message is malformed or exceeds a limit
+    """
+    (length,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if length > max_header:
+        raise ProtocolError(
+            f"Message header of {length} bytes exceeds {max_header}"
+        )
+    try:
+        header = json.loads(_recv_exact(sock, length).decode('utf-8'))
+    except ValueError as e:
+        raise ProtocolError(f"Malformed message header: {e}") from e
+    if not isinstance(header, dict):
+        raise ProtocolError('Message header is not an object')
+    arrays = {}
+    for name, dtype, shape in _array_specs(header.get('arrays', []),
+                                           max_payload):
+        arrays[name] = np.frombuffer(
+            _recv_exact(sock, dtype.itemsize * math.prod(shape)),
+            dtype=dtype
+        ).reshape(shape)
+    return header, arrays
+
+
+def _array_specs(
+    specs: Any, max_payload: int
+) -> List[Tuple[str, np.dtype, Tuple[int, ...]]]:
+    """Validate the array descriptions of a header against the limit"""
+    try:
+        parsed = [(str(name), np.dtype(dtype),
+                   tuple(int(length) for length in shape))
+                  for name, dtype, shape in specs]
+    except (TypeError, ValueError) as e:
+        raise ProtocolError(f"Malformed array description: {e}") from e
+    total = 0
+    for name, dtype, shape in parsed:
+        if dtype.kind not in 'biufSU' or any(length < 0 for length in shape):
+            raise ProtocolError(
+                f"Unsupported array {name!r} of {dtype} {shape}"
+            )
+        total += dtype.itemsize * math.prod(shape)
+    if total > max_payload:
+        raise ProtocolError(
+            f"Message payload of {total} bytes exceeds {max_payload}"
+        )
+    return parsed
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError('Connection closed by peer')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _shared_secret(secret: Optional[str]) -> str:
+    return os.getenv('EVAL_WORKER_SECRET', '') if secret is None else secret
+
+
+def _digest(secret: str, nonce: str) -> str:
+    return hmac.new(secret.encode('utf-8'), nonce.encode('utf-8'),
+                    hashlib.sha256).hexdigest()
+
+
+def _is_loopback(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == 'localhost'
+
+
+class _EvaluationHandler(socketserver.BaseRequestHandler):
+    """Serves one coordinator connection until it closes"""
+
+    def handle(self) -> None:
+        try:
+            authenticated = self._authenticate()
+        except (ConnectionError, ProtocolError):
+            return
+        if not authenticated:
+            logger.warning('Rejected unauthenticated coordinator %s',
+                           self.client_address[0])
+            send_message(self.request, 'error',
+                         reason='Authentication failed')
+            return
+
+        route_optimizer = RouteOptimizer()
+        wave = None
+        while True:
+            try:
+                header, arrays = recv_message(self.request)
+            except ConnectionError:
+                return
+            except ProtocolError as e:
+                send_message(self.request, 'error', reason=str(e))
+                return
+            kind = header.get('type')
+            if kind == 'load':
+                locations = arrays.pop('picker_locations')
+                wave = (
+                    [tuple(point) for point in locations.tolist()],
+                    *ProblemInstance(**arrays).to_lists()
+                )
+                send_message(self.request, 'ready')
+            elif kind == 'eval' and wave is not None:
+                fitness = _evaluate_rows(
+                    route_optimizer, wave[0], arrays['genes'], *wave[1:]
+                )
+                send_message(self.request, 'result',
+                             {'fitness': fitness}, batch=header.get('batch'))
+            elif kind == 'close':
+                return
+            else:
+                send_message(self.request, 'error',
+                             reason=f"Unexpected message {kind!r}")
+                return
+
+    def _authenticate(self) -> bool:
+        """Challenge the coordinator to prove it knows the secret"""
+        nonce = secrets.token_hex(16)
+        send_message(self.request, 'challenge', nonce=nonce)
+        header, _ = recv_message(self.request, max_payload=0)
+        expected = _digest(self.server.secret, nonce)
+        return header.get('type') == 'auth' and hmac.compare_digest(
+            expected.encode('utf-8'),
+            str(header.get('digest', '')).encode('utf-8')
+        )
+
+
+class EvaluationServer(socketserver.ThreadingTCPServer):
+    """TCP server answering evaluation requests from coordinators.
+
+    Attributes:
+        secret: Shared secret coordinators must prove they know
+
+    Raises:
+        ValueError: If asked to listen beyond localhost without a secret
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        secret: Optional[str] = None
+    ):
+        self.secret = _shared_secret(secret)
+        if not self.secret and not _is_loopback(host):
+            raise ValueError(
+                f"Refusing to serve evaluations on {host} without a shared "
+                "secret; set EVAL_WORKER_SECRET"
+            )
+        super().__init__((host, port), _EvaluationHandler)
+
+    @property
+    def address(self) -> str:
+        """Bound address as host:port"""
+        host, port = self.server_address[:2]
+        return f'{host}:{port}'
+
+
+class _WorkerConnection:
+    """Coordinator side of one evaluation server connection"""
+
+    def __init__(self, address: str, timeout: float, secret: str):
+        host, port = address.rsplit(':', 1)
+        self.address = address
+        self.sock = socket.create_connection((host, int(port)), timeout)
+        try:
+            header, _ = self._expect('challenge')
+            send_message(self.sock, 'auth', digest=_digest(
+                secret, str(header.get('nonce', ''))
+            ))
+        except (OSError, ProtocolError):
+            self.sock.close()
+            raise
+
+    def load(self, problem: ProblemInstance,
+             picker_locations: Sequence[Tuple[float, float]]) -> None:
+        """Send the wave's problem instance"""
+        arrays = problem.arrays()
+        arrays['picker_locations'] = np.asarray(
+            picker_locations, dtype=np.float64
+        )
+        send_message(self.sock, 'load', arrays)
+        self._expect('ready')
+
+    def evaluate(self, batch: int, genes: np.ndarray) -> np.ndarray:
+        """Evaluate one batch of assignments remotely"""
+        send_message(self.sock, 'eval', {'genes': genes}, batch=batch)
+        header, arrays = self._expect('result')
+        if header.get('batch') != batch:
+            raise ProtocolError(
+                f"Expected batch {batch}, got {header.get('batch')}"
+            )
+        return arrays['fitness']
+
+    def close(self) -> None:
+        """Close the connection, telling the server when possible"""
+        try:
+            send_message(self.sock, 'close')
+        except OSError:
+            pass
+        self.sock.close()
+
+    def _expect(self, kind: str) -> Tuple[Dict[str, Any], Dict]:
+        header, arrays = recv_message(self.sock)
+        if header.get('type') != kind:
+            raise ProtocolError(
+                f"Expected {kind!r} from {self.address}, got "
+                f"{header.get('type')!r}: {header.get('reason', '')}"
+            )
+        return header, arrays
+
+
+class DistributedEvaluator:
+    """Evaluates assignment batches on remote evaluation servers.
+
+    Batches are pulled from a shared queue by one thread per live worker.
+    When a worker fails or times out, its batch goes back on the queue and
+    the worker is dropped for the rest of the wave. Workers that reject
+    the shared secret count as unavailable.
+    """
+    def __init__(
+        self,
+        addresses: Sequence[str],
+        orders_assign: List[Any],
+        picktasks: List[Any],
+        stage_result: Any,
+        chunk_size: int = EVAL_CHUNK_SIZE,
+        timeout: float = EVAL_WORKER_TIMEOUT,
+        picker_locations: Sequence[Tuple[float, float]] = PICKER_LOCATIONS,
+        secret: Optional[str] = None
+    ):
+        self.chunk_size = max(1, chunk_size)
+        secret = _shared_secret(secret)
+        problem = ProblemInstance.from_lists(
+            orders_assign, picktasks, stage_result
+        )
+        self._workers: List[_WorkerConnection] = []
+        for address in addresses:
+            try:
+                worker = _WorkerConnection(address, timeout, secret)
+                worker.load(problem, picker_locations)
+            except (OSError, ProtocolError) as e:
+                logger.warning('Evaluation worker %s unavailable: %s',
+                               address, e)
+                continue
+            self._workers.append(worker)
+        if not self._workers:
+            self.close()
+            raise ConnectionError('No evaluation workers available')
+
+    @property
+    def workers(self) -> int:
+        """Number of live workers"""
+        return len(self._workers)
+
+    def evaluate(self, genes: np.ndarray) -> np.ndarray:
+        """Return the fitness of every row of a gene matrix"""
+        batches = queue.Queue()
+        total = 0
+        for start in range(0, len(genes), self.chunk_size):
+            batches.put((total, genes[start:start + self.chunk_size]))
+            total += 1
+        results: Dict[int, np.ndarray] = {}
+        threads = [
+            threading.Thread(target=self._drain,
+                             args=(worker, batches, results, total),
+                             daemon=True)
+            for worker in list(self._workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if len(results) < total:
+            raise ConnectionError(
+                f"All evaluation workers failed, {total - len(results)} "
+                "batches left unevaluated"
+            )
+        if not total:
+            return np.empty(0, dtype=np.float64)
+        return np.concatenate([results[i] for i in range(total)])
+
+    def _drain(
+        self,
+        worker: _WorkerConnection,
+        batches: queue.Queue,
+        results: Dict[int, np.ndarray],
+        total: int
+    ) -> None:
+        while len(results) < total:
+            try:
+                batch, genes = batches.get(timeout=0.05)
+            except queue.Empty:
+                # Another worker may still fail and re-queue its batch
+                if not any(w is worker for w in self._workers):
+                    return
+                continue
+            try:
+                results[batch] = worker.evaluate(batch, genes)
+            except (OSError, ProtocolError) as e:
+                logger.warning('Evaluation worker %s dropped out: %s',
+                               worker.address, e)
+                batches.put((batch, genes))
+                self._workers = [w for w in self._workers if w is not worker]
+                worker.sock.close()
+                return
+
+    def close(self) -> None:
+        """Close every worker connection"""
+        for worker in self._workers:
+            worker.close()
+        self._workers = []
+
+    def __enter__(self) -> 'DistributedEvaluator':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def main() -> None:
+    """Run an evaluation server until interrupted"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5555)
+    args = parser.parse_args()
+    with EvaluationServer(args.host, args.port) as server:
+        logger.info('Evaluation server listening on %s', server.address)
+        server.serve_forever()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
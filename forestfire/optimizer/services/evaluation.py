@@ -0,0 +1,269 @@
+"""Fitness evaluation backends for picker assignments.
+
+This module provides interchangeable evaluators that score a batch of
+assignments (one row per individual) with the route optimizer, either in the
+calling process or across a pool of worker processes that read the problem
+instance from shared memory.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import logging
+import os
+import random
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from forestfire.utils.config import (
+    PICKER_LOCATIONS, EVAL_WORKERS, EVAL_CHUNK_SIZE, EVAL_SEED,
+    EVAL_WORKER_ADDRESSES
+)
+from ..models.problem import ProblemInstance
+from .routing import RouteOptimizer
+
+logger = logging.getLogger(__name__)
+
+# Problem data rebuilt once per worker process by _init_worker
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+class SerialEvaluator:
+    """Evaluates assignments one after another in the calling process"""
+    def __init__(
+        self,
+        route_optimizer: RouteOptimizer,
+        orders_assign: List[Any],
+        picktasks: List[Any],
+        stage_result: Any,
+        picker_locations: Sequence[Tuple[float, float]] = PICKER_LOCATIONS
+    ):
+        self.route_optimizer = route_optimizer
+        self.orders_assign = orders_assign
+        self.picktasks = picktasks
+        self.stage_result = stage_result
+        self.picker_locations = picker_locations
+
+    def evaluate(self, genes: np.ndarray) -> np.ndarray:
+        """Return the fitness of every row of a gene matrix"""
+        return _evaluate_rows(
+            self.route_optimizer, self.picker_locations, genes,
+            self.orders_assign, self.picktasks, self.stage_result
+        )
+
+    def close(self) -> None:
+        """Release resources held by the evaluator"""
+
+    def __enter__(self) -> 'SerialEvaluator':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class SharedProblem:
+    """A ProblemInstance copied into one shared memory block.
+
+    The block name and layout are small and picklable, so worker processes
+    can attach to the instance without receiving the data itself.
+    """
+    def __init__(self, problem: ProblemInstance):
+        arrays = problem.arrays()
+        self.layout: Dict[str, Tuple[int, str, Tuple[int, ...]]] = {}
+        offset = 0
+        for name, array in arrays.items():
+            offset = -(-offset // 16) * 16
+            self.layout[name] = (offset, array.dtype.str, array.shape)
+            offset += array.nbytes
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=max(offset, 1)
+        )
+        for name, array in arrays.items():
+            self._view(self.shm, self.layout[name])[...] = array
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block"""
+        return self.shm.name
+
+    @staticmethod
+    def _view(
+        shm: shared_memory.SharedMemory,
+        spec: Tuple[int, str, Tuple[int, ...]]
+    ) -> np.ndarray:
+        offset, dtype, shape = spec
+        return np.ndarray(shape, dtype=np.dtype(dtype),
+                          buffer=shm.buf, offset=offset)
+
+    @classmethod
+    def attach(
+        cls,
+        name: str,
+        layout: Dict[str, Tuple[int, str, Tuple[int, ...]]]
+    ) -> Tuple[shared_memory.SharedMemory, ProblemInstance]:
+        """Attach to a block created in another process.
+
+        Returns:
+            The shared memory handle (keep it open while the arrays are in
+            use) and a ProblemInstance whose arrays view the block
+        """
+        shm = shared_memory.SharedMemory(name=name)
+        arrays = {key: cls._view(shm, spec) for key, spec in layout.items()}
+        return shm, ProblemInstance(**arrays)
+
+    def close(self) -> None:
+        """Release and remove the shared memory block"""
+        self.shm.close()
+        self.shm.unlink()
+
+
+class ProcessPoolEvaluator:
+    """Evaluates assignment batches in parallel worker processes.
+
+    The problem instance is placed in shared memory once; each worker
+    rebuilds its route inputs from it at start-up, so tasks only carry a
+    chunk of genes. Every chunk runs with its own RNG stream derived from
+    the evaluator seed and the chunk's position, which keeps results
+    reproducible regardless of which worker picks the chunk up.
+    """
+    def __init__(
+        self,
+        orders_assign: List[Any],
+        picktasks: List[Any],
+        stage_result: Any,
+        workers: int = None,
+        chunk_size: int = EVAL_CHUNK_SIZE,
+        seed: Optional[int] = EVAL_SEED,
+        picker_locations: Sequence[Tuple[float, float]] = PICKER_LOCATIONS
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self._seed_sequence = np.random.SeedSequence(seed)
+        self._shared = SharedProblem(ProblemInstance.from_lists(
+            orders_assign, picktasks, stage_result
+        ))
+        try:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self._shared.name, self._shared.layout,
+                          list(picker_locations))
+            )
+        except Exception:
+            self._shared.close()
+            raise
+
+    def evaluate(self, genes: np.ndarray) -> np.ndarray:
+        """Return the fitness of every row of a gene matrix"""
+        if len(genes) == 0:
+            return np.empty(0, dtype=np.float64)
+        chunks = [genes[start:start + self.chunk_size]
+                  for start in range(0, len(genes), self.chunk_size)]
+        seeds = self._seed_sequence.spawn(len(chunks))
+        return np.concatenate(list(
+            self._executor.map(_evaluate_chunk, chunks, seeds)
+        ))
+
+    def close(self) -> None:
+        """Stop the workers and release the shared problem data"""
+        self._executor.shutdown(wait=True)
+        self._shared.close()
+
+    def __enter__(self) -> 'ProcessPoolEvaluator':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def create_evaluator(
+    route_optimizer: RouteOptimizer,
+    orders_assign: List[Any],
+    picktasks: List[Any],
+    stage_result: Any,
+    workers: int = EVAL_WORKERS,
+    worker_addresses: Sequence[str] = EVAL_WORKER_ADDRESSES
+):
+    """Create the configured evaluator for one optimization wave.
+
+    Args:
+        route_optimizer: Route Optimizer used by the serial backend
+        orders_assign: List of orders to assign
+        picktasks: List of picking tasks
+        stage_result: Staging area result data
+        workers: Worker processes, 1 evaluates in the calling process and
+            0 or None uses every CPU
+        worker_addresses: host:port of remote evaluation servers; when
+            given, evaluation is distributed over them instead
+
+    Returns:
+        A SerialEvaluator, ProcessPoolEvaluator or DistributedEvaluator
+    """
+    if worker_addresses:
+        # pylint: disable=import-outside-toplevel
+        from .distributed import DistributedEvaluator
+        logger.info('Evaluating fitness on %d remote workers',
+                    len(worker_addresses))
+        return DistributedEvaluator(
+            worker_addresses, orders_assign, picktasks, stage_result
+        )
+    if workers == 1:
+        return SerialEvaluator(
+            route_optimizer, orders_assign, picktasks, stage_result
+        )
+    logger.info('Evaluating fitness on %s worker processes',
+                workers or os.cpu_count())
+    return ProcessPoolEvaluator(
+        orders_assign, picktasks, stage_result, workers=workers
+    )
+
+
+def _evaluate_rows(
+    route_optimizer: RouteOptimizer,
+    picker_locations: Sequence[Tuple[float, float]],
+    genes: np.ndarray,
+    orders_assign: List[Any],
+    picktasks: List[Any],
+    stage_result: Any
+) -> np.ndarray:
+    fitness = np.empty(len(genes), dtype=np.float64)
+    for i, assignment in enumerate(genes):
+        fitness[i], _, _ = route_optimizer.calculate_shortest_route(
+            picker_locations,
+            assignment.tolist(),
+            orders_assign,
+            picktasks,
+            stage_result
+        )
+    return fitness
+
+
+def _init_worker(
+    name: str,
+    layout: Dict[str, Tuple[int, str, Tuple[int, ...]]],
+    picker_locations: List[Tuple[float, float]]
+) -> None:
+    shm, problem = SharedProblem.attach(name, layout)
+    orders_assign, picktasks, stage_result = problem.to_lists()
+    _WORKER_STATE.update(
+        shm=shm,
+        route_optimizer=RouteOptimizer(),
+        picker_locations=picker_locations,
+        orders_assign=orders_assign,
+        picktasks=picktasks,
+        stage_result=stage_result
+    )
+
+
+def _evaluate_chunk(
+    genes: np.ndarray, seed: np.random.SeedSequence
+) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    random.seed(int(rng.integers(2**32)))
+    np.random.seed(int(rng.integers(2**32)))
+    return _evaluate_rows(
+        _WORKER_STATE['route_optimizer'],
+        _WORKER_STATE['picker_locations'],
+        genes,
+        _WORKER_STATE['orders_assign'],
+        _WORKER_STATE['picktasks'],
+        _WORKER_STATE['stage_result']
+    )
@@ -0,0 +1,178 @@
+"""Incremental route-cost estimates for local search.
+
+This module keeps a per-picker summary of the aisles a serpentine route has
+to visit, so the change in route cost caused by moving or swapping orders
+can be estimated without rebuilding any route.
+"""
+
+import math
+from typing import List, Sequence, Tuple
+from forestfire.utils.config import PICKER_LOCATIONS
+from .routing import RouteOptimizer
+
+
+class IncrementalRouteCost:
+    """Aisle-count surrogate of the serpentine route cost of an assignment.
+
+    A serpentine route crosses every aisle it visits from walkway to
+    walkway, walks between its first and last aisle and enters from the
+    picker's start at one end. Its cost is estimated from the number of
+    visited aisles, the lowest and highest one and that entry distance,
+    which only depend on per-aisle location counts. Moving an order touches
+    the counts of two pickers, so move deltas cost O(1) on average.
+
+    Attributes:
+        assignment: Current picker index per order, -1 while unassigned
+        total: Estimated total cost of the current assignment
+    """
+    def __init__(
+        self,
+        orders_assign: List[List[Tuple[float, float]]],
+        assignment: Sequence[int],
+        route_optimizer: RouteOptimizer = None,
+        picker_locations: Sequence[Tuple[float, float]] = PICKER_LOCATIONS
+    ):
+        route_optimizer = route_optimizer or RouteOptimizer()
+        self.step = route_optimizer.step_between_rows
+        self.width = (
+            route_optimizer.right_walkway - route_optimizer.left_walkway
+        )
+        self.order_aisles = [
+            [int(location[1] // self.step) for location in locations]
+            for locations in orders_assign
+        ]
+        num_aisles = 1 + max(
+            (max(aisles) for aisles in self.order_aisles if aisles),
+            default=0
+        )
+        self.picker_locations = [tuple(point) for point in picker_locations]
+        self.entry_x = [
+            route_optimizer.left_walkway if x < route_optimizer.midline
+            else route_optimizer.right_walkway
+            for x, _ in self.picker_locations
+        ]
+        num_pickers = len(self.picker_locations)
+        self.counts = [[0] * num_aisles for _ in range(num_pickers)]
+        self.visited = [0] * num_pickers
+        self.low = [num_aisles] * num_pickers
+        self.high = [-1] * num_pickers
+        self.assignment = [int(picker_id) for picker_id in assignment]
+        for order, picker_id in enumerate(self.assignment):
+            if picker_id >= 0:
+                self._shift(picker_id, self.order_aisles[order], 1)
+        self.costs = [self._picker_cost(p) for p in range(num_pickers)]
+        self.total = sum(self.costs)
+
+    def relocate_delta(self, order: int, picker_id: int) -> float:
+        """Cost change of moving one order to another picker"""
+        old_picker = self.assignment[order]
+        if old_picker == picker_id:
+            return 0.0
+        aisles = self.order_aisles[order]
+        return self._delta({old_picker: [(aisles, -1)],
+                            picker_id: [(aisles, 1)]})
+
+    def swap_delta(self, order1: int, order2: int) -> float:
+        """Cost change of exchanging the pickers of two orders"""
+        picker1, picker2 = self.assignment[order1], self.assignment[order2]
+        if picker1 == picker2:
+            return 0.0
+        aisles1, aisles2 = self.order_aisles[order1], self.order_aisles[order2]
+        return self._delta({
+            picker1: [(aisles1, -1), (aisles2, 1)],
+            picker2: [(aisles2, -1), (aisles1, 1)]
+        })
+
+    def insertion_delta(self, order: int, picker_id: int) -> float:
+        """Cost change of giving an unassigned order to a picker"""
+        return self._delta({picker_id: [(self.order_aisles[order], 1)]})
+
+    def removal_delta(self, order: int) -> float:
+        """Cost change of unassigning an order"""
+        picker_id = self.assignment[order]
+        if picker_id < 0:
+            return 0.0
+        return self._delta({picker_id: [(self.order_aisles[order], -1)]})
+
+    def remove(self, order: int) -> None:
+        """Unassign an order, marking it with picker -1"""
+        picker_id = self.assignment[order]
+        if picker_id < 0:
+            return
+        self._shift(picker_id, self.order_aisles[order], -1)
+        self.assignment[order] = -1
+        self._refresh(picker_id)
+
+    def insert(self, order: int, picker_id: int) -> None:
+        """Give an unassigned order to a picker"""
+        self._shift(picker_id, self.order_aisles[order], 1)
+        self.assignment[order] = picker_id
+        self._refresh(picker_id)
+
+    def relocate(self, order: int, picker_id: int) -> None:
+        """Move one order to another picker"""
+        old_picker = self.assignment[order]
+        if old_picker == picker_id:
+            return
+        self._shift(old_picker, self.order_aisles[order], -1)
+        self._shift(picker_id, self.order_aisles[order], 1)
+        self.assignment[order] = picker_id
+        self._refresh(old_picker, picker_id)
+
+    def swap(self, order1: int, order2: int) -> None:
+        """Exchange the pickers of two orders"""
+        picker1, picker2 = self.assignment[order1], self.assignment[order2]
+        if picker1 == picker2:
+            return
+        self._shift(picker1, self.order_aisles[order1], -1)
+        self._shift(picker2, self.order_aisles[order2], -1)
+        self._shift(picker1, self.order_aisles[order2], 1)
+        self._shift(picker2, self.order_aisles[order1], 1)
+        self.assignment[order1], self.assignment[order2] = picker2, picker1
+        self._refresh(picker1, picker2)
+
+    def _delta(self, changes) -> float:
+        delta = 0.0
+        for picker_id, shifts in changes.items():
+            for aisles, sign in shifts:
+                self._shift(picker_id, aisles, sign)
+            delta += self._picker_cost(picker_id) - self.costs[picker_id]
+            for aisles, sign in reversed(shifts):
+                self._shift(picker_id, aisles, -sign)
+        return delta
+
+    def _refresh(self, *pickers: int) -> None:
+        for picker_id in pickers:
+            cost = self._picker_cost(picker_id)
+            self.total += cost - self.costs[picker_id]
+            self.costs[picker_id] = cost
+
+    def _shift(self, picker_id: int, aisles: List[int], sign: int) -> None:
+        counts = self.counts[picker_id]
+        rescan = False
+        for aisle in aisles:
+            counts[aisle] += sign
+            if sign > 0 and counts[aisle] == 1:
+                self.visited[picker_id] += 1
+                self.low[picker_id] = min(self.low[picker_id], aisle)
+                self.high[picker_id] = max(self.high[picker_id], aisle)
+            elif sign < 0 and counts[aisle] == 0:
+                self.visited[picker_id] -= 1
+                rescan = rescan or aisle in (self.low[picker_id],
+                                             self.high[picker_id])
+        if rescan:
+            occupied = [a for a, count in enumerate(counts) if count]
+            self.low[picker_id] = occupied[0] if occupied else len(counts)
+            self.high[picker_id] = occupied[-1] if occupied else -1
+
+    def _picker_cost(self, picker_id: int) -> float:
+        if not self.visited[picker_id]:
+            return 0.0
+        x, y = self.picker_locations[picker_id]
+        entry_x = self.entry_x[picker_id]
+        low_y = self.low[picker_id] * self.step
+        high_y = self.high[picker_id] * self.step
+        entry = min(math.hypot(x - entry_x, y - low_y),
+                    math.hypot(x - entry_x, y - high_y))
+        return (self.visited[picker_id] * self.width
+                + high_y - low_y + entry)
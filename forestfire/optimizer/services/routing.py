@@ -19,6 +19,7 @@ class RouteOptimizer:
         self.left_walkway = left_walkway
         self.right_walkway = right_walkway
         self.step_between_rows = step_between_rows
+        self.midline = (left_walkway + right_walkway) / 2
         self.distance_calculator = DistanceCalculator()
         self.walkway_calculator = WalkwayCalculator(left_walkway, right_walkway)
 
@@ -209,7 +210,7 @@ class RouteOptimizer:
         )
 
         # Logic for left side of warehouse
-        if picker_location[0] < 50:
+        if picker_location[0] < self.midline:
             if dist1 < dist2:
                 route.insert(0, picker_location)
                 if route[1][1] % 20 == 0:
@@ -0,0 +1,170 @@
+"""Checkpoint files for long-running optimizations.
+
+This module stores optimizer state (population arrays, pheromone matrix,
+RNG state and counters) in a compressed NumPy archive so an interrupted run
+can resume where it stopped. Each checkpoint carries a fingerprint of the
+wave it belongs to, so a file left over from another wave is never resumed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from forestfire.utils.config import PICKER_CAPACITIES
+
+logger = logging.getLogger(__name__)
+
+_RNG_KEY = 'rng_state'
+_FINGERPRINT_KEY = 'fingerprint'
+_PARAMETER_PREFIX = 'parameter_'
+_CONTROLLER_PREFIX = 'controller_'
+
+
+def problem_fingerprint(
+    orders_assign: List[Any],
+    picktasks: List[Any],
+    picker_capacities: List[int] = PICKER_CAPACITIES
+) -> str:
+    """Identify a wave and picker setup for checkpoint matching.
+
+    Args:
+        orders_assign: List of orders to assign
+        picktasks: List of picking tasks
+        picker_capacities: Maximum orders per picker
+
+    Returns:
+        Hex digest that changes whenever any of the inputs does
+    """
+    key = repr((list(orders_assign), list(picktasks or []),
+                len(picker_capacities), list(picker_capacities)))
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def save_checkpoint(
+    path: str,
+    rng: np.random.Generator = None,
+    fingerprint: Optional[str] = None,
+    **state: Any
+) -> None:
+    """Atomically write a checkpoint.
+
+    Args:
+        path: Target .npz file
+        rng: Generator whose state is stored alongside the arrays
+        fingerprint: Problem fingerprint the state belongs to
+        **state: Arrays and scalars to store
+    """
+    arrays = {key: np.asarray(value) for key, value in state.items()}
+    if rng is not None:
+        arrays[_RNG_KEY] = rng_state(rng)
+    if fingerprint is not None:
+        arrays[_FINGERPRINT_KEY] = np.array(fingerprint)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as handle:
+        np.savez_compressed(handle, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(
+    path: Optional[str], fingerprint: Optional[str] = None
+) -> Optional[Dict[str, np.ndarray]]:
+    """Read a checkpoint written by save_checkpoint.
+
+    A checkpoint saved for a different problem than the given fingerprint
+    is stale and gets deleted.
+
+    Args:
+        path: Checkpoint file, may be None or missing
+        fingerprint: Problem fingerprint the checkpoint must match, or None
+            to accept any checkpoint
+
+    Returns:
+        Stored arrays by name, or None if there is no matching checkpoint
+    """
+    if not path or not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as archive:
+        state = {key: archive[key] for key in archive.files}
+    if fingerprint is not None and (
+            _FINGERPRINT_KEY not in state
+            or str(state[_FINGERPRINT_KEY][()]) != fingerprint):
+        logger.warning('Discarding checkpoint %s from another wave', path)
+        remove_checkpoint(path)
+        return None
+    return state
+
+
+def rng_state(rng: np.random.Generator) -> np.ndarray:
+    """Capture a generator's state as an array save_checkpoint can store"""
+    return np.array(json.dumps(rng.bit_generator.state))
+
+
+def restore_rng(
+    rng: np.random.Generator,
+    state: Dict[str, np.ndarray],
+    key: str = _RNG_KEY
+) -> None:
+    """Put a generator back into the state stored in a checkpoint.
+
+    Args:
+        rng: Generator to restore
+        state: Arrays returned by load_checkpoint
+        key: Entry holding the generator state, by default the one saved
+            for the rng argument of save_checkpoint
+    """
+    if key in state:
+        rng.bit_generator.state = json.loads(str(state[key][()]))
+
+
+def tuning_state(
+    target: Any, names: Sequence[str], controller: Any = None
+) -> Dict[str, np.ndarray]:
+    """Collect tuned operator parameters and controller feedback.
+
+    Args:
+        target: Operator or colony whose parameters are stored
+        names: Attributes of target to store
+        controller: Optional AdaptiveController whose state is stored
+
+    Returns:
+        Arrays to pass to save_checkpoint
+    """
+    state = {f'{_PARAMETER_PREFIX}{name}': np.asarray(getattr(target, name))
+             for name in names}
+    if controller is not None:
+        state.update((f'{_CONTROLLER_PREFIX}{key}', value)
+                     for key, value in controller.state().items())
+    return state
+
+
+def restore_tuning(
+    target: Any,
+    names: Sequence[str],
+    state: Dict[str, np.ndarray],
+    controller: Any = None
+) -> None:
+    """Put back parameters and feedback collected by tuning_state.
+
+    Parameters missing from older checkpoints keep their current values.
+    """
+    for name in names:
+        key = f'{_PARAMETER_PREFIX}{name}'
+        if key in state:
+            kind = type(getattr(target, name))
+            setattr(target, name, kind(state[key][()]))
+    feedback = {key[len(_CONTROLLER_PREFIX):]: value
+                for key, value in state.items()
+                if key.startswith(_CONTROLLER_PREFIX)}
+    if controller is not None and feedback:
+        controller.restore(feedback)
+
+
+def remove_checkpoint(path: Optional[str]) -> None:
+    """Delete a checkpoint once its run has finished"""
+    if path and os.path.exists(path):
+        os.remove(path)
@@ -8,17 +8,57 @@ COLS = 100
 NUM_ITEMS = 100
 NUM_PICKERS = 10
 MAX_IT = 50
+STAGNATION_LIMIT = 20
+CHECKPOINT_DIR = None
+CHECKPOINT_INTERVAL = 5
+REFINE_METHOD = 'annealing'
+# Seconds of annealing or tabu refinement after the GA; 0 disables it
+REFINE_TIME = 0
+TABU_TENURE = 20
+ALNS_ITERATIONS = 0
+ALNS_REMOVAL_FRACTION = 0.1
+PORTFOLIO_MODE = False
+PORTFOLIO_BUDGET = 60.0
+PORTFOLIO_UNIT = 'time'
+PORTFOLIO_ALNS_ITERATIONS = 200
+# Fitness evaluations one surrogate-scored ALNS iteration counts as
+PORTFOLIO_SURROGATE_COST = 0.05
 N_POP = 150
 PC = 0.90
 PM = 0.04
 NM = round(N_POP * PM)
 NC = 2 * round((N_POP * PC) / 2)
 TOURNAMENT_SIZE = 5
+DEDUPLICATE_POPULATION = False
+ENCODING = 'assignment'
+CROSSOVER = 'positional'
+AFFINITY_RADIUS = 20.0
+AFFINITY_THRESHOLD = 0.5
+ISLAND_MODE = False
+NUM_ISLANDS = 4
+MIGRATION_INTERVAL = 5
+NUM_MIGRANTS = 2
+MIGRATION_TOPOLOGY = 'ring'
+SEEDING = 'random'
+SEED_RANDOM_SHARE = 0.5
+SEED_PERTURBATION = 0.05
+CONSTRUCTIVE_SEED = False
+ADAPTIVE_CONTROL = False
+TARGET_DIVERSITY = 0.2
 ALPHA = 1.0
 BETA = 2.0
 RHO = 0.5
 Q = 100
 NUM_ANTS = 25
+ACO_BATCH_SIZE = 1
+EVAL_WORKERS = 1
+EVAL_CHUNK_SIZE = 16
+EVAL_SEED = None
+EVAL_WORKER_ADDRESSES = []
+EVAL_WORKER_TIMEOUT = 60
+# Largest message header and array payload an evaluation server accepts
+EVAL_MAX_HEADER_SIZE = 64 * 1024
+EVAL_MAX_PAYLOAD_SIZE = 256 * 1024 * 1024
 STEP_BETWEEN_ROWS = 10
 LEFT_WALKWAY = 15
 RIGHT_WALKWAY = 105
@@ -60,3 +100,26 @@ ITEM_LOCATIONS = [
     (100, 90), (96, 90), (65, 90), (57, 90), (31, 90)
 ]
 WAREHOUSE_NAME = 'DEV-PK-WAREHOUSE'
+# Picklist columns read by the optimizer, in the order
+# id, picktask, pick x, pick y, staging x, staging y
+PICKLIST_COLUMNS = (
+    'id', 'picktaskid', 'xcoordinate', 'ycoordinate',
+    'stagingxcoordinate', 'stagingycoordinate'
+)
+PICKLIST_FETCH_SIZE = 5000
+# Keep the problem instance between waves and fetch only rows whose
+# watermark column (a timestamp column or the system column xmin) advanced
+PICKLIST_SNAPSHOT = False
+PICKLIST_WATERMARK_COLUMN = 'xmin'
+# File the snapshot is kept in between runs; None keeps it in memory only
+PICKLIST_SNAPSHOT_PATH = 'picklist_snapshot.npz'
+# Seconds a timestamp watermark is moved back to catch rows committed late
+# with older timestamps; xmin needs no margin
+PICKLIST_WATERMARK_MARGIN = 300
+# Write-back commits per chunk of about this many picklists, keeping each
+# picker batch in one chunk; 0 writes everything in one transaction
+WRITEBACK_CHUNK_SIZE = 0
+WRITEBACK_RETRIES = 2
+WRITEBACK_RETRY_DELAY = 0.5
+# Run main on an event loop, overlapping plotting with the write-back
+ASYNC_PIPELINE = False
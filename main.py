@@ -1,21 +1,55 @@
 """Main module for warehouse order picking
    optimization using hybrid ACO-GA approach."""
 
+import asyncio
 import logging
-from typing import List, Any
-import random
+import os
+from typing import Any, Callable, Dict, List, Optional
 
 import numpy as np
 
 from forestfire.utils.config import (
     NUM_PICKERS, PICKER_CAPACITIES, PICKER_LOCATIONS,
-    N_POP, NUM_ANTS, MAX_IT, NC, NM, TOURNAMENT_SIZE
+    N_POP, NUM_ANTS, ACO_BATCH_SIZE, ISLAND_MODE, CHECKPOINT_DIR,
+    CHECKPOINT_INTERVAL, ENCODING, REFINE_TIME, ALNS_ITERATIONS,
+    ADAPTIVE_CONTROL, PORTFOLIO_MODE, PORTFOLIO_ALNS_ITERATIONS, SEEDING,
+    CONSTRUCTIVE_SEED, CROSSOVER, ASYNC_PIPELINE, PICKLIST_SNAPSHOT_PATH
+)
+from forestfire.utils.checkpoint import (
+    load_checkpoint, problem_fingerprint, remove_checkpoint, restore_rng,
+    restore_tuning, rng_state, save_checkpoint, tuning_state
 )
 from forestfire.database.services.picklist import PicklistRepository
 from forestfire.database.services.batch_pick_seq_service import BatchPickSequenceService
+from forestfire.database.async_repository import (
+    AsyncBatchPickSequenceService, AsyncPicklistRepository
+)
 from forestfire.optimizer.services.routing import RouteOptimizer
+from forestfire.optimizer.services.evaluation import (
+    SerialEvaluator, create_evaluator
+)
 from forestfire.algorithms.genetic import GeneticOperator
 from forestfire.algorithms.ant_colony import AntColonyOptimizer
+from forestfire.algorithms.adaptive import (
+    COLONY_PARAMETERS, AdaptiveController
+)
+from forestfire.algorithms.alns import ALNSOptimizer
+from forestfire.algorithms.constructive import ConstructiveSolver
+from forestfire.algorithms.anytime import (
+    AnytimeOptimizer, CancellationToken, Deadline, Progress, should_stop
+)
+from forestfire.algorithms.giant_tour import (
+    DecodingEvaluator, GiantTourOperator, SplitDecoder
+)
+from forestfire.algorithms.island import IslandModel
+from forestfire.algorithms.local_search import LocalSearch
+from forestfire.algorithms.portfolio import (
+    ColonyEngine, GeneticEngine, LocalSearchEngine, PortfolioScheduler
+)
+from forestfire.algorithms.population import (
+    GENE_DTYPE, Population, random_feasible_genes
+)
+from forestfire.algorithms.seeding import seed_population
 from forestfire.plots.graph import PathVisualizer
 
 
@@ -25,33 +59,32 @@ logger = logging.getLogger(__name__)
 def initialize_population(
     num_pickers: int,
     orders_size: int,
-    picker_capacities: List[int]
-) -> List[List[int]]:
+    picker_capacities: List[int],
+    rng: np.random.Generator = None,
+    orders_assign: Optional[List[Any]] = None
+) -> np.ndarray:
     """Initialize population with valid picker assignments.
 
     Args:
         num_pickers: Number of available pickers
         orders_size: Number of orders to assign
         picker_capacities: List of picker capacity constraints
+        rng: Random generator, a fresh one is used when omitted
+        orders_assign: Order locations; with SEEDING = 'cluster' they are
+            used to seed spatially clustered assignments
 
     Returns:
-        List of valid picker assignments
+        Matrix of valid picker assignments, one row per individual
     """
-    population = []
-    for _ in range(N_POP - 1):
-        assignment = []
-        assigned_counts = [0] * num_pickers
-        for _ in range(orders_size):
-            valid_pickers = [
-                i for i in range(num_pickers)
-                if assigned_counts[i] < picker_capacities[i]
-            ]
-            picker_id = random.choice(valid_pickers)
-            assigned_counts[picker_id] += 1
-            assignment.append(picker_id)
-        random.shuffle(assignment)
-        population.append(assignment)
-    return population
+    rng = rng if rng is not None else np.random.default_rng()
+    if SEEDING == 'cluster' and orders_assign is not None:
+        return seed_population(
+            orders_assign, N_POP - 1, rng, picker_capacities[:num_pickers],
+            picker_locations=PICKER_LOCATIONS[:num_pickers]
+        )
+    return random_feasible_genes(
+        rng, N_POP - 1, orders_size, picker_capacities[:num_pickers]
+    )
 
 
 def run_aco_optimization(
@@ -59,7 +92,14 @@ def run_aco_optimization(
     route_optimizer: RouteOptimizer,
     orders_assign: List[Any],
     picktasks: List[Any],
-    stage_result: Any
+    stage_result: Any,
+    evaluator: Any = None,
+    ants_per_batch: int = 1,
+    deadline: Optional[Deadline] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    checkpoint_path: Optional[str] = None,
+    controller: Optional[AdaptiveController] = None,
+    population_rng: Optional[np.ndarray] = None
 ) -> List[List[Any]]:
     """Run Ant Colony Optimization phase.
 
@@ -69,39 +109,118 @@ def run_aco_optimization(
         orders_assign: List of orders to assign
         picktasks: List of picking tasks
         stage_result: Staging area result data
+        evaluator: Fitness evaluator, serial on route_optimizer if omitted
+        ants_per_batch: Ants built on the same pheromone and evaluated
+            together; 1 updates the pheromone after every ant
+        deadline: Stop building ants once this deadline has passed
+        cancel_token: Stop building ants once cancellation is requested
+        checkpoint_path: File to save progress to every CHECKPOINT_INTERVAL
+            batches and to resume from if it was saved for the same wave
+        controller: Retunes the colony's parameters after every batch
+        population_rng: Generator state the initial population was drawn
+            from, saved with the checkpoint so a resumed run draws the
+            same population
 
     Returns:
         List of solutions with their fitness scores
     """
+    if evaluator is None:
+        evaluator = SerialEvaluator(
+            route_optimizer, orders_assign, picktasks, stage_result
+        )
     empty_pop = []
     pheromone = np.ones((len(orders_assign), NUM_PICKERS))
     heuristic = aco.calculate_heuristic(orders_assign, PICKER_LOCATIONS)
-    for _ in range(NUM_ANTS):
-        assignment = aco.build_solution(
-            pheromone, heuristic, len(orders_assign), PICKER_CAPACITIES
-        )
-        fitness_score, _, _ = route_optimizer.calculate_shortest_route(
-            PICKER_LOCATIONS,
-            assignment,
-            orders_assign,
-            picktasks,
-            stage_result
-        )
-        empty_pop.append([assignment, fitness_score])
-        aco.update_pheromone(pheromone,
-                            assignment,
-                            fitness_score,
-                            len(orders_assign))
+    start_ant = 0
+    fingerprint = problem_fingerprint(orders_assign, picktasks)
+    state = load_checkpoint(checkpoint_path, fingerprint)
+    if state is not None and state['pheromone'].shape == pheromone.shape:
+        logger.info('Resuming ACO from checkpoint %s at ant %d',
+                    checkpoint_path, int(state['ants']))
+        restore_rng(aco.rng, state)
+        restore_tuning(aco, COLONY_PARAMETERS, state, controller)
+        pheromone = state['pheromone']
+        start_ant = int(state['ants'])
+        empty_pop = Population(state['genes'], state['fitness']).to_pairs()
+
+    batch_size = max(1, ants_per_batch)
+    stop_reason = None
+    for batch_index, first_ant in enumerate(
+            range(start_ant, NUM_ANTS, batch_size), start=1):
+        stop_reason = should_stop(deadline, cancel_token)
+        if stop_reason:
+            break
+        batch = min(batch_size, NUM_ANTS - first_ant)
+        assignments = [
+            aco.build_solution(
+                pheromone, heuristic, len(orders_assign), PICKER_CAPACITIES
+            )
+            for _ in range(batch)
+        ]
+        genes = np.array(assignments, dtype=GENE_DTYPE)
+        fitness = evaluator.evaluate(genes)
+        for assignment, fitness_score in zip(assignments, fitness):
+            empty_pop.append([assignment, float(fitness_score)])
+            aco.update_pheromone(pheromone,
+                                assignment,
+                                fitness_score,
+                                len(orders_assign))
+        if controller is not None:
+            controller.update_colony(aco, genes, fitness)
+        if checkpoint_path and batch_index % CHECKPOINT_INTERVAL == 0:
+            _save_aco_checkpoint(checkpoint_path, aco, pheromone, empty_pop,
+                                 fingerprint, controller, population_rng)
+
+    if stop_reason == 'cancelled' and checkpoint_path:
+        _save_aco_checkpoint(checkpoint_path, aco, pheromone, empty_pop,
+                             fingerprint, controller, population_rng)
+    else:
+        remove_checkpoint(checkpoint_path)
     return empty_pop
 
 
+def _save_aco_checkpoint(
+    path: str,
+    aco: AntColonyOptimizer,
+    pheromone: np.ndarray,
+    empty_pop: List[List[Any]],
+    fingerprint: str,
+    controller: Optional[AdaptiveController] = None,
+    population_rng: Optional[np.ndarray] = None
+) -> None:
+    """Save ACO progress, the colony's parameters and controller state"""
+    solutions = Population.from_pairs(empty_pop) if empty_pop else None
+    extra = {} if population_rng is None else {
+        'population_rng': population_rng
+    }
+    save_checkpoint(
+        path,
+        rng=aco.rng,
+        fingerprint=fingerprint,
+        pheromone=pheromone,
+        ants=len(empty_pop),
+        genes=(solutions.genes if solutions
+               else np.empty((0, len(pheromone)), dtype=GENE_DTYPE)),
+        fitness=solutions.fitness if solutions else np.empty(0),
+        **tuning_state(aco, COLONY_PARAMETERS, controller),
+        **extra
+    )
+
+
 def run_genetic_optimization(
     genetic_op: GeneticOperator,
     route_optimizer: RouteOptimizer,
-    pop: List[List[Any]],
+    pop: Population,
     orders_assign: List[Any],
     picktasks: List[Any],
-    stage_result: Any
+    stage_result: Any,
+    evaluator: Any = None,
+    deadline: Optional[Deadline] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    callback: Callable[[Progress], None] = None,
+    checkpoint_path: Optional[str] = None,
+    controller: Optional[AdaptiveController] = None,
+    fingerprint: Optional[str] = None
 ) -> List[int]:
     """Run Genetic Algorithm optimization phase.
 
@@ -112,102 +231,380 @@ def run_genetic_optimization(
         orders_assign: List of orders to assign
         picktasks: List of picking tasks
         stage_result: Staging area result data
+        evaluator: Fitness evaluator, serial on route_optimizer if omitted
+        deadline: Return the best-so-far solution by this deadline
+        cancel_token: Return the best-so-far solution once cancelled
+        callback: Receives the best-so-far solution after each generation
+        checkpoint_path: File to save progress to every CHECKPOINT_INTERVAL
+            generations and to resume from; pop may be None if it exists
+        controller: Retunes the operator's rates after every generation
+        fingerprint: Problem fingerprint a checkpoint must carry to be
+            resumed, see problem_fingerprint
 
     Returns:
         Best solution found
     """
-    for iteration in range(MAX_IT):
-        crossover_population = []
-        for _ in range(NC // 2):
-            parent1 = genetic_op.tournament_selection(pop, TOURNAMENT_SIZE)
-            parent2 = genetic_op.tournament_selection(pop, TOURNAMENT_SIZE)
-            offspring1, offspring2 = genetic_op.crossover(parent1, parent2)
-            fitness1, _, _ = route_optimizer.calculate_shortest_route(
-                PICKER_LOCATIONS,
-                offspring1,
-                orders_assign,
-                picktasks,
-                stage_result
+    if evaluator is None:
+        evaluator = SerialEvaluator(
+            route_optimizer, orders_assign, picktasks, stage_result
+        )
+    optimizer = AnytimeOptimizer(
+        genetic_op, evaluator, deadline=deadline, cancel_token=cancel_token,
+        checkpoint_path=checkpoint_path, controller=controller,
+        fingerprint=fingerprint
+    )
+    for progress in optimizer.iterate(pop):
+        logger.info('Iteration %d: Best Solution = %f',
+                    progress.iteration, progress.best_fitness)
+        if callback is not None:
+            callback(progress)
+    logger.info('GA stopped after %s', optimizer.stop_reason)
+    return optimizer.best_solution
+
+
+def run_giant_tour_optimization(
+    route_optimizer: RouteOptimizer,
+    pop: Optional[Population],
+    orders_assign: List[Any],
+    evaluator: Any,
+    rng: np.random.Generator = None,
+    deadline: Optional[Deadline] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    callback: Callable[[Progress], None] = None,
+    checkpoint_path: Optional[str] = None,
+    controller: Optional[AdaptiveController] = None,
+    fingerprint: Optional[str] = None
+) -> List[int]:
+    """Run the GA phase on giant-tour chromosomes.
+
+    Each assignment of the starting population is turned into a tour
+    grouped by picker, the tours are evolved with order crossover and
+    inversion, and the best tour is split back into an assignment.
+
+    Args:
+        route_optimizer: Route Optimizer instance
+        pop: Initial population of assignments; may be None when resuming
+        orders_assign: List of orders to assign
+        evaluator: Fitness evaluator for assignments
+        rng: Random generator driving the operators
+        deadline: Return the best-so-far solution by this deadline
+        cancel_token: Return the best-so-far solution once cancelled
+        callback: Receives the best-so-far tour after each generation
+        checkpoint_path: File to save progress to and resume from
+        controller: Retunes the operator's rates after every generation
+        fingerprint: Problem fingerprint a checkpoint must carry to be
+            resumed
+
+    Returns:
+        Best assignment found
+    """
+    decoder = SplitDecoder(orders_assign, route_optimizer)
+    tour_op = GiantTourOperator(decoder, rng)
+    tour_evaluator = DecodingEvaluator(decoder, evaluator)
+    if pop is not None:
+        tours = np.array([decoder.encode(genes) for genes in pop.genes],
+                         dtype=GENE_DTYPE).reshape(pop.genes.shape)
+        pop = Population(tours, tour_evaluator.evaluate(tours))
+    best_tour = run_genetic_optimization(
+        tour_op, route_optimizer, pop, orders_assign, None, None,
+        evaluator=tour_evaluator, deadline=deadline,
+        cancel_token=cancel_token, callback=callback,
+        checkpoint_path=checkpoint_path, controller=controller,
+        fingerprint=fingerprint
+    )
+    return decoder.decode(best_tour).tolist()
+
+
+def run_portfolio_optimization(
+    genetic_op: GeneticOperator,
+    aco: AntColonyOptimizer,
+    route_optimizer: RouteOptimizer,
+    pop: Population,
+    orders_assign: List[Any],
+    evaluator: Any,
+    rng: np.random.Generator = None,
+    deadline: Optional[Deadline] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    controller: Optional[AdaptiveController] = None
+) -> List[int]:
+    """Share the optimization budget between ACO, GA and ALNS.
+
+    Args:
+        genetic_op: Genetic Operator instance
+        aco: Ant Colony Optimizer instance
+        route_optimizer: Route Optimizer instance
+        pop: Initial, evaluated population
+        orders_assign: List of orders to assign
+        evaluator: Fitness evaluator shared by all engines
+        rng: Random generator for the engines and the scheduler
+        deadline: Return the best solution by this deadline
+        cancel_token: Return the best solution once cancelled
+        controller: Retunes the GA and ACO parameters as they run
+
+    Returns:
+        Best solution found
+    """
+    genes, fitness = pop.best()
+    engines = [
+        ColonyEngine(aco, evaluator, orders_assign,
+                     ants_per_step=ACO_BATCH_SIZE, controller=controller),
+        GeneticEngine(genetic_op, evaluator, pop, controller=controller),
+        LocalSearchEngine(
+            ALNSOptimizer(route_optimizer, rng,
+                          iterations=PORTFOLIO_ALNS_ITERATIONS),
+            evaluator, orders_assign, genes, fitness,
+            deadline=deadline, cancel_token=cancel_token
+        )
+    ]
+    solution, fitness = PortfolioScheduler(engines, rng=rng).run(
+        genes, fitness, deadline=deadline, cancel_token=cancel_token
+    )
+    logger.info('Portfolio Solution = %f', fitness)
+    return solution
+
+
+def run_local_search(
+    route_optimizer: RouteOptimizer,
+    solution: List[int],
+    orders_assign: List[Any],
+    evaluator: Any,
+    rng: np.random.Generator = None,
+    deadline: Optional[Deadline] = None,
+    cancel_token: Optional[CancellationToken] = None
+) -> List[int]:
+    """Refine the final solution with simulated annealing or tabu search.
+
+    Args:
+        route_optimizer: Route Optimizer instance
+        solution: Best assignment of the GA phase
+        orders_assign: List of orders to assign
+        evaluator: Fitness evaluator confirming the refinement
+        rng: Random generator driving the search
+        deadline: Stop refining by this deadline
+        cancel_token: Stop refining once cancelled
+
+    Returns:
+        The refined solution, or solution if it could not be improved
+    """
+    if not REFINE_TIME or should_stop(deadline, cancel_token):
+        return solution
+    refined, fitness = LocalSearch(
+        route_optimizer, rng, time_limit=REFINE_TIME
+    ).refine(
+        solution, orders_assign, evaluator,
+        deadline=deadline, cancel_token=cancel_token
+    )
+    logger.info('Refined Solution = %f', fitness)
+    return refined
+
+
+def run_optimization(
+    services: Dict[str, Any],
+    rng: np.random.Generator,
+    orders_assign: List[Any],
+    picktasks: List[Any],
+    stage_result: Any,
+    deadline: Optional[Deadline] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    callback: Callable[[Progress], None] = None,
+    seed: Optional[List[int]] = None
+) -> List[int]:
+    """Run the configured optimization phases on one wave.
+
+    Args:
+        services: Service instances created by main
+        rng: Random generator shared by the phases
+        orders_assign: List of orders to assign
+        picktasks: List of picking tasks
+        stage_result: Staging area result data
+        deadline: Wall-clock limit for the optimization phases
+        cancel_token: Token to stop the optimization early
+        callback: Receives the best-so-far solution after each generation
+        seed: Optional assignment added to the initial population
+
+    Returns:
+        Best solution found
+    """
+    checkpoints = {
+        phase: (os.path.join(CHECKPOINT_DIR, f'{phase}.npz')
+                if CHECKPOINT_DIR else None)
+        for phase in ('aco', 'ga', 'tour')
+    }
+    ga_checkpoint = checkpoints['tour' if ENCODING == 'giant_tour' else 'ga']
+    fingerprint = problem_fingerprint(orders_assign, picktasks)
+    controller = AdaptiveController() if ADAPTIVE_CONTROL else None
+    if CROSSOVER == 'affinity':
+        services['genetic_op'].use_affinity(orders_assign)
+
+    with create_evaluator(
+        services['route_optimizer'], orders_assign, picktasks, stage_result
+    ) as evaluator:
+        if (not PORTFOLIO_MODE
+                and load_checkpoint(ga_checkpoint, fingerprint) is not None):
+            # The GA checkpoint of this wave holds the whole population
+            pop = None
+        else:
+            # A resumed ACO run draws the population it was started with
+            aco_state = (None if PORTFOLIO_MODE
+                         else load_checkpoint(checkpoints['aco'], fingerprint))
+            if aco_state is not None:
+                restore_rng(rng, aco_state, key='population_rng')
+            population_rng = rng_state(rng)
+
+            # Initialize and evaluate population
+            initial_genes = initialize_population(
+                NUM_PICKERS, len(orders_assign), PICKER_CAPACITIES, rng,
+                orders_assign
             )
-            fitness2, _, _ = route_optimizer.calculate_shortest_route(
-                PICKER_LOCATIONS,
-                offspring2,
-                orders_assign,
-                picktasks,
-                stage_result
+            if seed is not None:
+                initial_genes = np.concatenate([
+                    initial_genes, np.array([seed], dtype=GENE_DTYPE)
+                ])
+            pop = Population(initial_genes, evaluator.evaluate(initial_genes))
+
+            # Run ACO optimization; the portfolio schedules it itself
+            aco_solutions = [] if PORTFOLIO_MODE else run_aco_optimization(
+                services['aco'], services['route_optimizer'],
+                orders_assign, picktasks, stage_result,
+                evaluator=evaluator, ants_per_batch=ACO_BATCH_SIZE,
+                deadline=deadline, cancel_token=cancel_token,
+                checkpoint_path=checkpoints['aco'], controller=controller,
+                population_rng=population_rng
             )
-            crossover_population.extend([[offspring1, fitness1],
-                                        [offspring2, fitness2]])
-
-        mutation_population = []
-        for _ in range(NM):
-            parent = random.choice(pop)[0]
-            offspring = genetic_op.mutate_with_capacity(
-                        parent,
-                        PICKER_CAPACITIES
-                        )
-            fitness, _, _ = route_optimizer.calculate_shortest_route(
-                PICKER_LOCATIONS,
-                offspring,
-                orders_assign,
-                picktasks,
-                stage_result
+            if aco_solutions:
+                aco_pop = Population.from_pairs(aco_solutions)
+                pop = pop.merge(aco_pop.genes, aco_pop.fitness)
+            pop = pop.sorted()
+
+            # Improve the best individual with ALNS
+            if ALNS_ITERATIONS > 0:
+                genes, _ = pop.best()
+                solution, fitness = ALNSOptimizer(
+                    services['route_optimizer'], rng
+                ).run(genes.tolist(), orders_assign, evaluator,
+                      deadline=deadline, cancel_token=cancel_token)
+                logger.info('ALNS Solution = %f', fitness)
+                pop = pop.merge(np.array([solution], dtype=GENE_DTYPE),
+                                np.array([fitness])).sorted()
+
+        # Run GA optimization
+        if PORTFOLIO_MODE:
+            final_solution = run_portfolio_optimization(
+                services['genetic_op'], services['aco'],
+                services['route_optimizer'], pop, orders_assign, evaluator,
+                rng, deadline=deadline, cancel_token=cancel_token,
+                controller=controller
+            )
+        elif ISLAND_MODE:
+            final_solution, _ = IslandModel().run(
+                orders_assign, picktasks, stage_result, initial=pop,
+                deadline=deadline, cancel_token=cancel_token
+            )
+        elif ENCODING == 'giant_tour':
+            final_solution = run_giant_tour_optimization(
+                services['route_optimizer'], pop, orders_assign, evaluator,
+                rng, deadline=deadline, cancel_token=cancel_token,
+                callback=callback, checkpoint_path=ga_checkpoint,
+                controller=controller, fingerprint=fingerprint
+            )
+        else:
+            final_solution = run_genetic_optimization(
+                services['genetic_op'], services['route_optimizer'],
+                pop, orders_assign, picktasks, stage_result,
+                evaluator=evaluator, deadline=deadline,
+                cancel_token=cancel_token, callback=callback,
+                checkpoint_path=ga_checkpoint, controller=controller,
+                fingerprint=fingerprint
             )
-            mutation_population.append([offspring, fitness])
 
-        pop.extend(crossover_population + mutation_population)
-        pop.sort(key=lambda x: x[1])
-        pop = pop[:N_POP]
-        logger.info('Iteration %d: Best Solution = %f', iteration, pop[0][1])
-    return pop[0][0]
+        # Intensify around the best solution
+        final_solution = run_local_search(
+            services['route_optimizer'], final_solution, orders_assign,
+            evaluator, rng, deadline=deadline, cancel_token=cancel_token
+        )
+    return final_solution
 
 
-def main() -> None:
-    """Main execution function."""
-    services = {
-        'picklist_repo': PicklistRepository(),
+def create_services(rng: np.random.Generator) -> Dict[str, Any]:
+    """Create the repository, optimizer and output services of a run"""
+    return {
+        'picklist_repo': PicklistRepository(PICKLIST_SNAPSHOT_PATH),
         'route_optimizer': RouteOptimizer(),
-        'genetic_op': GeneticOperator(RouteOptimizer()),
-        'aco': AntColonyOptimizer(RouteOptimizer()),
+        'genetic_op': GeneticOperator(RouteOptimizer(), rng),
+        'aco': AntColonyOptimizer(RouteOptimizer(), rng),
         'path_visualizer': PathVisualizer(),
         'picksequence_service': BatchPickSequenceService()
     }
 
-    # Get optimization data
-    picktasks, orders_assign, stage_result, picklistids = (
-        services['picklist_repo'].get_optimized_data()
-    )
 
-    # Initialize and evaluate population
-    initial_population = initialize_population(
-        NUM_PICKERS, len(orders_assign), PICKER_CAPACITIES
-    )
-    empty_pop = []
-    for position in initial_population:
-        route_optimizer = services['route_optimizer']
-        fitness_score, _, _ = route_optimizer.calculate_shortest_route(
-            PICKER_LOCATIONS,
-            position,
-            orders_assign,
-            picktasks,
-            stage_result
+def solve_wave(
+    services: Dict[str, Any],
+    rng: np.random.Generator,
+    orders_assign: List[Any],
+    picktasks: List[Any],
+    stage_result: Any,
+    deadline: Optional[Deadline] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    callback: Callable[[Progress], None] = None
+) -> List[int]:
+    """Optimize one wave, or answer constructively when out of time.
+
+    Args:
+        services: Service instances created by create_services
+        rng: Random generator shared by the phases
+        orders_assign: List of orders to assign
+        picktasks: List of picking tasks
+        stage_result: Staging area result data
+        deadline: Wall-clock limit for the optimization phases
+        cancel_token: Token to stop the optimization early
+        callback: Receives the best-so-far solution after each generation
+
+    Returns:
+        Best solution found
+    """
+    # A quick constructive answer, used when no time is left to optimize
+    fallback = None
+    if deadline is not None or CONSTRUCTIVE_SEED:
+        fallback = ConstructiveSolver(services['route_optimizer']).solve(
+            orders_assign
         )
-        empty_pop.append([position, fitness_score])
+    if fallback is not None and should_stop(deadline, cancel_token):
+        logger.warning('No time left to optimize, using constructive solution')
+        final_solution = fallback
+    else:
+        final_solution = run_optimization(
+            services, rng, orders_assign, picktasks, stage_result,
+            deadline=deadline, cancel_token=cancel_token, callback=callback,
+            seed=fallback if CONSTRUCTIVE_SEED else None
+        )
+    logger.info('\nFinal Best Solution: %s', final_solution)
+    return final_solution
 
-    # Run ACO optimization
-    aco_solutions = run_aco_optimization(
-        services['aco'], services['route_optimizer'],
-        orders_assign, picktasks, stage_result
+
+def main(
+    deadline: Optional[Deadline] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    callback: Callable[[Progress], None] = None
+) -> None:
+    """Main execution function.
+
+    Args:
+        deadline: Wall-clock limit for the optimization phases
+        cancel_token: Token to stop the optimization early
+        callback: Receives the best-so-far solution after each generation
+    """
+    rng = np.random.default_rng()
+    services = create_services(rng)
+
+    # Get optimization data
+    picktasks, orders_assign, stage_result, picklistids = (
+        services['picklist_repo'].get_optimized_data()
     )
-    empty_pop.extend(aco_solutions)
 
-    # Run GA optimization
-    pop = sorted(empty_pop, key=lambda x: x[1])
-    final_solution = run_genetic_optimization(
-        services['genetic_op'], services['route_optimizer'],
-        pop, orders_assign, picktasks, stage_result
+    final_solution = solve_wave(
+        services, rng, orders_assign, picktasks, stage_result,
+        deadline=deadline, cancel_token=cancel_token, callback=callback
     )
-    logger.info('\nFinal Best Solution: %s', final_solution)
 
     # Visualize and update results
     services['path_visualizer'].plot_routes(final_solution)
@@ -216,10 +613,57 @@ def main() -> None:
     )
 
 
+async def main_async(
+    deadline: Optional[Deadline] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    callback: Callable[[Progress], None] = None
+) -> None:
+    """Main execution function on an event loop.
+
+    Database calls and the optimization run on worker threads, and the
+    pick-sequence write-back overlaps with plotting the routes. Used
+    instead of main when ASYNC_PIPELINE is set.
+
+    Args:
+        deadline: Wall-clock limit for the optimization phases
+        cancel_token: Token to stop the optimization early
+        callback: Receives the best-so-far solution after each generation
+    """
+    rng = np.random.default_rng()
+    services = create_services(rng)
+    picklist_repo = AsyncPicklistRepository(services['picklist_repo'])
+    picksequence_service = AsyncBatchPickSequenceService(
+        services['picksequence_service']
+    )
+
+    # Get optimization data
+    picktasks, orders_assign, stage_result, picklistids = (
+        await picklist_repo.get_optimized_data()
+    )
+
+    final_solution = await asyncio.to_thread(
+        solve_wave, services, rng, orders_assign, picktasks, stage_result,
+        deadline=deadline, cancel_token=cancel_token, callback=callback
+    )
+
+    # Visualize and update results concurrently
+    await asyncio.gather(
+        asyncio.to_thread(services['path_visualizer'].plot_routes,
+                          final_solution),
+        picksequence_service.update_pick_sequences(
+            final_solution, picklistids, orders_assign, picktasks,
+            stage_result
+        )
+    )
+
+
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
     try:
-        main()
+        if ASYNC_PIPELINE:
+            asyncio.run(main_async())
+        else:
+            main()
     except Exception as e:
         logger.error('Error in optimization process: %s', e)
         raise
@@ -0,0 +1,97 @@
+"""Tests for self-adaptive parameter control.
+
+This module contains tests for the diversity measure and the GA and ACO
+parameter rules of the adaptive controller.
+"""
+
+import numpy as np
+import pytest
+from forestfire.algorithms.adaptive import (
+    AdaptiveController, population_diversity
+)
+from forestfire.algorithms.anytime import AnytimeOptimizer
+from forestfire.algorithms.population import Population
+from forestfire.optimizer.services.evaluation import SerialEvaluator
+from forestfire.utils.config import ALPHA, PC, PM, RHO
+
+
+class TestAdaptiveController:
+    """Test cases for the AdaptiveController class."""
+
+    def test_population_diversity(self):
+        """Test the share of genes differing from the best row."""
+        # Arrange
+        genes = np.array([[0, 1, 2, 3], [0, 1, 2, 3], [3, 2, 1, 0]])
+
+        # Act/Assert
+        assert population_diversity(genes, np.array([1.0, 2.0, 3.0])) == \
+            pytest.approx(4 / 12)
+        assert population_diversity(genes[:1], np.array([1.0])) == 0.0
+
+    def test_converged_population_diversifies(self, genetic_operator):
+        """Test that a converged GA population raises mutation."""
+        # Arrange
+        controller = AdaptiveController(target_diversity=0.2)
+        genes = np.zeros((6, 5), dtype=np.int16)
+        tournament_size = genetic_operator.tournament_size
+
+        # Act
+        controller.update_genetic(genetic_operator, genes,
+                                  np.full(6, 10.0), 10)
+        controller.update_genetic(genetic_operator, genes,
+                                  np.full(6, 10.0), 10)
+
+        # Assert
+        assert genetic_operator.pm > PM
+        assert genetic_operator.pc < PC
+        assert genetic_operator.tournament_size < tournament_size
+
+    def test_improving_diverse_population_exploits(self, genetic_operator):
+        """Test that steady improvement with diversity raises crossover."""
+        # Arrange
+        controller = AdaptiveController(target_diversity=0.1)
+        genes = np.random.default_rng(0).integers(0, 10, (6, 20))
+
+        # Act
+        for best in (100.0, 90.0, 80.0):
+            controller.update_genetic(genetic_operator, genes,
+                                      np.array([best] + [200.0] * 5), 10)
+
+        # Assert
+        assert genetic_operator.pm < PM
+        assert PC < genetic_operator.pc <= 0.98
+
+    def test_stagnating_colony_weakens_pheromone(self,
+                                                 ant_colony_optimizer):
+        """Test that ants without improvement lower alpha and raise rho."""
+        # Arrange
+        controller = AdaptiveController()
+        genes = np.zeros((2, 5), dtype=np.int16)
+
+        # Act
+        for _ in range(3):
+            controller.update_colony(ant_colony_optimizer, genes,
+                                     np.array([50.0, 60.0]))
+
+        # Assert
+        assert ant_colony_optimizer.alpha < ALPHA
+        assert ant_colony_optimizer.rho > RHO
+
+    def test_anytime_optimizer_applies_controller(
+            self, genetic_operator, route_optimizer, sample_orders_assign,
+            sample_picktasks, sample_stage_result, sample_population):
+        """Test that the controller runs after every generation."""
+        # Arrange
+        evaluator = SerialEvaluator(route_optimizer, sample_orders_assign,
+                                    sample_picktasks, sample_stage_result)
+        pop = Population.from_pairs(sample_population)
+        optimizer = AnytimeOptimizer(
+            genetic_operator, evaluator, max_iterations=3,
+            stagnation_limit=0, pop_size=5,
+            controller=AdaptiveController())
+
+        # Act
+        optimizer.run(pop)
+
+        # Assert
+        assert (genetic_operator.pc, genetic_operator.pm) != (PC, PM)
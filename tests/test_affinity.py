@@ -0,0 +1,110 @@
+"""Tests for spatial order affinity and cluster crossover.
+
+This module contains tests for the sparse affinity edges, their clusters
+and the cluster-preserving crossover of the genetic operator.
+"""
+
+import numpy as np
+from forestfire.algorithms.affinity import affinity_clusters, order_affinity
+
+
+def _aisle_groups():
+    return ([[(20.0 + i, 0.0)] for i in range(3)]
+            + [[(90.0 + i, 0.0)] for i in range(3)]
+            + [[(20.0 + i, 50.0)] for i in range(3)])
+
+
+class TestAffinity:
+    """Test cases for the affinity edges and their clusters."""
+
+    def test_affinity_needs_shared_aisle_and_nearby_x(self):
+        """Test that only close orders in one aisle are related."""
+        # Arrange
+        orders_assign = [[(20, 0)], [(25, 0)], [(90, 0)], [(20, 50)],
+                         [(20, 0), (20, 50)]]
+
+        # Act
+        first, second, weight = order_affinity(orders_assign, radius=20)
+        affinity = dict(zip(zip(first.tolist(), second.tolist()),
+                            weight.tolist()))
+
+        # Assert
+        assert affinity == {(0, 1): 0.75, (0, 4): 0.5, (1, 4): 0.375,
+                            (3, 4): 0.5}
+        assert np.all(first < second)
+
+    def test_min_affinity_drops_weak_pairs(self):
+        """Test that pairs below the minimum affinity are left out."""
+        # Arrange
+        orders_assign = [[(20, 0)], [(25, 0)], [(35, 0)]]
+
+        # Act
+        first, second, weight = order_affinity(orders_assign, radius=20,
+                                               min_affinity=0.5)
+
+        # Assert
+        assert list(zip(first.tolist(), second.tolist())) == [(0, 1), (1, 2)]
+        assert np.all(weight >= 0.5)
+
+    def test_clusters_join_chains_of_pairs(self):
+        """Test that clusters are connected components, not cliques."""
+        # Arrange
+        orders_assign = [[(10.0 * i, 0.0)] for i in range(8)][::-1]
+
+        # Act
+        clusters = affinity_clusters(
+            order_affinity(orders_assign, radius=20), orders_assign)
+
+        # Assert
+        assert clusters.tolist() == [0] * 8
+
+    def test_clusters_follow_the_sweep(self):
+        """Test that clusters split by aisle and distance, in sweep order."""
+        # Arrange
+        orders_assign = _aisle_groups()[::-1]
+
+        # Act
+        clusters = affinity_clusters(order_affinity(orders_assign),
+                                     orders_assign)
+
+        # Assert
+        assert clusters.tolist() == [2, 2, 2, 1, 1, 1, 0, 0, 0]
+
+
+class TestAffinityCrossover:
+    """Test cases for crossover over affinity clusters."""
+
+    def test_offspring_inherit_whole_clusters(self, genetic_operator):
+        """Test that every cluster comes from a single parent."""
+        # Arrange
+        orders_assign = _aisle_groups()
+        genetic_operator.use_affinity(orders_assign)
+        genetic_operator.pc = 1.0
+        parents1 = np.zeros((20, 9), dtype=np.int16)
+        parents2 = np.ones((20, 9), dtype=np.int16)
+
+        # Act
+        offspring1, offspring2 = genetic_operator.crossover_batch(
+            parents1, parents2, [9, 9])
+
+        # Assert
+        for child in (offspring1, offspring2):
+            assert np.all(np.ptp(child.reshape(20, 3, 3), axis=2) == 0)
+        assert np.all(offspring1 + offspring2 == 1)
+        assert 0 < offspring1.mean() < 1
+
+    def test_offspring_stay_feasible(self, genetic_operator):
+        """Test that cluster crossover stays within capacity."""
+        # Arrange
+        orders_assign = _aisle_groups()
+        genetic_operator.use_affinity(orders_assign)
+        parents1 = np.array([[0] * 5 + [1] * 4] * 10, dtype=np.int16)
+        parents2 = np.array([[1] * 4 + [0] * 5] * 10, dtype=np.int16)
+
+        # Act
+        offspring1, offspring2 = genetic_operator.crossover_batch(
+            parents1, parents2, [5, 5])
+
+        # Assert
+        for child in np.concatenate([offspring1, offspring2]):
+            assert np.bincount(child, minlength=2).max() <= 5
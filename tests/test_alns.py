@@ -0,0 +1,64 @@
+"""Tests for the adaptive large neighbourhood search.
+
+This module contains tests for the ALNS destroy and repair loop and its
+adaptive operator weights.
+"""
+
+import numpy as np
+import pytest
+from forestfire.algorithms.alns import ALNSOptimizer
+from forestfire.optimizer.services.evaluation import SerialEvaluator
+from forestfire.optimizer.services.incremental import IncrementalRouteCost
+from forestfire.utils.config import NUM_PICKERS, PICKER_CAPACITIES
+
+
+def _random_wave(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return [[(float(rng.integers(20, 100)), float(rng.integers(0, 100)))]
+            for _ in range(size)]
+
+
+class TestALNSOptimizer:
+    """Test cases for the ALNSOptimizer class."""
+
+    def test_run_improves_surrogate_within_capacity(self, route_optimizer):
+        """Test that ALNS lowers the surrogate cost of a random start."""
+        # Arrange
+        orders_assign = _random_wave(60)
+        start = (np.arange(60) % NUM_PICKERS).tolist()
+        alns = ALNSOptimizer(route_optimizer, np.random.default_rng(4),
+                             iterations=300, segment=20)
+
+        # Act
+        solution, fitness = alns.run(start, orders_assign)
+
+        # Assert
+        start_cost = IncrementalRouteCost(orders_assign, start,
+                                          route_optimizer).total
+        assert fitness < start_cost
+        assert fitness == pytest.approx(
+            IncrementalRouteCost(orders_assign, solution,
+                                 route_optimizer).total)
+        assert all(solution.count(p) <= PICKER_CAPACITIES[p]
+                   for p in range(NUM_PICKERS))
+        assert not np.allclose(alns.weights['destroy'], 1.0)
+
+    def test_run_keeps_start_unless_real_cost_improves(
+            self, route_optimizer, sample_orders_assign, sample_picktasks,
+            sample_stage_result):
+        """Test that an evaluator confirms the result against the start."""
+        # Arrange
+        evaluator = SerialEvaluator(route_optimizer, sample_orders_assign,
+                                    sample_picktasks, sample_stage_result)
+        start = [0, 1, 2, 3, 4]
+        start_fitness = evaluator.evaluate(np.array([start]))[0]
+        alns = ALNSOptimizer(route_optimizer, np.random.default_rng(1),
+                             iterations=50)
+
+        # Act
+        solution, fitness = alns.run(start, sample_orders_assign, evaluator)
+
+        # Assert
+        assert fitness <= start_fitness
+        assert fitness == pytest.approx(
+            evaluator.evaluate(np.array([solution]))[0])
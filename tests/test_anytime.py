@@ -0,0 +1,95 @@
+"""Tests for the anytime GA driver.
+
+This module contains tests for deadlines, cancellation, stagnation stops and
+best-so-far streaming.
+"""
+
+from unittest.mock import MagicMock
+import numpy as np
+from forestfire.algorithms.anytime import (
+    AnytimeOptimizer, CancellationToken, Deadline, should_stop
+)
+from forestfire.algorithms.population import Population
+
+
+def _constant_evaluator(value=100.0):
+    evaluator = MagicMock()
+    evaluator.evaluate.side_effect = lambda genes: np.full(len(genes), value)
+    return evaluator
+
+
+class TestAnytimeOptimizer:
+    """Test cases for the AnytimeOptimizer class."""
+
+    def test_should_stop(self):
+        """Test the stop reasons for deadlines and cancellation."""
+        # Arrange
+        token = CancellationToken()
+
+        # Act/Assert
+        assert should_stop(Deadline.after(60), token) is None
+        assert should_stop(Deadline.after(-1), token) == 'deadline'
+        assert should_stop(Deadline.after(5), token, reserve=10) == 'deadline'
+        token.cancel()
+        assert should_stop(None, token) == 'cancelled'
+
+    def test_streams_best_so_far(self, genetic_operator, sample_population):
+        """Test that progress is reported for every generation."""
+        # Arrange
+        optimizer = AnytimeOptimizer(
+            genetic_operator, _constant_evaluator(), max_iterations=3,
+            stagnation_limit=0, pop_size=5)
+
+        # Act
+        reports = list(optimizer.iterate(
+            Population.from_pairs(sample_population)))
+
+        # Assert
+        assert [report.iteration for report in reports] == [0, 1, 2, 3]
+        assert reports[-1].best_fitness == 100.0
+        assert optimizer.best_solution == sample_population[0][0]
+        assert optimizer.stop_reason == 'max_iterations'
+
+    def test_stops_on_stagnation(self, genetic_operator, sample_population):
+        """Test that generations without improvement end the run."""
+        # Arrange
+        optimizer = AnytimeOptimizer(
+            genetic_operator, _constant_evaluator(500.0), max_iterations=50,
+            stagnation_limit=2, pop_size=5)
+
+        # Act
+        optimizer.run(Population.from_pairs(sample_population))
+
+        # Assert
+        assert optimizer.stop_reason == 'stagnation'
+
+    def test_cancellation_keeps_best(self, genetic_operator,
+                                     sample_population):
+        """Test that a cancelled run still returns the best solution."""
+        # Arrange
+        token = CancellationToken()
+        optimizer = AnytimeOptimizer(
+            genetic_operator, _constant_evaluator(), cancel_token=token,
+            pop_size=5)
+
+        # Act
+        solution = optimizer.run(Population.from_pairs(sample_population),
+                                 callback=lambda progress: token.cancel())
+
+        # Assert
+        assert optimizer.stop_reason == 'cancelled'
+        assert solution == sample_population[0][0]
+
+    def test_expired_deadline(self, genetic_operator, sample_population):
+        """Test that no generation starts after the deadline."""
+        # Arrange
+        evaluator = _constant_evaluator()
+        optimizer = AnytimeOptimizer(
+            genetic_operator, evaluator, deadline=Deadline.after(0))
+
+        # Act
+        optimizer.run(Population.from_pairs(sample_population))
+
+        # Assert
+        assert optimizer.stop_reason == 'deadline'
+        evaluator.evaluate.assert_not_called()
@@ -0,0 +1,107 @@
+"""Tests for the asynchronous database layer.
+
+This module contains tests for the awaitable repository and service
+wrappers, run against in-process fakes of the blocking repositories.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+from forestfire.database.async_repository import (
+    AsyncBaseRepository, AsyncBatchPickSequenceService,
+    AsyncPicklistRepository
+)
+
+
+class _SlowPicklistRepository:
+    """Blocking fake that records the threads serving it"""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.threads = []
+
+    def get_optimized_data(self):
+        self.threads.append(threading.get_ident())
+        time.sleep(self.delay)
+        return ['task1'], [[(10, 20)]], {}, ['id1']
+
+    def update_batchids(self, batch_ids):
+        time.sleep(self.delay)
+        return len(batch_ids)
+
+
+class TestAsyncRepository:
+    """Test cases for the awaitable repositories."""
+
+    def test_calls_run_off_the_event_loop(self):
+        """Test that blocking calls run on worker threads."""
+        # Arrange
+        fake = _SlowPicklistRepository(delay=0)
+        repo = AsyncPicklistRepository(fake)
+
+        # Act
+        result = asyncio.run(repo.get_optimized_data())
+
+        # Assert
+        assert result[0] == ['task1']
+        assert fake.threads[0] != threading.get_ident()
+
+    def test_calls_overlap(self):
+        """Test that concurrent awaits wait for I/O in parallel."""
+        # Arrange
+        repo = AsyncPicklistRepository(_SlowPicklistRepository(delay=0.2))
+
+        async def run_both():
+            return await asyncio.gather(
+                repo.get_optimized_data(),
+                repo.update_batchids({'task1': 'BATCH_0'})
+            )
+
+        # Act
+        started = time.monotonic()
+        data, updated = asyncio.run(run_both())
+        elapsed = time.monotonic() - started
+
+        # Assert
+        assert data[3] == ['id1'] and updated == 1
+        assert elapsed < 0.35
+
+    def test_prefetch_runs_in_background(self):
+        """Test that a prefetch resolves to the next wave's data."""
+        # Arrange
+        repo = AsyncPicklistRepository(_SlowPicklistRepository(delay=0.05))
+
+        async def prefetch_then_wait():
+            task = repo.prefetch()
+            await asyncio.sleep(0)
+            return await task
+
+        # Act
+        result = asyncio.run(prefetch_then_wait())
+
+        # Assert
+        assert result[1] == [[(10, 20)]]
+
+    def test_base_repository_and_service_delegate(self):
+        """Test that query and write-back calls reach the blocking layer."""
+        # Arrange
+        base = MagicMock()
+        base.execute_query.return_value = [(1,)]
+        service = MagicMock()
+        service.update_pick_sequences.return_value = 'result'
+
+        async def run():
+            rows = await AsyncBaseRepository(base).execute_query('SELECT 1')
+            written = await AsyncBatchPickSequenceService(
+                service).update_pick_sequences([0], ['id1'], [[(1, 2)]],
+                                               ['task1'], {})
+            return rows, written
+
+        # Act
+        rows, written = asyncio.run(run())
+
+        # Assert
+        assert rows == [(1,)] and written == 'result'
+        base.execute_query.assert_called_once_with('SELECT 1', None)
+        service.update_pick_sequences.assert_called_once()
@@ -0,0 +1,97 @@
+"""Tests for the capacity-preserving operators.
+
+This module contains tests for the load tracker and the operators that keep
+picker assignments within capacity without repair.
+"""
+
+import numpy as np
+import pytest
+from forestfire.algorithms.capacity import (
+    CapacityPreservingOperator, LoadTracker
+)
+
+
+class TestLoadTracker:
+    """Test cases for the LoadTracker class."""
+
+    def test_counts_initial_assignment(self):
+        """Test that loads and open pickers match the assignment."""
+        # Act
+        tracker = LoadTracker([2, 1, 3], [0, 0, 1, 2])
+
+        # Assert
+        assert tracker.loads == [2, 1, 1]
+        assert tracker.open_pickers() == [2]
+
+    def test_move_reopens_full_picker(self):
+        """Test that moving an order updates the open picker set."""
+        # Arrange
+        tracker = LoadTracker([2, 2], [0, 0, 1])
+
+        # Act
+        tracker.move(0, 1)
+
+        # Assert
+        assert tracker.loads == [1, 2]
+        assert tracker.open_pickers() == [0]
+        assert tracker.random_open(np.random.default_rng(0)) == 0
+
+
+class TestCapacityPreservingOperator:
+    """Test cases for the CapacityPreservingOperator class."""
+
+    @pytest.fixture
+    def operator(self):
+        """Operator with tight capacities."""
+        return CapacityPreservingOperator([3, 3, 3],
+                                          np.random.default_rng(7))
+
+    def test_swap_mutation_keeps_loads(self, operator):
+        """Test that swap mutation never changes picker loads."""
+        # Arrange
+        parent = [0, 0, 1, 1, 2, 2]
+
+        # Act
+        child = operator.swap_mutation(parent)
+
+        # Assert
+        assert sorted(child) == sorted(parent)
+
+    def test_relocate_mutation_updates_tracker(self, operator):
+        """Test that relocation only targets pickers with room."""
+        # Arrange
+        parent = [0, 0, 0, 1, 1, 1, 2, 2]
+        loads = operator.tracker(parent)
+
+        # Act
+        child = operator.relocate_mutation(parent, loads)
+
+        # Assert
+        assert loads.loads == [child.count(p) for p in range(3)]
+        assert all(load <= 3 for load in loads.loads)
+
+    def test_crossover_is_feasible(self, operator):
+        """Test that crossover offspring never exceed capacity."""
+        # Arrange
+        parent1 = [0, 0, 0, 1, 1, 1, 2, 2, 2]
+        parent2 = [2, 2, 2, 0, 0, 0, 1, 1, 1]
+
+        # Act
+        for _ in range(20):
+            child1, child2 = operator.crossover(parent1, parent2)
+
+            # Assert
+            for child in (child1, child2):
+                assert [child.count(p) for p in range(3)] == [3, 3, 3]
+
+    def test_crossover_keeps_genes_when_feasible(self, operator):
+        """Test that an all-true mask copies the first parent."""
+        # Arrange
+        parent1 = [0, 1, 2, 0]
+        parent2 = [1, 1, 1, 2]
+
+        # Act
+        child1, _ = operator.crossover(parent1, parent2, mask=[True] * 4)
+
+        # Assert
+        assert child1 == parent1
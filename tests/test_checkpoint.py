@@ -0,0 +1,289 @@
+"""Tests for checkpoint and resume of the optimizers.
+
+This module contains tests that interrupted GA and ACO runs resume from
+their checkpoint files with the same results as uninterrupted runs.
+"""
+
+import os
+from unittest.mock import patch
+import numpy as np
+import pytest
+from forestfire.algorithms.adaptive import AdaptiveController
+from forestfire.algorithms.ant_colony import AntColonyOptimizer
+from forestfire.algorithms.anytime import AnytimeOptimizer, CancellationToken
+from forestfire.algorithms.genetic import GeneticOperator
+from forestfire.algorithms.population import Population
+from forestfire.optimizer.services.evaluation import SerialEvaluator
+from forestfire.utils.config import NUM_PICKERS
+from forestfire.utils.checkpoint import (
+    load_checkpoint, problem_fingerprint, restore_rng, save_checkpoint
+)
+from forestfire.optimizer.services.routing import RouteOptimizer
+from main import run_aco_optimization, run_genetic_optimization, \
+    run_optimization
+
+
+class TestCheckpoint:
+    """Test cases for checkpoint files and resuming."""
+
+    def test_round_trip_restores_rng(self, tmp_path):
+        """Test that arrays and RNG state survive a checkpoint."""
+        # Arrange
+        path = str(tmp_path / 'state.npz')
+        rng = np.random.default_rng(11)
+        save_checkpoint(path, rng=rng, pheromone=np.eye(3), ants=4)
+        expected = rng.random(3)
+
+        # Act
+        state = load_checkpoint(path)
+        restored = np.random.default_rng()
+        restore_rng(restored, state)
+
+        # Assert
+        np.testing.assert_array_equal(state['pheromone'], np.eye(3))
+        assert int(state['ants']) == 4
+        np.testing.assert_array_equal(restored.random(3), expected)
+
+    def test_missing_checkpoint(self, tmp_path):
+        """Test that a missing file means no checkpoint."""
+        # Act/Assert
+        assert load_checkpoint(str(tmp_path / 'none.npz')) is None
+        assert load_checkpoint(None) is None
+
+    def test_checkpoint_of_another_wave_is_discarded(
+            self, tmp_path, sample_orders_assign, sample_picktasks):
+        """Test that a checkpoint only resumes the wave it was saved for."""
+        # Arrange
+        path = str(tmp_path / 'ga.npz')
+        fingerprint = problem_fingerprint(sample_orders_assign,
+                                          sample_picktasks)
+        other = problem_fingerprint(sample_orders_assign[:-1],
+                                    sample_picktasks)
+        save_checkpoint(path, fingerprint=fingerprint, ants=4)
+
+        # Act
+        matching = load_checkpoint(path, fingerprint)
+        stale = load_checkpoint(path, other)
+
+        # Assert
+        assert other != fingerprint
+        assert int(matching['ants']) == 4
+        assert stale is None
+        assert not os.path.exists(path)
+
+    def test_aco_ignores_checkpoint_of_another_wave(
+            self, tmp_path, route_optimizer, sample_orders_assign,
+            sample_picktasks, sample_stage_result):
+        """Test that ACO starts afresh on a checkpoint from another wave."""
+        # Arrange
+        path = str(tmp_path / 'aco.npz')
+        args = (route_optimizer, sample_orders_assign, sample_picktasks,
+                sample_stage_result)
+        reference = run_aco_optimization(
+            AntColonyOptimizer(route_optimizer, np.random.default_rng(4)),
+            *args)
+        save_checkpoint(
+            path, fingerprint='another wave', ants=1,
+            pheromone=np.ones((len(sample_orders_assign), NUM_PICKERS)),
+            genes=np.zeros((1, len(sample_orders_assign)), dtype=int),
+            fitness=np.zeros(1))
+
+        # Act
+        solutions = run_aco_optimization(
+            AntColonyOptimizer(route_optimizer, np.random.default_rng(4)),
+            *args, checkpoint_path=path)
+
+        # Assert
+        assert solutions == reference
+        assert not os.path.exists(path)
+
+    def test_ga_resume_matches_uninterrupted_run(
+            self, tmp_path, route_optimizer, sample_population,
+            sample_orders_assign, sample_picktasks, sample_stage_result):
+        """Test that a cancelled GA resumes exactly where it stopped."""
+        # Arrange
+        path = str(tmp_path / 'ga.npz')
+        evaluator = SerialEvaluator(route_optimizer, sample_orders_assign,
+                                    sample_picktasks, sample_stage_result)
+        pop = Population.from_pairs(sample_population)
+
+        def optimizer(token=None):
+            return AnytimeOptimizer(
+                GeneticOperator(route_optimizer, np.random.default_rng(9)),
+                evaluator, cancel_token=token, max_iterations=6,
+                stagnation_limit=0, pop_size=8, checkpoint_path=path,
+                checkpoint_interval=2)
+
+        reference = optimizer()
+        reference.run(pop)
+        token = CancellationToken()
+
+        # Act
+        interrupted = optimizer(token)
+        interrupted.run(pop, callback=lambda progress: (
+            token.cancel() if progress.iteration == 3 else None))
+        resumed = optimizer()
+        resumed.run(None)
+
+        # Assert
+        assert interrupted.stop_reason == 'cancelled'
+        np.testing.assert_array_equal(resumed.population.genes,
+                                      reference.population.genes)
+        assert resumed.best_fitness == reference.best_fitness
+        assert not os.path.exists(path)
+
+    def test_adaptive_ga_resume_restores_tuning(
+            self, tmp_path, route_optimizer, sample_population,
+            sample_orders_assign, sample_picktasks, sample_stage_result):
+        """Test that resuming restores the tuned rates and controller."""
+        # Arrange
+        path = str(tmp_path / 'ga.npz')
+        evaluator = SerialEvaluator(route_optimizer, sample_orders_assign,
+                                    sample_picktasks, sample_stage_result)
+        pop = Population.from_pairs(sample_population)
+
+        def optimizer(token=None):
+            return AnytimeOptimizer(
+                GeneticOperator(route_optimizer, np.random.default_rng(9)),
+                evaluator, cancel_token=token, max_iterations=6,
+                stagnation_limit=0, pop_size=8, checkpoint_path=path,
+                checkpoint_interval=2, controller=AdaptiveController())
+
+        reference = optimizer()
+        reference.run(pop)
+        token = CancellationToken()
+        interrupted = optimizer(token)
+        interrupted.run(pop, callback=lambda progress: (
+            token.cancel() if progress.iteration == 3 else None))
+
+        # Act
+        resumed = optimizer()
+        resumed.run(None)
+
+        # Assert
+        for name in ('pc', 'pm', 'tournament_size'):
+            assert (getattr(resumed.genetic_op, name)
+                    == getattr(reference.genetic_op, name))
+        np.testing.assert_array_equal(
+            resumed.controller.state()['genetic'],
+            reference.controller.state()['genetic'])
+        np.testing.assert_array_equal(resumed.population.genes,
+                                      reference.population.genes)
+
+    def test_aco_resume_matches_uninterrupted_run(
+            self, tmp_path, route_optimizer, sample_orders_assign,
+            sample_picktasks, sample_stage_result):
+        """Test that ACO resumes its pheromone and RNG from a checkpoint."""
+        # Arrange
+        path = str(tmp_path / 'aco.npz')
+        args = (route_optimizer, sample_orders_assign, sample_picktasks,
+                sample_stage_result)
+        reference = run_aco_optimization(
+            AntColonyOptimizer(route_optimizer, np.random.default_rng(4)),
+            *args)
+        token = CancellationToken()
+        aco = AntColonyOptimizer(route_optimizer, np.random.default_rng(4))
+        evaluate = SerialEvaluator(*args).evaluate
+
+        def evaluate_then_cancel(genes):
+            token.cancel()
+            return evaluate(genes)
+
+        evaluator = SerialEvaluator(*args)
+        evaluator.evaluate = evaluate_then_cancel
+        run_aco_optimization(aco, *args, evaluator=evaluator,
+                             cancel_token=token, checkpoint_path=path)
+
+        # Act
+        resumed = run_aco_optimization(
+            AntColonyOptimizer(route_optimizer, np.random.default_rng()),
+            *args, checkpoint_path=path)
+
+        # Assert
+        assert resumed == reference
+        assert not os.path.exists(path)
+
+    def test_adaptive_aco_resume_restores_tuning(
+            self, tmp_path, route_optimizer, sample_orders_assign,
+            sample_picktasks, sample_stage_result):
+        """Test that ACO resumes its tuned exponents and evaporation."""
+        # Arrange
+        path = str(tmp_path / 'aco.npz')
+        args = (route_optimizer, sample_orders_assign, sample_picktasks,
+                sample_stage_result)
+        reference = AntColonyOptimizer(route_optimizer,
+                                       np.random.default_rng(4))
+        expected = run_aco_optimization(reference, *args,
+                                        controller=AdaptiveController())
+        token = CancellationToken()
+        evaluate = SerialEvaluator(*args).evaluate
+        calls = []
+
+        def evaluate_then_cancel(genes):
+            calls.append(len(genes))
+            if len(calls) == 3:
+                token.cancel()
+            return evaluate(genes)
+
+        evaluator = SerialEvaluator(*args)
+        evaluator.evaluate = evaluate_then_cancel
+        run_aco_optimization(
+            AntColonyOptimizer(route_optimizer, np.random.default_rng(4)),
+            *args, evaluator=evaluator, cancel_token=token,
+            checkpoint_path=path, controller=AdaptiveController())
+
+        # Act
+        resumed = AntColonyOptimizer(route_optimizer,
+                                     np.random.default_rng())
+        solutions = run_aco_optimization(resumed, *args,
+                                         checkpoint_path=path,
+                                         controller=AdaptiveController())
+
+        # Assert
+        assert solutions == expected
+        assert (resumed.alpha, resumed.beta, resumed.rho) == (
+            reference.alpha, reference.beta, reference.rho)
+
+    def test_aco_resume_repeats_the_whole_run(
+            self, tmp_path, sample_orders_assign, sample_picktasks,
+            sample_stage_result):
+        """Test that a run stopped inside ACO resumes into the same GA."""
+        # Arrange
+        args = (sample_orders_assign, sample_picktasks, sample_stage_result)
+
+        def optimize(rng, checkpoint_dir, crash_after=None):
+            services = {
+                'route_optimizer': RouteOptimizer(),
+                'genetic_op': GeneticOperator(RouteOptimizer(), rng),
+                'aco': AntColonyOptimizer(RouteOptimizer(), rng)
+            }
+            build = services['aco'].build_solution
+            built = []
+
+            def build_then_crash(*build_args):
+                built.append(1)
+                if len(built) == crash_after:
+                    raise InterruptedError
+                return build(*build_args)
+
+            services['aco'].build_solution = build_then_crash
+            with patch('main.CHECKPOINT_DIR', str(checkpoint_dir)), \
+                 patch('main.run_genetic_optimization',
+                       wraps=run_genetic_optimization) as genetic:
+                solution = run_optimization(services, rng, *args)
+            return solution, genetic.call_args.args[2]
+
+        expected, expected_pop = optimize(np.random.default_rng(3),
+                                          tmp_path / 'reference')
+        with pytest.raises(InterruptedError):
+            optimize(np.random.default_rng(3), tmp_path, crash_after=8)
+
+        # Act
+        solution, pop = optimize(np.random.default_rng(), tmp_path)
+
+        # Assert
+        np.testing.assert_array_equal(pop.genes, expected_pop.genes)
+        np.testing.assert_array_equal(pop.fitness, expected_pop.fitness)
+        assert solution == expected
+        assert not os.listdir(tmp_path / 'reference')
+        assert not os.path.exists(tmp_path / 'aco.npz')
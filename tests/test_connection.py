@@ -0,0 +1,154 @@
+"""Tests for the database connection pool.
+
+This module contains tests for connection reuse, checkout timeouts and
+health checks of the connection pool.
+"""
+
+import threading
+from unittest.mock import MagicMock, patch
+import psycopg2
+import pytest
+from psycopg2 import extensions
+from forestfire.database.connection import (
+    ConnectionPool, DatabaseConnectionManager, PooledConnection,
+    _search_path_option
+)
+from forestfire.database.exceptions import DBConnectionError
+
+
+def _fake_connection(**_):
+    conn = MagicMock()
+    conn.closed = 0
+    conn.get_transaction_status.return_value = \
+        extensions.TRANSACTION_STATUS_IDLE
+    return conn
+
+
+class TestConnectionPool:
+    """Test cases for the ConnectionPool class."""
+
+    def test_connections_are_reused(self):
+        """Test that a returned connection serves the next checkout."""
+        # Arrange
+        connect = MagicMock(side_effect=_fake_connection)
+        pool = ConnectionPool(connect, size=2, timeout=1)
+
+        # Act
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+
+        # Assert
+        assert second is first
+        connect.assert_called_once()
+
+    def test_checkout_times_out_when_exhausted(self):
+        """Test that checkout fails once every connection stays in use."""
+        # Arrange
+        pool = ConnectionPool(_fake_connection, size=1, timeout=0.05)
+        pool.acquire()
+
+        # Act/Assert
+        with pytest.raises(DBConnectionError):
+            pool.acquire()
+
+    def test_waiting_checkout_gets_released_connection(self):
+        """Test that a waiting thread receives a returned connection."""
+        # Arrange
+        pool = ConnectionPool(_fake_connection, size=1, timeout=5)
+        conn = pool.acquire()
+        received = []
+        waiter = threading.Thread(target=lambda: received.append(
+            pool.acquire()))
+
+        # Act
+        waiter.start()
+        pool.release(conn)
+        waiter.join(5)
+
+        # Assert
+        assert received == [conn]
+
+    def test_open_transactions_are_rolled_back(self):
+        """Test that a connection is returned without a transaction."""
+        # Arrange
+        pool = ConnectionPool(_fake_connection, size=1, timeout=1)
+        conn = pool.acquire()
+        conn.get_transaction_status.return_value = \
+            extensions.TRANSACTION_STATUS_INTRANS
+
+        # Act
+        pool.release(conn)
+
+        # Assert
+        conn.rollback.assert_called_once()
+
+    def test_broken_connections_are_replaced(self):
+        """Test that idle connections failing the probe are replaced."""
+        # Arrange
+        connect = MagicMock(side_effect=_fake_connection)
+        pool = ConnectionPool(connect, size=1, timeout=1, check_interval=0)
+        stale = pool.acquire()
+        pool.release(stale)
+        stale.cursor.return_value.__enter__.return_value.execute.side_effect \
+            = psycopg2.OperationalError('server closed the connection')
+
+        # Act
+        conn = pool.acquire()
+
+        # Assert
+        assert conn is not stale
+        stale.close.assert_called_once()
+        assert connect.call_count == 2
+
+    def test_failed_connect_frees_slot(self):
+        """Test that a failed connect does not use up the pool."""
+        # Arrange
+        connect = MagicMock(side_effect=[
+            psycopg2.OperationalError('refused'), _fake_connection()
+        ])
+        pool = ConnectionPool(connect, size=1, timeout=0.05)
+
+        # Act
+        with pytest.raises(DBConnectionError):
+            pool.acquire()
+        conn = pool.acquire()
+
+        # Assert
+        assert conn is not None
+
+
+class TestDatabaseConnectionManager:
+    """Test cases for the pooled DatabaseConnectionManager."""
+
+    def test_get_connection_reuses_pooled_connection(self):
+        """Test that consecutive queries share one connection."""
+        # Arrange
+        DatabaseConnectionManager.close_all()
+        with patch('forestfire.database.connection.psycopg2.connect',
+                   side_effect=_fake_connection) as mock_connect:
+
+            # Act
+            with DatabaseConnectionManager.get_connection() as first:
+                pass
+            with DatabaseConnectionManager.get_connection() as second:
+                pass
+            DatabaseConnectionManager.close_all()
+
+        # Assert
+        assert first is second
+        mock_connect.assert_called_once()
+        first.close.assert_called_once()
+        assert mock_connect.call_args.kwargs['options'] == \
+            '-c search_path=nifiapp'
+        assert mock_connect.call_args.kwargs['connection_factory'] is \
+            PooledConnection
+
+    def test_search_path_option_escapes_spaces(self):
+        """Test that a multi-schema search path survives option splitting."""
+        # Act
+        option = _search_path_option('nifiapp, public')
+
+        # Assert
+        assert option == '-c search_path=nifiapp,\\ public'
+        assert len(option.replace('\\ ', '_').split()) == 2
@@ -0,0 +1,70 @@
+"""Tests for the greedy constructive solver.
+
+This module contains tests for regret insertion of aisle groups.
+"""
+
+import numpy as np
+import pytest
+from forestfire.algorithms.constructive import ConstructiveSolver
+from forestfire.algorithms.population import random_feasible_genes
+from forestfire.optimizer.services.evaluation import SerialEvaluator
+
+
+def _aisle_wave(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return [[(float(rng.integers(20, 100)), float(10 * rng.integers(0, 10)))]
+            for _ in range(size)]
+
+
+class TestConstructiveSolver:
+    """Test cases for the ConstructiveSolver class."""
+
+    def test_solve_is_feasible_and_deterministic(self, route_optimizer):
+        """Test that every order is placed within capacity, repeatably."""
+        # Arrange
+        orders_assign = _aisle_wave(90)
+        solver = ConstructiveSolver(route_optimizer,
+                                    picker_capacities=[10] * 10)
+
+        # Act
+        solution = solver.solve(orders_assign)
+
+        # Assert
+        assert len(solution) == 90
+        assert np.bincount(solution, minlength=10).max() <= 10
+        assert solver.solve(orders_assign) == solution
+
+    def test_keeps_aisles_together(self, route_optimizer):
+        """Test that orders in one aisle go to one picker when they fit."""
+        # Arrange
+        orders_assign = [[(20.0 + i, 30.0)] for i in range(5)]
+
+        # Act
+        solution = ConstructiveSolver(route_optimizer).solve(orders_assign)
+
+        # Assert
+        assert len(set(solution)) == 1
+
+    def test_beats_random_assignments(self, route_optimizer):
+        """Test the real route cost against random feasible assignments."""
+        # Arrange
+        orders_assign = _aisle_wave(90, seed=1)
+        picktasks = [(f"task{i}",) for i in range(90)]
+        evaluator = SerialEvaluator(route_optimizer, orders_assign,
+                                    picktasks, {})
+        random_genes = random_feasible_genes(np.random.default_rng(2), 5, 90,
+                                             [10] * 10)
+
+        # Act
+        solution = ConstructiveSolver(route_optimizer).solve(orders_assign)
+
+        # Assert
+        assert evaluator.evaluate(np.array([solution]))[0] < \
+            evaluator.evaluate(random_genes).min()
+
+    def test_insufficient_capacity(self, route_optimizer):
+        """Test that unplaceable orders are reported."""
+        # Act/Assert
+        with pytest.raises(ValueError):
+            ConstructiveSolver(route_optimizer, picker_capacities=[1]).solve(
+                [[(20, 0)], [(30, 0)]])
@@ -4,20 +4,26 @@ This module contains tests for the database services used in
 warehouse order picking optimization.
 """
 
+from datetime import datetime, timedelta
 import pytest
 from unittest.mock import patch, MagicMock
+from forestfire.database.repository import BaseRepository
+from forestfire.database.services.instance import ProblemInstance
 from forestfire.database.services.picklist import PicklistRepository
-from forestfire.database.services.batch_pick_seq_service import BatchPickSequenceService
+from forestfire.database.services.batch_pick_seq_service import (
+    BatchPickSequenceService, chunk_by_batch
+)
 from forestfire.database.exceptions import QueryError
+from forestfire.optimizer.services.routing import RouteOptimizer
 
 class TestPicklistRepository:
     """Test cases for the PicklistRepository class."""
 
-    @patch('forestfire.database.repository.BaseRepository.execute_query')
-    def test_fetch_picklist_data(self, mock_execute_query):
+    @patch('forestfire.database.repository.BaseRepository.execute_prepared')
+    def test_fetch_picklist_data(self, mock_execute_prepared):
         """Test fetching picklist data."""
         # Arrange
-        mock_execute_query.return_value = [
+        mock_execute_prepared.return_value = [
             (1, 'task1', 10, 20),
             (2, 'task2', 30, 40)
         ]
@@ -27,33 +33,82 @@ class TestPicklistRepository:
         result = repo.fetch_picklist_data()
 
         # Assert
-        assert result == mock_execute_query.return_value
-        mock_execute_query.assert_called_once()
+        assert result == mock_execute_prepared.return_value
+        mock_execute_prepared.assert_called_once()
 
-    @patch('forestfire.database.repository.BaseRepository.execute_query')
-    def test_fetch_picklist_data_error(self, mock_execute_query):
+    @patch('forestfire.database.repository.BaseRepository.execute_prepared')
+    def test_fetch_picklist_data_error(self, mock_execute_prepared):
         """Test handling errors when fetching picklist data."""
         # Arrange
-        mock_execute_query.side_effect = Exception('Database error')
+        mock_execute_prepared.side_effect = Exception('Database error')
         repo = PicklistRepository()
 
         # Act/Assert
         with pytest.raises(QueryError):
             repo.fetch_picklist_data()
 
-    @patch.object(PicklistRepository, 'map_picklist_data')
-    def test_get_optimized_data(self, mock_map_picklist_data):
+    @patch('forestfire.database.repository.BaseRepository.stream_query')
+    def test_stream_picklist_data(self, mock_stream_query):
+        """Test that only the used columns are streamed, in batches."""
+        # Arrange
+        batches = [[(1, 'task1', 10, 20, 5, 5)], [(2, 'task2', 30, 40, 5, 5)]]
+        mock_stream_query.return_value = iter(batches)
+        repo = PicklistRepository()
+
+        # Act
+        result = list(repo.stream_picklist_data(batch_size=1))
+
+        # Assert
+        assert result == batches
+        query, _, batch_size = mock_stream_query.call_args[0]
+        assert 'p.*' not in query
+        assert 'p.picktaskid' in query
+        assert batch_size == 1
+
+    @patch.object(PicklistRepository, 'stream_picklist_data')
+    def test_map_picklist_data(self, mock_stream):
+        """Test mapping projected rows by picktask."""
+        # Arrange
+        mock_stream.return_value = iter([
+            [(1, 'task1', 10, 20, 5, 5), (2, 'task2', 30, 40, 15, 15)],
+            [(3, 'task1', 11, 20, 5, 5)]
+        ])
+        repo = PicklistRepository()
+
+        # Act
+        stage_result, task_result, id_mapping = repo.map_picklist_data()
+
+        # Assert
+        assert task_result == {'task1': [(10, 20), (11, 20)],
+                               'task2': [(30, 40)]}
+        assert stage_result['task2'] == [(15, 15)]
+        assert id_mapping == {'task1': 1, 'task2': 2}
+
+    @patch('forestfire.database.repository.BaseRepository.execute_bulk_update')
+    def test_update_batchids(self, mock_execute_bulk_update):
+        """Test that batch IDs are written by picktask in bulk."""
+        # Arrange
+        mock_execute_bulk_update.return_value = 3
+        repo = PicklistRepository()
+
+        # Act
+        updated = repo.update_batchids({'task1': 'BATCH_0',
+                                        'task2': 'BATCH_1'})
+
+        # Assert
+        assert updated == 3
+        mock_execute_bulk_update.assert_called_once_with(
+            'nifiapp.picklist', 'picktaskid', ('batchid',),
+            [('task1', 'BATCH_0'), ('task2', 'BATCH_1')])
+
+    @patch.object(PicklistRepository, 'load_problem_instance')
+    def test_get_optimized_data(self, mock_load_problem_instance):
         """Test getting optimized data."""
         # Arrange
-        # Mock the map_picklist_data method to return test data
-        mock_map_picklist_data.return_value = (
-            # staging
-            {'task1': [(5, 5)], 'task2': [(15, 15)]},
-            # taskid
-            {'task1': [(10, 20)], 'task2': [(30, 40)]},
-            # id_mapping
-            {'task1': 'id1', 'task2': 'id2'}
-        )
+        # Mock the problem instance with one row per task
+        mock_load_problem_instance.return_value = ProblemInstance.from_rows([
+            [('id1', 'task1', 10, 20, 5, 5), ('id2', 'task2', 30, 40, 15, 15)]
+        ])
         repo = PicklistRepository()
 
         # Act
@@ -65,16 +120,294 @@ class TestPicklistRepository:
         assert len(orders_assign) == 2
         assert len(stage_result) == 2
         assert len(picklistids) == 2
-        mock_map_picklist_data.assert_called_once()
+        assert orders_assign == [[(10.0, 20.0)], [(30.0, 40.0)]]
+        assert picklistids == ['id1', 'id2']
+        mock_load_problem_instance.assert_called_once()
+
+    @patch.object(PicklistRepository, 'stream_picklist_data')
+    def test_load_problem_instance_without_rows(self, mock_stream):
+        """Test that an empty picklist is reported."""
+        # Arrange
+        mock_stream.return_value = iter([])
+        repo = PicklistRepository()
+
+        # Act/Assert
+        with pytest.raises(QueryError):
+            repo.load_problem_instance()
+
+
+class TestPicklistSnapshot:
+    """Test cases for incremental snapshot loading."""
+
+    @staticmethod
+    def _repository(xmins, streams, ids, snapshot_path=None):
+        repo = PicklistRepository(snapshot_path)
+        repo.baserepository = MagicMock()
+        xmins, ids = list(xmins), list(ids)
+        repo.baserepository.execute_query.side_effect = \
+            lambda query, params=None: [(xmins.pop(0),)]
+        repo.baserepository.execute_prepared.side_effect = \
+            lambda name, query, params=None: [(db_id,) for db_id in ids.pop(0)]
+        repo.baserepository.stream_query.side_effect = \
+            lambda *args: iter(streams.pop(0))
+        return repo
+
+    def test_refresh_applies_changes_and_deletions(self):
+        """Test that a refresh fetches only rows past the watermark."""
+        # Arrange
+        repo = self._repository(
+            xmins=[100, 120],
+            streams=[
+                [[(1, 'a', 10, 0, 1, 1, 90), (2, 'b', 20, 0, 1, 1, 95),
+                  (3, 'b', 30, 0, 1, 1, 95)]],
+                [[(2, 'b', 25, 0, 1, 1, 110), (4, 'c', 40, 0, 1, 1, 115)]]
+            ],
+            ids=[[1, 2, 4]]
+        )
+
+        # Act
+        first = repo.refresh_problem_instance()
+        second = repo.refresh_problem_instance()
+
+        # Assert
+        assert first.num_rows == 3
+        query, params, _ = repo.baserepository.stream_query.call_args[0]
+        assert '>= %s' in query and params[1] == 100
+        assert second.task_ids == ['a', 'b', 'c']
+        assert second.db_ids.tolist() == [1, 2, 4]
+        assert second.x.tolist() == [10, 25, 40]
+        assert repo.watermark == 120
+
+    def test_wraparound_forces_full_reload(self):
+        """Test that a watermark moving backwards reloads everything."""
+        # Arrange
+        repo = self._repository(
+            xmins=[4000000000, 50],
+            streams=[[[(1, 'a', 10, 0, 1, 1, 7)]],
+                     [[(5, 'e', 50, 0, 1, 1, 40)]]],
+            ids=[]
+        )
+
+        # Act
+        repo.refresh_problem_instance()
+        instance = repo.refresh_problem_instance()
+
+        # Assert
+        assert instance.task_ids == ['e']
+        query = repo.baserepository.stream_query.call_args[0][0]
+        assert '>= %s' not in query
+
+
+    def test_snapshot_persists_between_repositories(self, tmp_path):
+        """Test that a new repository continues from the stored snapshot."""
+        # Arrange
+        path = str(tmp_path / 'picklist.npz')
+        first = self._repository(
+            xmins=[100], streams=[[[(1, 'a', 10, 0, 1, 1, 90)]]], ids=[],
+            snapshot_path=path)
+        first.refresh_problem_instance()
+        second = self._repository(
+            xmins=[120], streams=[[[(2, 'b', 20, 0, 1, 1, 110)]]],
+            ids=[[1, 2]], snapshot_path=path)
+
+        # Act
+        instance = second.refresh_problem_instance()
+
+        # Assert
+        query, params, _ = second.baserepository.stream_query.call_args[0]
+        assert '>= %s' in query and params[1] == 100
+        assert instance.task_ids == ['a', 'b']
+        assert instance.db_ids.tolist() == [1, 2]
+
+    @patch('forestfire.database.services.picklist.PICKLIST_WATERMARK_MARGIN',
+           60)
+    @patch('forestfire.database.services.picklist.PICKLIST_WATERMARK_COLUMN',
+           'updated_at')
+    def test_timestamp_watermark_keeps_margin(self, tmp_path):
+        """Test that a timestamp watermark lags the newest row's time."""
+        # Arrange
+        path = str(tmp_path / 'picklist.npz')
+        newest = datetime(2024, 5, 1, 12, 0, 0)
+        repo = self._repository(
+            xmins=[], ids=[], snapshot_path=path,
+            streams=[[[(1, 'a', 10, 0, 1, 1, newest - timedelta(hours=1)),
+                       (2, 'b', 20, 0, 1, 1, newest)]]])
+
+        # Act
+        repo.refresh_problem_instance()
+        restored = PicklistRepository(path)
+        restored._load_snapshot()  # pylint: disable=protected-access
+
+        # Assert
+        assert repo.watermark == newest - timedelta(seconds=60)
+        assert restored.watermark == repo.watermark
+        assert restored.snapshot.task_ids == ['a', 'b']
+
+
+class TestProblemInstance:
+    """Test cases for the ProblemInstance class."""
+
+    def test_from_rows_groups_by_task(self):
+        """Test that rows are grouped per task in first-seen order."""
+        # Arrange
+        batches = [
+            [(1, 'b', 10, 20, 1, 2), (2, 'a', 30, 40, 3, 4)],
+            [],
+            [(3, 'b', 11, 21, 1, 2)]
+        ]
+
+        # Act
+        instance = ProblemInstance.from_rows(batches)
+
+        # Assert
+        assert instance.task_ids == ['b', 'a']
+        assert instance.offsets.tolist() == [0, 2, 3]
+        assert instance.db_ids.tolist() == [1, 3, 2]
+        assert instance.x.tolist() == [10, 11, 30]
+        assert instance.task_db_ids() == [1, 2]
+        assert len(instance) == 2 and instance.num_rows == 3
+
+    def test_mappings(self):
+        """Test the per-task dictionaries derived from the columns."""
+        # Arrange
+        instance = ProblemInstance.from_rows(
+            [[(1, 'b', 10, 20, 1, 2), (2, 'a', 30, 40, 3, 4),
+              (3, 'b', 11, 21, 1, 2)]])
+
+        # Act
+        stage_result, task_result, id_mapping = instance.mappings()
+
+        # Assert
+        assert task_result == {'b': [(10, 20), (11, 21)], 'a': [(30, 40)]}
+        assert stage_result == {'b': [(1, 2), (1, 2)], 'a': [(3, 4)]}
+        assert id_mapping == {'b': 1, 'a': 2}
+
+    def test_updated_replaces_and_removes_rows(self):
+        """Test applying a delta to the cached columns."""
+        # Arrange
+        instance = ProblemInstance.from_rows(
+            [[('id1', 'a', 10, 20, 1, 2), ('id2', 'b', 30, 40, 3, 4),
+              ('id3', 'a', 11, 21, 1, 2)]])
+
+        # Act
+        updated = instance.updated(
+            [('id3', 'a', 12, 22, 1, 2), ('id10', 'c', 50, 60, 5, 6)],
+            removed=['id2'])
+
+        # Assert
+        assert updated.task_ids == ['a', 'c']
+        assert updated.offsets.tolist() == [0, 2, 3]
+        assert updated.db_ids.tolist() == ['id1', 'id3', 'id10']
+        assert updated.x.tolist() == [10, 12, 50]
+        assert instance.num_rows == 3
+
+
+class TestBaseRepository:
+    """Test cases for the BaseRepository class."""
+
+    @patch('forestfire.database.repository.DatabaseConnectionManager')
+    def test_stream_query_uses_named_cursor(self, mock_manager):
+        """Test that rows are fetched in batches from a named cursor."""
+        # Arrange
+        conn = mock_manager.get_connection.return_value.__enter__.return_value
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+
+        # Act
+        batches = list(BaseRepository().stream_query('SELECT 1', None, 2))
+
+        # Assert
+        assert batches == [[(1,), (2,)], [(3,)]]
+        assert conn.cursor.call_args.kwargs['name']
+        cursor.fetchmany.assert_called_with(2)
+
+
+    @patch('forestfire.database.repository.extras.execute_values')
+    @patch('forestfire.database.repository.DatabaseConnectionManager')
+    def test_execute_bulk_update(self, mock_manager, mock_execute_values):
+        """Test that rows are staged and applied with one UPDATE."""
+        # Arrange
+        conn = mock_manager.get_connection.return_value.__enter__.return_value
+        cursor = conn.cursor.return_value.__enter__.return_value
+        conn.prepared = {}
+        cursor.rowcount = 2
+        rows = [(1, 4, 'BATCH_0'), (2, 5, 'BATCH_1')]
+
+        # Act
+        updated = BaseRepository().execute_bulk_update(
+            'nifiapp.picklist', 'id', ('picksequence', 'batchid'), rows)
+        BaseRepository().execute_bulk_update(
+            'nifiapp.picklist', 'id', ('picksequence', 'batchid'), rows)
+
+        # Assert
+        assert updated == 2
+        assert mock_execute_values.call_args[0][2] == rows
+        # Create, prepare and execute, then create and execute only
+        assert cursor.execute.call_count == 5
+        assert list(conn.prepared) == [
+            'bulk_update_nifiapp_picklist_id_picksequence_batchid']
+        assert conn.commit.call_count == 2
+
+    @patch('forestfire.database.repository.DatabaseConnectionManager')
+    def test_execute_prepared_once_per_connection(self, mock_manager):
+        """Test that a statement is prepared once and then executed."""
+        # Arrange
+        conn = mock_manager.get_connection.return_value.__enter__.return_value
+        cursor = conn.cursor.return_value.__enter__.return_value
+        conn.prepared = {}
+        cursor.fetchall.return_value = [(1,)]
+        query = 'SELECT id FROM picklist WHERE picktaskid = ANY(%s) ' \
+                "AND batchid LIKE 'BATCH%%'"
+
+        # Act
+        first = BaseRepository().execute_prepared('by_task', query, (['t'],))
+        BaseRepository().execute_prepared('by_task', query, (['u'],))
+
+        # Assert
+        assert first == [(1,)]
+        statements = [call.args[0] for call in cursor.execute.call_args_list]
+        assert statements == [
+            "PREPARE by_task AS SELECT id FROM picklist "
+            "WHERE picktaskid = ANY($1) AND batchid LIKE 'BATCH%'",
+            'EXECUTE by_task (%s)',
+            'EXECUTE by_task (%s)'
+        ]
+        assert cursor.execute.call_args.args[1] == (['u'],)
+
+    @patch('forestfire.database.repository.DatabaseConnectionManager')
+    def test_execute_bulk_update_without_rows(self, mock_manager):
+        """Test that an empty update does not touch the database."""
+        # Act
+        updated = BaseRepository().execute_bulk_update(
+            'nifiapp.picklist', 'id', ('batchid',), [])
+
+        # Assert
+        assert updated == 0
+        mock_manager.get_connection.assert_not_called()
+
+    @patch('forestfire.database.repository.extras.execute_values')
+    @patch('forestfire.database.repository.DatabaseConnectionManager')
+    def test_execute_bulk_update_rolls_back(self, mock_manager,
+                                            mock_execute_values):
+        """Test that a failed bulk update is rolled back."""
+        # Arrange
+        conn = mock_manager.get_connection.return_value.__enter__.return_value
+        mock_execute_values.side_effect = Exception('copy failed')
+
+        # Act/Assert
+        with pytest.raises(QueryError):
+            BaseRepository().execute_bulk_update(
+                'nifiapp.picklist', 'id', ('batchid',), [(1, 'BATCH_0')])
+        conn.rollback.assert_called_once()
 
 
 class TestBatchPickSequenceService:
     """Test cases for the BatchPickSequenceService class."""
 
-    @patch('forestfire.database.repository.BaseRepository.execute_query')
-    @patch('forestfire.optimizer.services.routing.RouteOptimizer.calculate_shortest_route')
+    @patch('forestfire.database.repository.BaseRepository.execute_prepared')
+    @patch.object(RouteOptimizer, 'calculate_shortest_route')
     def test_update_pick_sequences(self, mock_calculate_shortest_route,
-                                 mock_execute_query):
+                                 mock_execute_prepared):
         """Test updating pick sequences."""
         # Arrange
         # Mock the calculate_shortest_route method
@@ -89,10 +422,10 @@ class TestBatchPickSequenceService:
             []
         )
 
-        # Mock the execute_query method
-        mock_execute_query.return_value = [
-            ('id1', 'task1', 10, 20),
-            ('id2', 'task2', 30, 40)
+        # Mock the execute_prepared method
+        mock_execute_prepared.return_value = [
+            ('id1', 'task1', 10, 20, None, None),
+            ('id2', 'task2', 30, 40, None, None)
         ]
 
         service = BatchPickSequenceService()
@@ -109,4 +442,88 @@ class TestBatchPickSequenceService:
 
         # Assert
         mock_calculate_shortest_route.assert_called_once()
-        assert mock_execute_query.call_count >= 1
+        assert mock_execute_prepared.call_count >= 1
+
+    @patch('forestfire.database.repository.BaseRepository.execute_bulk_update')
+    @patch('forestfire.database.repository.BaseRepository.execute_prepared')
+    @patch.object(RouteOptimizer, 'calculate_shortest_route')
+    def test_update_pick_sequences_in_bulk(self, mock_calculate_shortest_route,
+                                           mock_execute_prepared,
+                                           mock_execute_bulk_update):
+        """Test that changed sequences are written with one bulk update."""
+        # Arrange
+        mock_calculate_shortest_route.return_value = (
+            100.0,
+            [
+                MagicMock(picker_id=0, locations=[(0, 0), (30, 40), (10, 20)]),
+                MagicMock(picker_id=1, locations=[(50, 60)])
+            ],
+            []
+        )
+        mock_execute_prepared.return_value = [
+            ('id1', 'task1', 10, 20, None, None),
+            ('id2', 'task2', 30, 40, 'BATCH_1', 1),
+            ('id3', 'task3', 50, 60, 'BATCH_1', 1)
+        ]
+        service = BatchPickSequenceService(chunk_size=1)
+
+        # Act
+        result = service.update_pick_sequences(
+            [0, 0, 1], ['id1', 'id2', 'id3'],
+            [[(10, 20)], [(30, 40)], [(50, 60)]],
+            ['task1', 'task2', 'task3'], {}
+        )
+
+        # Assert
+        mock_execute_bulk_update.assert_called_once()
+        table, key, columns, rows = mock_execute_bulk_update.call_args[0]
+        assert (table, key, columns) == (
+            'nifiapp.picklist', 'id', ('picksequence', 'batchid'))
+        assert rows == [('id2', 1, 'BATCH_0'), ('id1', 2, 'BATCH_0')]
+        assert (result.changed, result.unchanged) == (2, 1)
+        assert result.chunks == 1
+
+    def test_chunk_by_batch_keeps_batches_whole(self):
+        """Test that chunks hold whole picker batches."""
+        # Arrange
+        rows = ([(f'a{i}', i, 'BATCH_0') for i in range(3)]
+                + [(f'b{i}', i, 'BATCH_1') for i in range(2)]
+                + [(f'c{i}', i, 'BATCH_2') for i in range(5)])
+
+        # Act
+        chunks = chunk_by_batch(rows, 5)
+
+        # Assert
+        assert [len(chunk) for chunk in chunks] == [5, 5]
+        assert {row[2] for row in chunks[1]} == {'BATCH_2'}
+        assert chunk_by_batch(rows, 0) == [rows]
+        assert chunk_by_batch([], 5) == []
+
+    @patch('forestfire.database.services.batch_pick_seq_service.time.sleep')
+    @patch('forestfire.database.repository.BaseRepository.execute_bulk_update')
+    def test_write_chunk_retries(self, mock_execute_bulk_update, mock_sleep):
+        """Test that a failed chunk is retried with backoff."""
+        # Arrange
+        mock_execute_bulk_update.side_effect = [QueryError('deadlock'), 1]
+        service = BatchPickSequenceService(chunk_size=1, retries=2,
+                                           retry_delay=0.1)
+
+        # Act
+        service._write_chunk([('id1', 1, 'BATCH_0')])
+
+        # Assert
+        assert mock_execute_bulk_update.call_count == 2
+        mock_sleep.assert_called_once_with(0.1)
+
+    @patch('forestfire.database.services.batch_pick_seq_service.time.sleep')
+    @patch('forestfire.database.repository.BaseRepository.execute_bulk_update')
+    def test_write_chunk_gives_up(self, mock_execute_bulk_update, mock_sleep):
+        """Test that a chunk failing every attempt raises."""
+        # Arrange
+        mock_execute_bulk_update.side_effect = QueryError('deadlock')
+        service = BatchPickSequenceService(retries=1)
+
+        # Act/Assert
+        with pytest.raises(QueryError):
+            service._write_chunk([('id1', 1, 'BATCH_0')])
+        assert mock_execute_bulk_update.call_count == 2
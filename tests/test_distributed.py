@@ -0,0 +1,183 @@
+"""Tests for distributed fitness evaluation.
+
+This module contains tests for the TCP work-queue protocol, run against
+evaluation servers on localhost.
+"""
+
+import json
+import socket
+import socketserver
+import struct
+import threading
+import numpy as np
+import pytest
+from forestfire.optimizer.services.distributed import (
+    DistributedEvaluator, EvaluationServer, ProtocolError, recv_message,
+    send_message
+)
+from forestfire.optimizer.services.evaluation import SerialEvaluator
+
+
+class _DropoutHandler(socketserver.BaseRequestHandler):
+    """Accepts the problem, then disconnects on the first batch."""
+
+    def handle(self):
+        send_message(self.request, 'challenge', nonce='0')
+        recv_message(self.request)
+        recv_message(self.request)
+        send_message(self.request, 'ready')
+        recv_message(self.request)
+
+
+@pytest.fixture
+def server_factory():
+    """Start servers on localhost and shut them down after the test."""
+    servers = []
+
+    def start(server):
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append(server)
+        host, port = server.server_address[:2]
+        return f'{host}:{port}'
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class TestDistributedEvaluator:
+    """Test cases for the DistributedEvaluator class."""
+
+    def test_message_round_trip(self):
+        """Test that framed messages carry headers and arrays."""
+        # Arrange
+        left, right = socket.socketpair()
+        genes = np.arange(6, dtype=np.int16).reshape(2, 3)
+
+        # Act
+        with left, right:
+            send_message(left, 'eval', {'genes': genes}, batch=4)
+            header, arrays = recv_message(right)
+
+        # Assert
+        assert header['type'] == 'eval'
+        assert header['batch'] == 4
+        np.testing.assert_array_equal(arrays['genes'], genes)
+
+    def test_matches_serial(self, server_factory, route_optimizer,
+                            sample_orders_assign, sample_picktasks,
+                            sample_stage_result):
+        """Test that remote evaluation gives the serial results."""
+        # Arrange
+        addresses = [server_factory(EvaluationServer('127.0.0.1'))
+                     for _ in range(2)]
+        genes = np.random.default_rng(2).integers(
+            0, 10, (7, 5)).astype(np.int16)
+        serial = SerialEvaluator(route_optimizer, sample_orders_assign,
+                                 sample_picktasks, sample_stage_result)
+
+        # Act
+        with DistributedEvaluator(addresses, sample_orders_assign,
+                                  sample_picktasks, sample_stage_result,
+                                  chunk_size=2) as evaluator:
+            fitness = evaluator.evaluate(genes)
+
+        # Assert
+        np.testing.assert_allclose(fitness, serial.evaluate(genes))
+
+    def test_requeues_batches_of_dropped_worker(
+            self, server_factory, route_optimizer, sample_orders_assign,
+            sample_picktasks, sample_stage_result):
+        """Test that a worker leaving mid-generation loses no batches."""
+        # Arrange
+        addresses = [
+            server_factory(socketserver.ThreadingTCPServer(
+                ('127.0.0.1', 0), _DropoutHandler)),
+            server_factory(EvaluationServer('127.0.0.1'))
+        ]
+        genes = np.random.default_rng(3).integers(
+            0, 10, (6, 5)).astype(np.int16)
+        serial = SerialEvaluator(route_optimizer, sample_orders_assign,
+                                 sample_picktasks, sample_stage_result)
+
+        # Act
+        with DistributedEvaluator(addresses, sample_orders_assign,
+                                  sample_picktasks, sample_stage_result,
+                                  chunk_size=1, timeout=5) as evaluator:
+            fitness = evaluator.evaluate(genes)
+            live_workers = evaluator.workers
+
+        # Assert
+        np.testing.assert_allclose(fitness, serial.evaluate(genes))
+        assert live_workers == 1
+
+    def test_rejects_wrong_secret(self, server_factory, sample_orders_assign,
+                                  sample_picktasks, sample_stage_result):
+        """Test that a coordinator without the shared secret is refused."""
+        # Arrange
+        address = server_factory(EvaluationServer('127.0.0.1',
+                                                  secret='right'))
+
+        # Act/Assert
+        with pytest.raises(ConnectionError):
+            DistributedEvaluator([address], sample_orders_assign,
+                                 sample_picktasks, sample_stage_result,
+                                 timeout=5, secret='wrong')
+
+    def test_authenticates_with_shared_secret(
+            self, server_factory, route_optimizer, sample_orders_assign,
+            sample_picktasks, sample_stage_result):
+        """Test that a coordinator with the shared secret is served."""
+        # Arrange
+        address = server_factory(EvaluationServer('127.0.0.1',
+                                                  secret='right'))
+        genes = np.zeros((2, len(sample_orders_assign)), dtype=np.int16)
+        serial = SerialEvaluator(route_optimizer, sample_orders_assign,
+                                 sample_picktasks, sample_stage_result)
+
+        # Act
+        with DistributedEvaluator([address], sample_orders_assign,
+                                  sample_picktasks, sample_stage_result,
+                                  timeout=5, secret='right') as evaluator:
+            fitness = evaluator.evaluate(genes)
+
+        # Assert
+        np.testing.assert_allclose(fitness, serial.evaluate(genes))
+
+    def test_public_server_requires_secret(self):
+        """Test that a server beyond localhost needs a shared secret."""
+        # Act/Assert
+        with pytest.raises(ValueError):
+            EvaluationServer('0.0.0.0', secret='')
+
+    def test_rejects_oversized_messages(self):
+        """Test that header and payload limits apply before allocation."""
+        # Arrange
+        left, right = socket.socketpair()
+        huge = json.dumps({'type': 'eval', 'arrays': [
+            ['genes', '<f8', [1 << 20, 1 << 20]]]}).encode('utf-8')
+
+        # Act/Assert
+        with left, right:
+            left.sendall(struct.pack('!I', 1 << 30))
+            with pytest.raises(ProtocolError):
+                recv_message(right, max_header=1024)
+            left.sendall(struct.pack('!I', len(huge)) + huge)
+            with pytest.raises(ProtocolError):
+                recv_message(right)
+
+    def test_no_workers_available(self, sample_orders_assign,
+                                  sample_picktasks, sample_stage_result):
+        """Test that an evaluator without reachable workers fails fast."""
+        # Arrange
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            address = '127.0.0.1:%d' % probe.getsockname()[1]
+
+        # Act/Assert
+        with pytest.raises(ConnectionError):
+            DistributedEvaluator([address], sample_orders_assign,
+                                 sample_picktasks, sample_stage_result,
+                                 timeout=1)
@@ -0,0 +1,90 @@
+"""Tests for the fitness evaluation backends.
+
+This module contains tests for the columnar problem instance and the serial
+and process-pool evaluators.
+"""
+
+import numpy as np
+from forestfire.optimizer.models.problem import ProblemInstance
+from forestfire.optimizer.services.evaluation import (
+    ProcessPoolEvaluator, SerialEvaluator, SharedProblem
+)
+
+
+class TestProblemInstance:
+    """Test cases for the ProblemInstance model."""
+
+    def test_round_trip(self, sample_orders_assign, sample_picktasks,
+                        sample_stage_result):
+        """Test that list inputs survive conversion to arrays and back."""
+        # Act
+        problem = ProblemInstance.from_lists(
+            sample_orders_assign, sample_picktasks, sample_stage_result)
+        orders_assign, picktasks, stage_result = problem.to_lists()
+
+        # Assert
+        assert problem.orders_size == len(sample_orders_assign)
+        assert orders_assign == sample_orders_assign
+        assert picktasks == sample_picktasks
+        assert stage_result == sample_stage_result
+
+    def test_shared_memory_round_trip(self, sample_orders_assign,
+                                      sample_picktasks, sample_stage_result):
+        """Test that an instance can be attached from shared memory."""
+        # Arrange
+        problem = ProblemInstance.from_lists(
+            sample_orders_assign, sample_picktasks, sample_stage_result)
+        shared = SharedProblem(problem)
+
+        # Act
+        try:
+            shm, attached = SharedProblem.attach(shared.name, shared.layout)
+            orders_assign, _, _ = attached.to_lists()
+            shm.close()
+        finally:
+            shared.close()
+
+        # Assert
+        assert orders_assign == sample_orders_assign
+
+
+class TestEvaluators:
+    """Test cases for the evaluator backends."""
+
+    def test_serial_evaluator(self, route_optimizer, sample_orders_assign,
+                              sample_picktasks, sample_stage_result):
+        """Test that the serial evaluator matches the route optimizer."""
+        # Arrange
+        genes = np.array([[0, 1, 2, 0, 1], [3, 3, 4, 4, 5]], dtype=np.int16)
+        evaluator = SerialEvaluator(route_optimizer, sample_orders_assign,
+                                    sample_picktasks, sample_stage_result)
+
+        # Act
+        fitness = evaluator.evaluate(genes)
+
+        # Assert
+        expected = route_optimizer.calculate_shortest_route(
+            evaluator.picker_locations, [3, 3, 4, 4, 5],
+            sample_orders_assign, sample_picktasks, sample_stage_result)[0]
+        assert fitness.shape == (2,)
+        assert fitness[1] == expected
+
+    def test_process_pool_matches_serial(self, route_optimizer,
+                                         sample_orders_assign,
+                                         sample_picktasks,
+                                         sample_stage_result):
+        """Test that parallel evaluation gives the serial results."""
+        # Arrange
+        rng = np.random.default_rng(1)
+        genes = rng.integers(0, 10, (9, 5)).astype(np.int16)
+        serial = SerialEvaluator(route_optimizer, sample_orders_assign,
+                                 sample_picktasks, sample_stage_result)
+
+        # Act
+        with ProcessPoolEvaluator(sample_orders_assign, sample_picktasks,
+                                  sample_stage_result, workers=2,
+                                  chunk_size=4, seed=0) as evaluator:
+            fitness = evaluator.evaluate(genes)
+
+        # Assert
+        np.testing.assert_allclose(fitness, serial.evaluate(genes))
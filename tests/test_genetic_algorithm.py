@@ -4,6 +4,12 @@ This module contains tests for the genetic algorithm operations used in
 warehouse order picking optimization.
 """
 
+from unittest.mock import patch
+import numpy as np
+from forestfire.algorithms.genetic import GeneticOperator
+from forestfire.algorithms.population import (
+    Population, picker_loads, random_feasible_genes
+)
 from forestfire.utils.config import PICKER_CAPACITIES, NUM_PICKERS
 
 class TestGeneticOperator:
@@ -109,3 +115,112 @@ class TestGeneticOperator:
         for i in range(len(offspring1)):
             assert offspring1[i] in [parent1[i], parent2[i]]
             assert offspring2[i] in [parent1[i], parent2[i]]
+
+    def test_crossover_batch_respects_capacity(self, genetic_operator):
+        """Test that batch crossover yields capacity-feasible offspring."""
+        # Arrange
+        capacities = [3] * NUM_PICKERS
+        parents1 = random_feasible_genes(genetic_operator.rng, 8, 20,
+                                         capacities)
+        parents2 = random_feasible_genes(genetic_operator.rng, 8, 20,
+                                         capacities)
+
+        # Act
+        offspring1, offspring2 = genetic_operator.crossover_batch(
+            parents1, parents2, capacities)
+
+        # Assert
+        assert offspring1.shape == parents1.shape
+        assert offspring2.shape == parents2.shape
+        for offspring in (offspring1, offspring2):
+            loads = picker_loads(offspring, NUM_PICKERS)
+            assert np.all(loads <= capacities)
+
+    def test_crossover_batch_needs_no_repair(self, genetic_operator):
+        """Test that children keep parent genes wherever capacity allows."""
+        # Arrange
+        capacities = [3] * NUM_PICKERS
+        parents1 = random_feasible_genes(genetic_operator.rng, 8, 20,
+                                         capacities)
+        parents2 = random_feasible_genes(genetic_operator.rng, 8, 20,
+                                         capacities)
+        genetic_operator.pc = 1.0
+        with patch.object(genetic_operator, 'repair_capacity_batch') as repair:
+            # Act
+            offspring1, offspring2 = genetic_operator.crossover_batch(
+                parents1, parents2, capacities)
+
+        # Assert
+        repair.assert_not_called()
+        for offspring in (offspring1, offspring2):
+            assert np.all(picker_loads(offspring, NUM_PICKERS) <= capacities)
+            inherited = (offspring == parents1) | (offspring == parents2)
+            assert inherited.mean() > 0.8
+
+    def test_mutate_batch_respects_capacity(self, genetic_operator):
+        """Test that batch mutation changes at most one gene per row."""
+        # Arrange
+        capacities = [2] * NUM_PICKERS
+        genes = random_feasible_genes(genetic_operator.rng, 10, 20, capacities)
+
+        # Act
+        mutated = genetic_operator.mutate_batch(genes, capacities)
+
+        # Assert
+        assert np.all((mutated != genes).sum(axis=1) <= 1)
+        assert np.all(picker_loads(mutated, NUM_PICKERS) <= capacities)
+
+    def test_repair_capacity_batch(self, genetic_operator):
+        """Test that batch repair removes every capacity violation."""
+        # Arrange
+        genes = np.zeros((4, 11), dtype=np.int16)
+        capacities = [10] * NUM_PICKERS
+
+        # Act
+        repaired = genetic_operator.repair_capacity_batch(genes, capacities)
+
+        # Assert
+        assert np.all(picker_loads(repaired, NUM_PICKERS) <= capacities)
+        assert np.all((repaired != genes).sum(axis=1) == 1)
+
+    def test_tournament_selection_indices(self, route_optimizer):
+        """Test that tournaments favour fit rows and never pick the worst."""
+        # Arrange
+        genetic_operator = GeneticOperator(route_optimizer,
+                                           np.random.default_rng(0))
+        fitness = np.array([120.0, 100.0, 150.0, 110.0, 130.0])
+
+        # Act
+        winners = genetic_operator.tournament_selection_indices(
+            fitness, 50, len(fitness) - 1)
+
+        # Assert
+        assert winners.shape == (50,)
+        assert not np.any(winners == np.argmax(fitness))
+        assert np.bincount(winners, minlength=5).argmax() == \
+            np.argmin(fitness)
+
+
+class TestPopulation:
+    """Test cases for the Population container."""
+
+    def test_from_pairs_round_trip(self, sample_population):
+        """Test conversion from and to legacy pairs."""
+        # Act
+        population = Population.from_pairs(sample_population)
+
+        # Assert
+        assert population.genes.dtype == np.int16
+        assert population.to_pairs() == sample_population
+
+    def test_truncate_keeps_best(self, sample_population):
+        """Test that truncation keeps the fittest individuals in order."""
+        # Arrange
+        population = Population.from_pairs(sample_population)
+
+        # Act
+        survivors = population.truncate(3)
+
+        # Assert
+        assert survivors.fitness.tolist() == [100.0, 110.0, 120.0]
+        assert survivors.best()[1] == 100.0
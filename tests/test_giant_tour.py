@@ -0,0 +1,137 @@
+"""Tests for the giant-tour encoding.
+
+This module contains tests for the split decoder and the permutation
+operators.
+"""
+
+import itertools
+import numpy as np
+import pytest
+from forestfire.algorithms.giant_tour import (
+    DecodingEvaluator, GiantTourOperator, SplitDecoder, _sliding_min
+)
+from forestfire.algorithms.population import Population
+from forestfire.optimizer.services.evaluation import SerialEvaluator
+from forestfire.utils.config import NUM_PICKERS, PICKER_CAPACITIES
+
+
+def _split_cost(decoder, tour, assignment):
+    points = decoder.points[tour]
+    owners = assignment[tour]
+    total = 0.0
+    for picker in np.unique(owners):
+        segment = points[owners == picker]
+        total += decoder.walk_distance(decoder.pickers[picker], segment[0])
+        total += decoder.walk_distance(segment[:-1], segment[1:]).sum()
+    return total
+
+
+class TestSplitDecoder:
+    """Test cases for the SplitDecoder class."""
+
+    def test_sliding_min(self):
+        """Test the window minima against a direct computation."""
+        # Arrange
+        values = np.random.default_rng(0).random(23)
+
+        # Act
+        minima = _sliding_min(values, 4)
+
+        # Assert
+        expected = [values[max(0, e - 3):e + 1].min() for e in range(23)]
+        np.testing.assert_allclose(minima, expected)
+
+    def test_decode_is_feasible_and_contiguous(self, sample_orders_assign):
+        """Test that pickers take consecutive tour segments within capacity."""
+        # Arrange
+        decoder = SplitDecoder(sample_orders_assign,
+                               picker_capacities=[2, 2, 2])
+        tour = np.array([3, 0, 4, 1, 2])
+
+        # Act
+        assignment = decoder.decode(tour)
+
+        # Assert
+        assert np.bincount(assignment, minlength=3).max() <= 2
+        owners = assignment[tour]
+        assert np.all(np.diff(owners) >= 0)
+
+    def test_decode_is_optimal_split(self, sample_orders_assign):
+        """Test the decoded split against all capacity-feasible splits."""
+        # Arrange
+        capacities = [2, 3, 2]
+        decoder = SplitDecoder(sample_orders_assign,
+                               picker_locations=[(0, 0), (60, 25), (120, 0)],
+                               picker_capacities=capacities)
+        tour = np.array([2, 0, 4, 3, 1])
+
+        # Act
+        assignment = decoder.decode(tour)
+
+        # Assert
+        best = min(
+            _split_cost(decoder, tour, np.array(owners)[np.argsort(tour)])
+            for owners in itertools.product(range(3), repeat=5)
+            if list(owners) == sorted(owners)
+            and all(owners.count(p) <= capacities[p] for p in range(3))
+        )
+        assert _split_cost(decoder, tour, assignment) == pytest.approx(best)
+
+    def test_insufficient_capacity(self, sample_orders_assign):
+        """Test that decoding needs room for every order."""
+        # Act/Assert
+        with pytest.raises(ValueError):
+            SplitDecoder(sample_orders_assign, picker_capacities=[1, 1])
+
+    def test_encode_round_trip_keeps_feasibility(self, sample_orders_assign):
+        """Test that encoded assignments decode to feasible assignments."""
+        # Arrange
+        decoder = SplitDecoder(sample_orders_assign)
+
+        # Act
+        tour = decoder.encode([1, 0, 1, 2, 0])
+
+        # Assert
+        assert sorted(tour.tolist()) == list(range(5))
+        assert np.all(np.bincount(decoder.decode(tour), minlength=NUM_PICKERS)
+                      <= PICKER_CAPACITIES)
+
+
+class TestGiantTourOperator:
+    """Test cases for the GiantTourOperator class."""
+
+    def test_operators_keep_permutations(self, sample_orders_assign):
+        """Test that crossover and inversion produce permutations."""
+        # Arrange
+        tour_op = GiantTourOperator(SplitDecoder(sample_orders_assign),
+                                    np.random.default_rng(3))
+        parents = tour_op.random_tours(8, 5)
+
+        # Act
+        children1, children2 = tour_op.order_crossover_batch(
+            parents[:4], parents[4:])
+        mutants = tour_op.inversion_batch(parents)
+
+        # Assert
+        for tour in np.concatenate([children1, children2, mutants]):
+            assert sorted(tour.tolist()) == list(range(5))
+
+    def test_evolve_never_worsens_best(self, route_optimizer,
+                                       sample_orders_assign, sample_picktasks,
+                                       sample_stage_result):
+        """Test one generation over tours evaluated through the decoder."""
+        # Arrange
+        decoder = SplitDecoder(sample_orders_assign, route_optimizer)
+        tour_op = GiantTourOperator(decoder, np.random.default_rng(1))
+        evaluator = DecodingEvaluator(decoder, SerialEvaluator(
+            route_optimizer, sample_orders_assign, sample_picktasks,
+            sample_stage_result))
+        tours = tour_op.random_tours(6, 5)
+        pop = Population(tours, evaluator.evaluate(tours))
+
+        # Act
+        next_pop = tour_op.evolve(pop, evaluator, pop_size=6)
+
+        # Assert
+        assert len(next_pop) == 6
+        assert next_pop.best()[1] <= pop.best()[1]
@@ -4,6 +4,8 @@ This module contains tests for the population initialization functions used in
 warehouse order picking optimization.
 """
 
+import numpy as np
+import pytest
 from main import initialize_population
 
 class TestInitialization:
@@ -52,7 +54,8 @@ class TestInitialization:
 
         # Assert
         for assignment in population:
-            picker_counts = [assignment.count(i) for i in range(num_pickers)]
+            picker_counts = [list(assignment).count(i)
+                             for i in range(num_pickers)]
             assert all(count <= capacity
                        for count, capacity in zip(picker_counts, picker_capacities))
 
@@ -71,7 +74,7 @@ class TestInitialization:
 
         # Assert
         # Check that at least one assignment is different (randomness check)
-        assert any(assignment1 != assignment2
+        assert any(list(assignment1) != list(assignment2)
                    for assignment1, assignment2 in zip(population1, population2))
 
     def test_initialize_population_with_limited_capacity(self):
@@ -88,7 +91,28 @@ class TestInitialization:
 
         # Assert
         for assignment in population:
-            picker0_count = assignment.count(0)
-            picker1_count = assignment.count(1)
+            picker0_count = list(assignment).count(0)
+            picker1_count = list(assignment).count(1)
             assert picker0_count <= picker_capacities[0]
             assert picker1_count <= picker_capacities[1]
+
+    def test_initialize_population_is_int16_matrix(self):
+        """Test that initialize_population returns a 2-D int16 gene matrix."""
+        # Arrange
+        num_pickers = 3
+        orders_size = 7
+        picker_capacities = [3, 3, 3]
+
+        # Act
+        population = initialize_population(
+            num_pickers, orders_size, picker_capacities)
+
+        # Assert
+        assert population.dtype == np.int16
+        assert population.shape[1] == orders_size
+
+    def test_initialize_population_insufficient_capacity(self):
+        """Test that impossible capacities are rejected."""
+        # Act/Assert
+        with pytest.raises(ValueError):
+            initialize_population(2, 10, [3, 3])
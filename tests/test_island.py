@@ -0,0 +1,138 @@
+"""Tests for the island-model genetic algorithm.
+
+This module contains tests for migration topologies and a small multi-process
+island run.
+"""
+
+import multiprocessing
+import time
+import numpy as np
+import pytest
+from forestfire.algorithms.anytime import CancellationToken, Deadline
+from forestfire.algorithms.genetic import GeneticOperator
+from forestfire.algorithms.island import (
+    IslandModel, _run_island, migration_targets
+)
+from forestfire.optimizer.models.problem import ProblemInstance
+from forestfire.optimizer.services.evaluation import SharedProblem
+from forestfire.utils.config import (
+    NUM_PICKERS, PICKER_CAPACITIES, PICKER_LOCATIONS
+)
+
+
+class TestIslandModel:
+    """Test cases for the IslandModel class."""
+
+    def test_migration_targets(self):
+        """Test the island neighbours of each topology."""
+        # Arrange
+        rng = np.random.default_rng(0)
+
+        # Act/Assert
+        assert migration_targets(3, 4, 'ring', rng) == [0]
+        assert migration_targets(1, 3, 'fully_connected', rng) == [0, 2]
+        assert migration_targets(2, 4, 'random', rng)[0] in [0, 1, 3]
+        assert not migration_targets(0, 1, 'ring', rng)
+
+    def test_unknown_topology(self):
+        """Test that unknown topologies are rejected."""
+        # Act/Assert
+        with pytest.raises(ValueError):
+            IslandModel(topology='star')
+
+    def test_run_returns_feasible_best(self, route_optimizer,
+                                       sample_orders_assign, sample_picktasks,
+                                       sample_stage_result):
+        """Test that islands evolve in parallel and report the best."""
+        # Arrange
+        model = IslandModel(num_islands=2, island_size=6,
+                            migration_interval=1, migrants=1, seed=5)
+
+        # Act
+        solution, fitness = model.run(
+            sample_orders_assign, sample_picktasks, sample_stage_result,
+            generations=3)
+
+        # Assert
+        assert len(solution) == len(sample_orders_assign)
+        assert all(0 <= picker_id < NUM_PICKERS for picker_id in solution)
+        assert all(solution.count(p) <= PICKER_CAPACITIES[p]
+                   for p in range(NUM_PICKERS))
+        expected, _, _ = route_optimizer.calculate_shortest_route(
+            PICKER_LOCATIONS, solution, sample_orders_assign,
+            sample_picktasks, sample_stage_result)
+        assert fitness == pytest.approx(expected)
+
+
+    def test_affinity_crossover_on_islands(self, monkeypatch,
+                                           sample_orders_assign,
+                                           sample_picktasks,
+                                           sample_stage_result):
+        """Test that island workers keep order clusters for crossover."""
+        # Arrange
+        shared = SharedProblem(ProblemInstance.from_lists(
+            sample_orders_assign, sample_picktasks, sample_stage_result))
+        calls = []
+        use_affinity = GeneticOperator.use_affinity
+
+        def spy(self, orders_assign, affinity=None):
+            use_affinity(self, orders_assign, affinity)
+            calls.append(self.clusters)
+        monkeypatch.setattr(GeneticOperator, 'use_affinity', spy)
+        context = multiprocessing.get_context()
+        inboxes, results = [context.Queue()], context.Queue()
+        settings = {
+            'generations': 2, 'migration_interval': 0, 'migrants': 1,
+            'topology': 'ring', 'affinity': True, 'island_size': 6,
+            'picker_capacities': list(PICKER_CAPACITIES),
+            'picker_locations': list(PICKER_LOCATIONS), 'deadline': None
+        }
+
+        # Act
+        try:
+            _run_island(0, shared.name, shared.layout, settings,
+                        np.random.SeedSequence(1), None, inboxes, results,
+                        context.Event())
+            _, solution, _ = results.get(timeout=5)
+        finally:
+            shared.close()
+
+        # Assert
+        assert len(calls) == 1
+        assert len(calls[0]) == len(sample_orders_assign)
+        assert len(solution) == len(sample_orders_assign)
+
+    def test_expired_deadline_returns_best_so_far(
+            self, sample_orders_assign, sample_picktasks,
+            sample_stage_result):
+        """Test that islands stop at the deadline instead of MAX_IT."""
+        # Arrange
+        model = IslandModel(num_islands=2, island_size=6, seed=5)
+        started = time.monotonic()
+
+        # Act
+        solution, fitness = model.run(
+            sample_orders_assign, sample_picktasks, sample_stage_result,
+            generations=10 ** 6, deadline=Deadline.after(0))
+
+        # Assert
+        assert time.monotonic() - started < 30
+        assert len(solution) == len(sample_orders_assign)
+        assert fitness < float('inf')
+
+    def test_cancellation_stops_islands(self, sample_orders_assign,
+                                        sample_picktasks,
+                                        sample_stage_result):
+        """Test that cancelling the token stops every island."""
+        # Arrange
+        model = IslandModel(num_islands=2, island_size=6, seed=5)
+        token = CancellationToken()
+        token.cancel()
+
+        # Act
+        solution, _ = model.run(
+            sample_orders_assign, sample_picktasks, sample_stage_result,
+            generations=10 ** 6, cancel_token=token)
+
+        # Assert
+        assert len(solution) == len(sample_orders_assign)
@@ -0,0 +1,102 @@
+"""Tests for the local-search refinement.
+
+This module contains tests for the incremental route-cost surrogate and the
+simulated annealing and tabu search refinement.
+"""
+
+import numpy as np
+import pytest
+from forestfire.algorithms.local_search import LocalSearch
+from forestfire.optimizer.services.evaluation import SerialEvaluator
+from forestfire.optimizer.services.incremental import IncrementalRouteCost
+from forestfire.optimizer.services.routing import RouteOptimizer
+from forestfire.utils.config import NUM_PICKERS, PICKER_CAPACITIES
+
+
+class TestIncrementalRouteCost:
+    """Test cases for the IncrementalRouteCost class."""
+
+    def test_deltas_match_recomputed_totals(self, route_optimizer,
+                                            sample_orders_assign,
+                                            sample_assignment):
+        """Test relocate and swap deltas against a fresh surrogate."""
+        # Arrange
+        cost = IncrementalRouteCost(sample_orders_assign, sample_assignment,
+                                    route_optimizer)
+
+        # Act
+        relocate_delta = cost.relocate_delta(2, 0)
+        before = cost.total
+        cost.relocate(2, 0)
+        swap_delta = cost.swap_delta(0, 4)
+        after_relocate = cost.total
+        cost.swap(0, 4)
+
+        # Assert
+        moved = IncrementalRouteCost(sample_orders_assign, [0, 1, 0, 0, 1],
+                                     route_optimizer)
+        swapped = IncrementalRouteCost(sample_orders_assign, [1, 1, 0, 0, 0],
+                                       route_optimizer)
+        assert before + relocate_delta == pytest.approx(moved.total)
+        assert after_relocate + swap_delta == pytest.approx(swapped.total)
+        assert cost.total == pytest.approx(swapped.total)
+        assert cost.assignment == [1, 1, 0, 0, 0]
+
+    def test_empty_picker_costs_nothing(self, route_optimizer,
+                                        sample_orders_assign):
+        """Test that only pickers with orders contribute a cost."""
+        # Act
+        cost = IncrementalRouteCost(sample_orders_assign, [3] * 5,
+                                    route_optimizer)
+
+        # Assert
+        assert cost.total == pytest.approx(cost.costs[3])
+        assert cost.total > 0
+
+    def test_entry_side_follows_layout_midline(self, sample_orders_assign):
+        """Test that pickers enter from the walkway nearest to them."""
+        # Arrange
+        route_optimizer = RouteOptimizer(left_walkway=55, right_walkway=205)
+
+        # Act
+        cost = IncrementalRouteCost(sample_orders_assign, [0] * 5,
+                                    route_optimizer,
+                                    picker_locations=[(100, 0), (150, 0)])
+
+        # Assert
+        assert route_optimizer.midline == 130
+        assert cost.entry_x == [55, 205]
+
+
+class TestLocalSearch:
+    """Test cases for the LocalSearch class."""
+
+    @pytest.mark.parametrize('method', ['annealing', 'tabu'])
+    def test_refine_never_worsens(self, method, route_optimizer,
+                                  sample_orders_assign, sample_picktasks,
+                                  sample_stage_result):
+        """Test that refinement keeps capacity and the better solution."""
+        # Arrange
+        evaluator = SerialEvaluator(route_optimizer, sample_orders_assign,
+                                    sample_picktasks, sample_stage_result)
+        start = [0, 1, 2, 3, 4]
+        start_fitness = evaluator.evaluate(np.array([start]))[0]
+        search = LocalSearch(route_optimizer, np.random.default_rng(2),
+                             method=method, max_moves=500)
+
+        # Act
+        solution, fitness = search.refine(start, sample_orders_assign,
+                                          evaluator)
+
+        # Assert
+        assert fitness <= start_fitness
+        assert fitness == pytest.approx(
+            evaluator.evaluate(np.array([solution]))[0])
+        assert all(solution.count(p) <= PICKER_CAPACITIES[p]
+                   for p in range(NUM_PICKERS))
+
+    def test_unknown_method(self, route_optimizer):
+        """Test that unknown methods are rejected."""
+        # Act/Assert
+        with pytest.raises(ValueError):
+            LocalSearch(route_optimizer, method='hill_climbing')
@@ -4,11 +4,16 @@ This module contains tests for the main execution functions used in
 warehouse order picking optimization.
 """
 
+import asyncio
+import os
+import runpy
 from unittest.mock import patch, MagicMock
 from main import (
     run_aco_optimization,
-    run_genetic_optimization, main
+    run_genetic_optimization, main, main_async
 )
+from forestfire.algorithms.anytime import Deadline
+from forestfire.algorithms.population import Population
 from forestfire.utils.config import NUM_PICKERS
 
 class TestMain:
@@ -47,7 +52,8 @@ class TestMain:
 
         # Act
         final_solution = run_genetic_optimization(
-            genetic_operator, route_optimizer, sample_population,
+            genetic_operator, route_optimizer,
+            Population.from_pairs(sample_population),
             sample_orders_assign, sample_picktasks, sample_stage_result
         )
 
@@ -65,7 +71,9 @@ class TestMain:
              patch("main.GeneticOperator"), \
              patch("main.AntColonyOptimizer"), \
              patch("main.PathVisualizer") as mock_path_visualizer, \
-             patch("main.run_aco_optimization") as mock_run_aco:
+             patch("main.run_aco_optimization") as mock_run_aco, \
+             patch("main.run_local_search",
+                   side_effect=lambda _, solution, *args, **kwargs: solution):
 
             # Mock the get_optimized_data method to return test data
             mock_picklist_repo.return_value.get_optimized_data.return_value = (
@@ -77,8 +85,9 @@ class TestMain:
             )
 
             # Mock the calculate_shortest_route to return a fixed fitness score
-            mock_route_optimizer.return_value.calculate_shortest_route.return_value = \
-                (100.0, [], [])
+            route_optimizer = mock_route_optimizer.return_value
+            route_optimizer.calculate_shortest_route.return_value = (
+                100.0, [], [])
 
             # Mock the run_aco_optimization function
             mock_run_aco.return_value = [[[0, 1, 2, 0, 1], 100.0]]
@@ -91,12 +100,76 @@ class TestMain:
 
             # Assert
             # Check that all the necessary methods were called
-            mock_picklist_repo.return_value.get_optimized_data.assert_called_once()
-            assert mock_route_optimizer.return_value.calculate_shortest_route.call_count > 0
+            mock_picklist_repo.return_value.get_optimized_data.\
+                assert_called_once()
+            assert route_optimizer.calculate_shortest_route.call_count > 0
             mock_path_visualizer.return_value.plot_routes.assert_called_once()
             mock_batch_service.return_value.update_pick_sequences.\
                 assert_called_once()
 
+    @patch("main.run_optimization")
+    def test_main_falls_back_when_out_of_time(self, mock_run_optimization):
+        """Test that an expired deadline writes back the constructive answer."""
+        # Arrange
+        with patch("main.PicklistRepository") as mock_picklist_repo, \
+             patch("main.BatchPickSequenceService") as mock_batch_service, \
+             patch("main.PathVisualizer"):
+            mock_picklist_repo.return_value.get_optimized_data.return_value = (
+                ["task1", "task2", "task3"],
+                [[(20, 0)], [(30, 0)], [(40, 50)]],
+                {"task1": [(5, 5)]},
+                ["id1", "id2", "id3"]
+            )
+
+            # Act
+            main(deadline=Deadline.after(-1))
+
+            # Assert
+            mock_run_optimization.assert_not_called()
+            solution = mock_batch_service.return_value.\
+                update_pick_sequences.call_args[0][0]
+            assert len(solution) == 3
+            assert all(0 <= picker_id < NUM_PICKERS for picker_id in solution)
+
+    @patch("main.run_optimization")
+    def test_main_async(self, mock_run_optimization):
+        """Test the event-loop pipeline writes back and plots the answer."""
+        # Arrange
+        with patch("main.PicklistRepository") as mock_picklist_repo, \
+             patch("main.BatchPickSequenceService") as mock_batch_service, \
+             patch("main.PathVisualizer") as mock_path_visualizer:
+            mock_picklist_repo.return_value.get_optimized_data.return_value = (
+                ["task1", "task2"], [[(20, 0)], [(30, 0)]], {}, ["id1", "id2"]
+            )
+            mock_run_optimization.return_value = [0, 1]
+
+            # Act
+            asyncio.run(main_async())
+
+            # Assert
+            mock_path_visualizer.return_value.plot_routes.\
+                assert_called_once_with([0, 1])
+            mock_batch_service.return_value.update_pick_sequences.\
+                assert_called_once_with([0, 1], ["id1", "id2"],
+                                        [[(20, 0)], [(30, 0)]],
+                                        ["task1", "task2"], {})
+
+    def test_script_runs_async_pipeline_when_enabled(self):
+        """Test that ASYNC_PIPELINE runs main_async from the script."""
+        # Arrange
+        script = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                              'main.py')
+        with patch('forestfire.utils.config.ASYNC_PIPELINE', True), \
+             patch('asyncio.run') as mock_run:
+            # Act
+            runpy.run_path(script, run_name='__main__')
+
+        # Assert
+        coroutine = mock_run.call_args[0][0]
+        coroutine.close()
+        mock_run.assert_called_once()
+        assert coroutine.__name__ == 'main_async'
+
     @patch("main.logging")
     def test_main_script_execution(self, mock_logging):
         """Test the main script execution with exception handling."""
@@ -0,0 +1,123 @@
+"""Tests for the budget-aware engine portfolio.
+
+This module contains tests for budget accounting, engine selection and elite
+sharing in the portfolio scheduler, and for the ACO, GA and ALNS engines.
+"""
+
+import numpy as np
+import pytest
+from forestfire.algorithms.alns import ALNSOptimizer
+from forestfire.algorithms.anytime import CancellationToken
+from forestfire.algorithms.population import Population
+from forestfire.algorithms.portfolio import (
+    ColonyEngine, GeneticEngine, LocalSearchEngine, PortfolioScheduler
+)
+from forestfire.optimizer.services.evaluation import SerialEvaluator
+from forestfire.utils.config import NUM_PICKERS, PICKER_CAPACITIES
+
+
+class _FakeEngine:
+    """Engine whose steps follow a fixed list of fitness values"""
+
+    def __init__(self, name, results, evaluations=1):
+        self.name = name
+        self.results = list(results)
+        self.evaluations = evaluations
+        self.injected = []
+        self.steps = 0
+
+    def step(self):
+        self.steps += 1
+        fitness = self.results.pop(0) if self.results else 1000.0
+        return np.full(3, self.steps), fitness, self.evaluations
+
+    def inject(self, genes, fitness):
+        self.injected.append(fitness)
+
+
+class TestPortfolioScheduler:
+    """Test cases for the PortfolioScheduler class."""
+
+    def test_budget_moves_to_productive_engine(self):
+        """Test that the improving engine receives most of the budget."""
+        # Arrange
+        stuck = _FakeEngine('stuck', [])
+        improving = _FakeEngine('improving', [90.0 - i for i in range(50)])
+        scheduler = PortfolioScheduler(
+            [stuck, improving], budget=30, unit='evaluations',
+            exploration=0.0, rng=np.random.default_rng(0))
+
+        # Act
+        _, fitness = scheduler.run(np.zeros(3), 100.0)
+
+        # Assert
+        assert scheduler.spent['improving'] > 25
+        assert sum(scheduler.spent.values()) == pytest.approx(30)
+        assert fitness < 90.0
+        assert stuck.injected and stuck.injected[-1] == fitness
+
+    def test_unknown_unit(self):
+        """Test that unknown budget units are rejected."""
+        # Act/Assert
+        with pytest.raises(ValueError):
+            PortfolioScheduler([_FakeEngine('a', [])], unit='generations')
+
+    def test_real_engines_share_budget(
+            self, genetic_operator, ant_colony_optimizer, route_optimizer,
+            sample_orders_assign, sample_picktasks, sample_stage_result,
+            sample_population):
+        """Test a short portfolio run over the ACO, GA and ALNS engines."""
+        # Arrange
+        evaluator = SerialEvaluator(route_optimizer, sample_orders_assign,
+                                    sample_picktasks, sample_stage_result)
+        pop = Population.from_pairs(sample_population)
+        pop = Population(pop.genes, evaluator.evaluate(pop.genes))
+        genes, fitness = pop.best()
+        engines = [
+            ColonyEngine(ant_colony_optimizer, evaluator,
+                         sample_orders_assign, ants_per_step=2),
+            GeneticEngine(genetic_operator, evaluator, pop, pop_size=5),
+            LocalSearchEngine(
+                ALNSOptimizer(route_optimizer, np.random.default_rng(0),
+                              iterations=10),
+                evaluator, sample_orders_assign, genes, fitness)
+        ]
+        scheduler = PortfolioScheduler(engines, budget=40,
+                                       unit='evaluations',
+                                       rng=np.random.default_rng(0))
+
+        # Act
+        solution, best = scheduler.run(genes, fitness)
+
+        # Assert
+        assert best <= fitness
+        assert best == pytest.approx(
+            evaluator.evaluate(np.array([solution]))[0])
+        assert all(solution.count(p) <= PICKER_CAPACITIES[p]
+                   for p in range(NUM_PICKERS))
+        assert all(spent > 0 for spent in scheduler.spent.values())
+
+    def test_local_search_reports_work_and_stops_when_cancelled(
+            self, route_optimizer, sample_orders_assign, sample_picktasks,
+            sample_stage_result, sample_population):
+        """Test that ALNS bursts report their work and honour the token."""
+        # Arrange
+        evaluator = SerialEvaluator(route_optimizer, sample_orders_assign,
+                                    sample_picktasks, sample_stage_result)
+        genes, fitness = Population.from_pairs(sample_population).best()
+        token = CancellationToken()
+        engine = LocalSearchEngine(
+            ALNSOptimizer(route_optimizer, np.random.default_rng(0),
+                          iterations=40),
+            evaluator, sample_orders_assign, genes, fitness,
+            surrogate_cost=0.5, cancel_token=token)
+
+        # Act
+        _, _, burst = engine.step()
+        token.cancel()
+        _, _, cancelled = engine.step()
+
+        # Assert
+        assert burst == pytest.approx(2 + 40 * 0.5)
+        assert cancelled == pytest.approx(2)
+        assert engine.alns.iterations_run == 0
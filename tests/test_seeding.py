@@ -0,0 +1,98 @@
+"""Tests for cluster-first population seeding.
+
+This module contains tests for capacitated k-means, aisle sweeps,
+capacity-preserving perturbation and the seeded population.
+"""
+
+import numpy as np
+from forestfire.algorithms.seeding import (
+    capacitated_kmeans, order_points, perturb, seed_population,
+    sweep_assignment
+)
+from forestfire.optimizer.services.incremental import IncrementalRouteCost
+from forestfire.algorithms.population import random_feasible_genes
+
+
+def _two_aisle_wave():
+    return ([[(20.0 + i, 5.0)] for i in range(6)]
+            + [[(20.0 + i, 85.0)] for i in range(6)])
+
+
+class TestSeeding:
+    """Test cases for the seeding strategies."""
+
+    def test_kmeans_separates_distant_aisles(self):
+        """Test that k-means keeps each aisle with one picker."""
+        # Arrange
+        points = order_points(_two_aisle_wave())
+
+        # Act
+        assignment = capacitated_kmeans(points, [6, 6],
+                                        np.random.default_rng(0))
+
+        # Assert
+        assert len(set(assignment[:6].tolist())) == 1
+        assert len(set(assignment[6:].tolist())) == 1
+        assert assignment[0] != assignment[6]
+
+    def test_kmeans_respects_capacity(self):
+        """Test that tight capacities split a cluster."""
+        # Arrange
+        points = order_points(_two_aisle_wave())
+
+        # Act
+        assignment = capacitated_kmeans(points, [4, 4, 4],
+                                        np.random.default_rng(1))
+
+        # Assert
+        assert np.bincount(assignment, minlength=3).max() <= 4
+
+    def test_sweep_fills_pickers_in_proportion(self):
+        """Test that a sweep gives pickers segments within capacity."""
+        # Arrange
+        points = order_points(_two_aisle_wave())
+
+        # Act
+        assignment = sweep_assignment(points, [8, 4],
+                                      np.random.default_rng(2))
+
+        # Assert
+        assert np.bincount(assignment, minlength=2).tolist() == [8, 4]
+
+    def test_perturb_keeps_loads(self):
+        """Test that perturbation only swaps pickers between orders."""
+        # Arrange
+        genes = np.array([[0, 0, 1, 1, 2, 2]] * 3, dtype=np.int16)
+
+        # Act
+        perturbed = perturb(genes, np.random.default_rng(3), 0.7)
+
+        # Assert
+        for row in perturbed:
+            assert np.bincount(row).tolist() == [2, 2, 2]
+
+    def test_seeded_population_is_feasible_and_coherent(self,
+                                                        route_optimizer):
+        """Test the seeded population beats random rows on route cost."""
+        # Arrange
+        orders_assign = _two_aisle_wave()
+        capacities = [6, 6, 6]
+        locations = [(0, 0), (0, 0), (0, 0)]
+
+        # Act
+        genes = seed_population(orders_assign, 10, np.random.default_rng(4),
+                                capacities, random_share=0.4,
+                                picker_locations=locations)
+
+        # Assert
+        assert genes.shape == (10, 12)
+        assert all(np.bincount(row, minlength=3).max() <= 6 for row in genes)
+        random_rows = random_feasible_genes(np.random.default_rng(5), 10, 12,
+                                            capacities)
+        seeded_cost = min(IncrementalRouteCost(
+            orders_assign, row, route_optimizer, locations).total
+            for row in genes[:6])
+        random_cost = np.mean([IncrementalRouteCost(
+            orders_assign, row, route_optimizer, locations).total
+            for row in random_rows])
+        assert seeded_cost < random_cost
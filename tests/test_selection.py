@@ -0,0 +1,78 @@
+"""Tests for the selection engine.
+
+This module contains tests for vectorized tournaments, truncation survival
+and duplicate removal used by the genetic algorithm.
+"""
+
+import numpy as np
+from forestfire.algorithms.population import Population
+from forestfire.algorithms.selection import SelectionEngine
+
+
+class TestSelectionEngine:
+    """Test cases for the SelectionEngine class."""
+
+    def test_tournament_prefers_fitter(self):
+        """Test that tournament winners are never worse than a contestant."""
+        # Arrange
+        engine = SelectionEngine(np.random.default_rng(3))
+        fitness = np.arange(100, dtype=float)
+
+        # Act
+        winners = engine.tournament(fitness, 1000, 5)
+
+        # Assert
+        assert winners.shape == (1000,)
+        assert fitness[winners].mean() < fitness.mean()
+
+    def test_survive_keeps_best_sorted(self, sample_population):
+        """Test that survival keeps the best individuals in order."""
+        # Arrange
+        engine = SelectionEngine(np.random.default_rng(0))
+        population = Population.from_pairs(sample_population)
+        offspring = np.array([[2, 2, 2, 2, 2]])
+
+        # Act
+        survivors = engine.survive(population, offspring, [90.0], 3)
+
+        # Assert
+        assert survivors.fitness.tolist() == [90.0, 100.0, 110.0]
+
+    def test_survive_removes_clones(self, sample_population):
+        """Test that duplicate genomes are dropped when enabled."""
+        # Arrange
+        engine = SelectionEngine(np.random.default_rng(0), deduplicate=True)
+        population = Population.from_pairs(sample_population)
+        clones = np.repeat(population.genes[:1], 3, axis=0)
+
+        # Act
+        survivors = engine.survive(population, clones, [100.0] * 3, 5)
+
+        # Assert
+        assert len(np.unique(survivors.genes, axis=0)) == 5
+
+    def test_survive_pads_with_clones(self):
+        """Test that clones fill the population if too few are distinct."""
+        # Arrange
+        engine = SelectionEngine(np.random.default_rng(0), deduplicate=True)
+        population = Population(np.zeros((3, 4)), [5.0, 5.0, 5.0])
+
+        # Act
+        survivors = engine.survive(population, np.ones((1, 4)), [7.0], 3)
+
+        # Assert
+        assert len(survivors) == 3
+        assert survivors.fitness.tolist() == [5.0, 5.0, 7.0]
+
+    def test_genome_hashes_distinguish_rows(self):
+        """Test that different genomes hash differently."""
+        # Arrange
+        engine = SelectionEngine()
+        genes = np.array([[0, 1, 2], [2, 1, 0], [0, 1, 2]], dtype=np.int16)
+
+        # Act
+        hashes = engine.genome_hashes(genes)
+
+        # Assert
+        assert hashes[0] == hashes[2]
+        assert hashes[0] != hashes[1]